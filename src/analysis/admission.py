@@ -0,0 +1,205 @@
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data.load_tables import load_score_table
+from src.data.rank_index import RankIndex
+from src.visualization.university_data_analysis import build_university_data
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_SCORE_TABLE = "data/processed/四川省204年高考一分一段表公布.csv"
+
+# 院校录取线列: 最低位次 is the worst rank admitted, 最高位次 the best
+CUTOFF_COLUMNS = ["最低分", "最低位次", "最高位次"]
+
+DEFAULT_SCORE_SD = 10.0  # 考试发挥波动（分）
+DEFAULT_CUTOFF_SD = 0.1  # 录取位次逐年波动（对数尺度）
+DEFAULT_BATCH_SIZE = 250_000
+
+
+def add_cutoff_columns(df, cutoffs, index=None):
+    """
+    Join a cutoff table (院校名称 plus any of CUTOFF_COLUMNS) onto the
+    university DataFrame. When only 最低分 is known, 最低位次 is derived from
+    the score table's RankIndex.
+    """
+    cutoffs = cutoffs[
+        ["院校名称"] + [col for col in CUTOFF_COLUMNS if col in cutoffs.columns]
+    ]
+    df = df.drop(columns=[col for col in CUTOFF_COLUMNS if col in df.columns])
+    df = df.merge(cutoffs, on="院校名称", how="left")
+    if "最低位次" not in df.columns:
+        if "最低分" not in df.columns or index is None:
+            raise ValueError("cutoff table needs 最低位次, or 最低分 and a RankIndex")
+        df["最低位次"] = pd.NA
+    df["最低位次"] = df["最低位次"].astype("Int32")
+    if "最高位次" in df.columns:
+        df["最高位次"] = df["最高位次"].astype("Int32")
+    if "最低分" in df.columns and index is not None:
+        derive = df["最低位次"].isna() & df["最低分"].notna()
+        df.loc[derive, "最低位次"] = np.maximum(
+            index.rank_for_score(df.loc[derive, "最低分"].to_numpy("int64")), 1
+        )
+    return df
+
+
+def _simulate_batch(task):
+    """
+    Worker: draw one batch of noisy outcomes and count, per university,
+    the draws whose rank is within its (noisy) cutoff rank.
+    """
+    scores, counts, highs, cutoffs, score, score_sd, cutoff_sd, size, seed = task
+    rng = np.random.default_rng(seed)
+    index = RankIndex(scores, counts, highs)
+
+    if score is None:
+        # Population mode: true scores drawn from the distribution itself
+        expected = index.score_for_rank(rng.integers(1, index.total + 1, size))
+    else:
+        expected = np.full(size, score, dtype="float64")
+    noisy = np.rint(expected + rng.normal(0.0, score_sd, size)).astype("int64")
+    # Scores inside a range row (e.g. "640-750") share its 累计人数, as the
+    # cutoffs do; scores above the table's top bound share the best rank
+    ranks = np.maximum(index.rank_for_score(noisy), 1)
+
+    # One cutoff shift per draw (a harder or easier year moves every
+    # university together): rank <= cutoff * e^z  <=>  rank * e^-z <= cutoff,
+    # so a single sort answers all universities with binary searches
+    effective = np.sort(ranks * np.exp(-rng.normal(0.0, cutoff_sd, size)))
+    return np.searchsorted(effective, cutoffs, side="right")
+
+
+def simulate_admission(
+    index,
+    cutoff_ranks,
+    score=None,
+    n_samples=1_000_000,
+    score_sd=DEFAULT_SCORE_SD,
+    cutoff_sd=DEFAULT_CUTOFF_SD,
+    seed=0,
+    workers=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+):
+    """
+    Monte Carlo admission probability for every cutoff rank.
+
+    Each draw perturbs the expected ``score`` (or, when None, a score drawn
+    from the distribution) with exam-day noise, converts it to a rank
+    through ``index`` and compares it with the university cutoff ranks
+    under a shared year-to-year shift. Batches get child seeds of one
+    SeedSequence, so results do not depend on the number of workers.
+    """
+    cutoff_ranks = np.asarray(cutoff_ranks, dtype="float64")
+    sizes = [batch_size] * (n_samples // batch_size)
+    if n_samples % batch_size:
+        sizes.append(n_samples % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [
+        (
+            index.scores,
+            index.counts,
+            index.highs,
+            cutoff_ranks,
+            score,
+            score_sd,
+            cutoff_sd,
+            size,
+            batch_seed,
+        )
+        for size, batch_seed in zip(sizes, seeds)
+    ]
+
+    admitted = np.zeros(len(cutoff_ranks), dtype="int64")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for counts in pool.map(_simulate_batch, tasks):
+            admitted += counts
+    return admitted / n_samples
+
+
+def admission_table(df, index, score=None, **options):
+    """Add a 录取概率 column for every university with a 最低位次"""
+    df = df.copy()
+    known = df["最低位次"].notna()
+    probabilities = simulate_admission(
+        index, df.loc[known, "最低位次"].to_numpy("float64"), score, **options
+    )
+    df["录取概率"] = np.nan
+    df.loc[known, "录取概率"] = probabilities
+    return df
+
+
+def synthetic_cutoffs(index, n_universities, seed=0):
+    """Random cutoff table for benchmarking (not real admission data)"""
+    rng = np.random.default_rng(seed)
+    worst = np.sort(rng.integers(1, index.total + 1, n_universities))
+    return pd.DataFrame(
+        {
+            "院校名称": [f"院校{i:04d}" for i in range(n_universities)],
+            "最低位次": worst,
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="录取概率蒙特卡洛模拟")
+    parser.add_argument("--scores", default=DEFAULT_SCORE_TABLE)
+    parser.add_argument(
+        "--cutoffs", help="CSV with 院校名称 and 最低位次 (or 最低分) columns"
+    )
+    parser.add_argument(
+        "--synthetic-universities",
+        type=int,
+        metavar="N",
+        help="benchmark against N random cutoffs instead of --cutoffs",
+    )
+    parser.add_argument("--score", type=int, help="expected score of the student")
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--score-sd", type=float, default=DEFAULT_SCORE_SD)
+    parser.add_argument("--cutoff-sd", type=float, default=DEFAULT_CUTOFF_SD)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="output/admission_probabilities.csv")
+    args = parser.parse_args()
+
+    index = RankIndex.from_table(load_score_table(args.scores))
+    if args.synthetic_universities:
+        df = synthetic_cutoffs(index, args.synthetic_universities, args.seed)
+    elif args.cutoffs:
+        df = add_cutoff_columns(
+            build_university_data(), pd.read_csv(args.cutoffs), index
+        )
+    else:
+        parser.error("one of --cutoffs or --synthetic-universities is required")
+
+    start = time.perf_counter()
+    df = admission_table(
+        df,
+        index,
+        args.score,
+        n_samples=args.samples,
+        score_sd=args.score_sd,
+        cutoff_sd=args.cutoff_sd,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    logging.info(
+        f"Simulated {args.samples} outcomes against "
+        f"{df['最低位次'].notna().sum()} universities in "
+        f"{time.perf_counter() - start:.2f}s"
+    )
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    df.to_csv(args.output, index=False, encoding="utf-8-sig")
+    logging.info(f"数据已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
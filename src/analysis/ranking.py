@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+KEY_COLUMN = "院校名称"
+
+
+def ratio_metric(numerator, denominator, decimals=2):
+    """Derived metric ``numerator / denominator`` (NaN where undefined)"""
+
+    def compute(df):
+        top = df[numerator].to_numpy("float64", na_value=np.nan)
+        bottom = df[denominator].to_numpy("float64", na_value=np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(bottom > 0, top / bottom, np.nan)
+        return np.round(values, decimals)
+
+    compute.columns = (numerator, denominator)
+    return compute
+
+
+# 派生指标: 名称 -> 计算函数 (DataFrame -> ndarray, 输入列在 .columns 中)
+DERIVED_METRICS = {
+    "研本比": ratio_metric("硕博合计", "本科生"),
+    "博士占比": ratio_metric("博士生", "硕博合计", decimals=4),
+}
+
+
+class RankingEngine:
+    """
+    Top-k rankings of universities by any metric and filter.
+
+    Derived metrics are computed column-wise with NumPy. A ranking is a
+    partial sort: ``np.partition`` finds the k-th best value of the
+    filtered subset and only the k rows up to it are sorted. Results are cached per (metric,
+    filter, k, order); when rows change, a cached ranking is recomputed
+    only if a changed row was in it or now beats its k-th value.
+
+    Raises ``ValueError`` if ``df`` lacks the key column or a column a
+    derived metric is computed from.
+    """
+
+    def __init__(self, df, metrics=DERIVED_METRICS, key=KEY_COLUMN):
+        self.key = key
+        self.metrics = dict(metrics)
+        required = {key: None}
+        for compute in self.metrics.values():
+            required.update(dict.fromkeys(getattr(compute, "columns", ())))
+        missing = [column for column in required if column not in df.columns]
+        if missing:
+            raise ValueError(
+                f"RankingEngine needs columns {missing} for the key "
+                f"{key!r} and derived metrics {list(self.metrics)}"
+            )
+        self.df = df.reset_index(drop=True).copy()
+        for name, compute in self.metrics.items():
+            self.df[name] = compute(self.df)
+        self.positions = pd.Index(self.df[key])
+        self._values = {}
+        self._rankings = {}
+        self._extents = {}
+
+    def values(self, metric):
+        if metric not in self._values:
+            self._values[metric] = self.df[metric].to_numpy(
+                "float64", na_value=np.nan, copy=True
+            )
+        return self._values[metric]
+
+    def _mask(self, filters, positions=None):
+        """Rows (or the given row positions) matching every filter"""
+        df = self.df if positions is None else self.df.iloc[positions]
+        mask = np.ones(len(df), dtype=bool)
+        for column, allowed in filters:
+            mask &= df[column].isin(allowed).to_numpy()
+        return mask
+
+    @staticmethod
+    def _filter_key(filters):
+        """Hashable form of ``{column: value or list of values}``"""
+        return tuple(
+            sorted(
+                (column, tuple(np.atleast_1d(allowed).tolist()))
+                for column, allowed in (filters or {}).items()
+            )
+        )
+
+    def _compute(self, metric, filters, k, ascending):
+        values = self.values(metric)
+        candidates = np.flatnonzero(self._mask(filters) & ~np.isnan(values))
+        scores = values[candidates] if ascending else -values[candidates]
+        if k < len(candidates):
+            # Partial sort: everything better than the k-th value, then ties
+            # at the k-th value in row order (argpartition alone breaks ties
+            # arbitrarily)
+            kth = np.partition(scores, k - 1)[k - 1]
+            better = np.flatnonzero(scores < kth)
+            ties = np.flatnonzero(scores == kth)[: k - len(better)]
+            keep = np.r_[better, ties]
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, scores))
+        return candidates[order]
+
+    def top_positions(self, metric, k=20, filters=None, ascending=False):
+        """Row positions of the k best rows, best first"""
+        cache_key = (metric, self._filter_key(filters), k, ascending)
+        if cache_key not in self._rankings:
+            self._rankings[cache_key] = self._compute(metric, *cache_key[1:])
+        return self._rankings[cache_key]
+
+    def top_k(self, metric, k=20, filters=None, ascending=False):
+        """
+        The k best rows by ``metric`` among rows matching ``filters``
+        (e.g. ``{"属性": "985"}``), best first.
+        """
+        return self.df.iloc[self.top_positions(metric, k, filters, ascending)]
+
+    def extent(self, metric):
+        """(min, max) of a metric, cached until the column changes"""
+        if metric not in self._extents:
+            values = self.values(metric)
+            self._extents[metric] = (np.nanmin(values), np.nanmax(values))
+        return self._extents[metric]
+
+    def update(self, rows):
+        """
+        Insert or update rows (matched on the key column) and refresh only
+        the derived metrics, extents and cached rankings they affect.
+        """
+        rows = rows.reset_index(drop=True)
+        before = len(self.df)
+        existing = self.positions.get_indexer(rows[self.key])
+        replaced = {
+            metric: self.values(metric)[existing[existing >= 0]]
+            for metric in self._extents
+        }
+
+        if (existing < 0).any():
+            self.df = pd.concat([self.df, rows[existing < 0]], ignore_index=True)
+            self.positions = pd.Index(self.df[self.key])
+        changed = self.positions.get_indexer(rows[self.key])
+        for column in rows.columns:
+            if column == self.key or column in self.metrics:
+                continue
+            if isinstance(self.df[column].dtype, pd.CategoricalDtype):
+                added = pd.Index(rows[column].dropna().unique())
+                self.df[column] = self.df[column].cat.add_categories(
+                    added.difference(self.df[column].cat.categories)
+                )
+            self.df.loc[changed, column] = rows[column].to_numpy()
+
+        # Recompute derived metrics and cached arrays for the changed rows only
+        subset = self.df.iloc[changed]
+        for name, compute in self.metrics.items():
+            self.df.loc[changed, name] = compute(subset)
+        for metric, values in self._values.items():
+            if len(self.df) > before:
+                values = np.r_[values, np.full(len(self.df) - before, np.nan)]
+            values[changed] = (
+                self.df[metric].iloc[changed].to_numpy("float64", na_value=np.nan)
+            )
+            self._values[metric] = values
+
+        for metric, (low, high) in list(self._extents.items()):
+            if np.isin(replaced[metric], (low, high)).any():
+                # An extreme value changed and may have moved inwards
+                del self._extents[metric]
+            else:
+                new = self.values(metric)[changed]
+                self._extents[metric] = (
+                    np.nanmin(np.r_[low, new]),
+                    np.nanmax(np.r_[high, new]),
+                )
+
+        for cache_key, ranked in list(self._rankings.items()):
+            if self._affects(*cache_key, ranked, changed):
+                self._rankings[cache_key] = self._compute(*cache_key)
+
+    def _affects(self, metric, filters, k, ascending, ranked, changed):
+        """Whether changed rows can alter a cached ranking"""
+        if np.isin(changed, ranked).any() or len(ranked) < k:
+            return True
+        values = self.values(metric)[changed]
+        matching = self._mask(filters, changed) & ~np.isnan(values)
+        threshold = self.values(metric)[ranked[-1]]
+        beats = values <= threshold if ascending else values >= threshold
+        return bool((matching & beats).any())
@@ -0,0 +1,364 @@
+import functools
+import hashlib
+import json
+import os
+
+import matplotlib
+import numpy as np
+import plotly.colors as pc
+import plotly.graph_objects as go
+from matplotlib.colors import is_color_like
+from matplotlib.font_manager import weight_dict
+
+from src.visualization.fonts import matplotlib_font_family
+
+# 图表配置文件，可用环境变量指定其他文件
+CONFIG_PATH_ENV = "GAOKAODATA_CHART_CONFIG"
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "charts.json")
+
+# Value kinds checked by the validator
+NUMBER = "number"
+COUNT = "count"  # integer >= 2
+ALPHA = "alpha"  # opacity within [0, 1]
+TEXT = "text"
+FONT_WEIGHT = "font_weight"  # matplotlib weight name or 0-1000
+COLOR = "color"  # matplotlib color
+PLOTLY_COLOR = "plotly_color"
+COLORMAP = "colormap"  # matplotlib colormap name
+COLORSCALE = "colorscale"  # plotly colorscale name
+RANGE = "range"  # [low, high] within [0, 1]
+SIZE = "size"  # [width, height] in inches
+MARGIN = "margin"
+
+# 分布图样式项 (every key is required in the defaults; datasets may override any)
+DISTRIBUTION_STYLE = {
+    "background_color": COLOR,
+    "text_color": COLOR,
+    "grid_color": COLOR,
+    "spine_color": COLOR,
+    "title_size": NUMBER,
+    "axis_label_size": NUMBER,
+    "tick_label_size": NUMBER,
+    "annotation_size": NUMBER,
+    "title_weight": FONT_WEIGHT,
+    "label_weight": FONT_WEIGHT,
+    "annotation_weight": FONT_WEIGHT,
+    "spine_width": NUMBER,
+    "grid_alpha": ALPHA,
+    "line_alpha": ALPHA,
+    "line_width": NUMBER,
+    "title_pad": NUMBER,
+    "annotation_pad": NUMBER,
+    "bar_height": NUMBER,
+    "bar_alpha": ALPHA,
+    "bar_colormap": COLORMAP,
+    "bar_colormap_range": RANGE,
+    "figure_size": SIZE,
+    "font_family": TEXT,
+    "text_y_offset": NUMBER,
+    "lod_min_bar_pixels": NUMBER,
+}
+
+UNIVERSITY_TABLE = {
+    "title": TEXT,
+    "title_size": NUMBER,
+    "width": NUMBER,
+    "height": NUMBER,
+    "margin": MARGIN,
+    "background_color": PLOTLY_COLOR,
+    "header_fill": PLOTLY_COLOR,
+    "header_font_color": PLOTLY_COLOR,
+    "header_font_size": NUMBER,
+    "header_height": NUMBER,
+    "cell_fill": PLOTLY_COLOR,
+    "cell_font_color": PLOTLY_COLOR,
+    "missing_font_color": PLOTLY_COLOR,
+    "cell_font_size": NUMBER,
+    "cell_height": NUMBER,
+    "line_color": PLOTLY_COLOR,
+    "line_width": NUMBER,
+    "heatmap_colorscale": COLORSCALE,
+    "heatmap_colors": COUNT,
+}
+
+RATIO_CHART = {
+    "title": TEXT,
+    "title_size": NUMBER,
+    "height": NUMBER,
+    "margin": MARGIN,
+    "background_color": PLOTLY_COLOR,
+    "x_title": TEXT,
+    "y_title": TEXT,
+    "axis_title_size": NUMBER,
+    "tick_size": NUMBER,
+    "tick_angle": NUMBER,
+    "grid_color": PLOTLY_COLOR,
+    "colorscale": COLORSCALE,
+    "mean_line_color": PLOTLY_COLOR,
+    "mean_label": TEXT,
+}
+
+
+class ConfigError(ValueError):
+    """Invalid chart configuration file"""
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _valid(kind, value):
+    if kind == NUMBER:
+        return _is_number(value)
+    if kind == COUNT:
+        return isinstance(value, int) and not isinstance(value, bool) and value >= 2
+    if kind == ALPHA:
+        return _is_number(value) and 0 <= value <= 1
+    if kind == TEXT:
+        return isinstance(value, str)
+    if kind == FONT_WEIGHT:
+        if isinstance(value, str):
+            return value in weight_dict
+        return _is_number(value) and 0 <= value <= 1000
+    if kind == COLOR:
+        return isinstance(value, str) and is_color_like(value)
+    if kind == PLOTLY_COLOR:
+        try:
+            # Validated by plotly itself, as any color property of a figure
+            go.layout.Font(color=value)
+        except ValueError:
+            return False
+        return isinstance(value, str)
+    if kind == COLORMAP:
+        return value in matplotlib.colormaps
+    if kind == COLORSCALE:
+        try:
+            pc.get_colorscale(value)
+        except Exception:
+            return False
+        return True
+    if kind == RANGE:
+        return (
+            isinstance(value, list)
+            and len(value) == 2
+            and all(_is_number(v) and 0 <= v <= 1 for v in value)
+            and value[0] <= value[1]
+        )
+    if kind == SIZE:
+        return (
+            isinstance(value, list)
+            and len(value) == 2
+            and all(_is_number(v) and v > 0 for v in value)
+        )
+    if kind == MARGIN:
+        return isinstance(value, dict) and all(
+            side in "tlrb" and _is_number(v) for side, v in value.items()
+        )
+    raise AssertionError(kind)
+
+
+def _check_section(where, values, schema, required=True):
+    """Collect problems with one config section (unknown, missing, invalid keys)"""
+    if not isinstance(values, dict):
+        return [f"{where}: expected an object"]
+    problems = [
+        f"{where}.{key}: unknown setting" for key in values if key not in schema
+    ]
+    if required:
+        problems += [f"{where}.{key}: missing" for key in schema if key not in values]
+    problems += [
+        f"{where}.{key}: invalid {kind} {values[key]!r}"
+        for key, kind in schema.items()
+        if key in values and not _valid(kind, values[key])
+    ]
+    return problems
+
+
+def _check_thresholds(where, thresholds):
+    if not isinstance(thresholds, list):
+        return [f"{where}: expected a list of [score, label, color]"]
+    return [
+        f"{where}[{i}]: expected [score, label, color], got {line!r}"
+        for i, line in enumerate(thresholds)
+        if not (
+            isinstance(line, list)
+            and len(line) == 3
+            and _is_number(line[0])
+            and isinstance(line[1], str)
+            and _valid(COLOR, line[2])
+        )
+    ]
+
+
+def fingerprint(value):
+    """Stable hash of a JSON-compatible value, for cache keys"""
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class DistributionChart:
+    """
+    Resolved settings of one distribution dataset (defaults plus its
+    overrides), with the colormap lookup table and text styles built once.
+    """
+
+    def __init__(self, name, title, style, thresholds):
+        self.name = name
+        self.title = title
+        self.style = style
+        self.thresholds = [tuple(line) for line in thresholds]
+        self.fingerprint = fingerprint(
+            {"title": title, "style": style, "thresholds": thresholds}
+        )
+        self.colormap = matplotlib.colormaps[style["bar_colormap"]]
+        # The colormap's own lookup table; indexing it gives the same colors
+        # as calling the colormap
+        self.color_lut = self.colormap(np.arange(self.colormap.N))
+        self._text_styles = {}
+
+    @property
+    def background_color(self):
+        return self.style["background_color"]
+
+    def bar_colors(self, n):
+        """``n`` bar colors, dark at the top score and light at the bottom"""
+        low, high = self.style["bar_colormap_range"]
+        index = (np.linspace(low, high, n) * self.colormap.N).astype(int)
+        return self.color_lut[np.minimum(index, self.colormap.N - 1)][::-1]
+
+    @functools.cached_property
+    def font_family(self):
+        return matplotlib_font_family(self.style["font_family"])
+
+    def text_style(self, size_key, weight_key, color=None):
+        """Font properties for matplotlib text, built once per size/weight pair"""
+        key = (size_key, weight_key)
+        if key not in self._text_styles:
+            self._text_styles[key] = dict(
+                fontsize=self.style[size_key],
+                fontweight=self.style[weight_key],
+                fontfamily=self.font_family,
+            )
+        return dict(self._text_styles[key], color=color or self.style["text_color"])
+
+
+class ChartConfig:
+    """
+    The parsed and validated chart configuration.
+
+    ``distribution`` settings are shared defaults plus per-dataset
+    overrides; ``university_table`` and ``ratio_chart`` configure the plotly
+    figures. Derived objects (colormap tables, plotly colorscales) are built
+    here once, and every section has a fingerprint for cache keys.
+    """
+
+    def __init__(self, raw, path=None):
+        self.path = path
+        if not isinstance(raw, dict):
+            raise ConfigError(f"{path}: expected an object")
+        problems = []
+        sections = {"distribution", "university_table", "ratio_chart"}
+        problems += [f"{key}: unknown section" for key in raw if key not in sections]
+        problems += [f"{key}: missing section" for key in sections if key not in raw]
+        if problems:
+            raise ConfigError(f"{path}: " + "; ".join(problems))
+
+        distribution = raw["distribution"]
+        if not isinstance(distribution, dict):
+            problems.append("distribution: expected an object")
+            distribution = {}
+        problems += [
+            f"distribution.{key}: unknown setting"
+            for key in distribution
+            if key not in ("style", "datasets")
+        ]
+        defaults = distribution.get("style", {})
+        datasets = distribution.get("datasets", {})
+        problems += _check_section("distribution.style", defaults, DISTRIBUTION_STYLE)
+        if not isinstance(datasets, dict):
+            problems.append("distribution.datasets: expected an object")
+            datasets = {}
+        elif not datasets:
+            problems.append("distribution.datasets: no datasets")
+        for name, dataset in datasets.items():
+            where = f"distribution.datasets.{name}"
+            if not isinstance(dataset, dict):
+                problems.append(f"{where}: expected an object")
+                continue
+            unknown = set(dataset) - {"title", "thresholds", "style"}
+            problems += [f"{where}.{key}: unknown setting" for key in sorted(unknown)]
+            if not isinstance(dataset.get("title"), str):
+                problems.append(f"{where}.title: missing")
+            problems += _check_thresholds(
+                f"{where}.thresholds", dataset.get("thresholds", [])
+            )
+            problems += _check_section(
+                f"{where}.style",
+                dataset.get("style", {}),
+                DISTRIBUTION_STYLE,
+                required=False,
+            )
+        problems += _check_section(
+            "university_table", raw["university_table"], UNIVERSITY_TABLE
+        )
+        problems += _check_section("ratio_chart", raw["ratio_chart"], RATIO_CHART)
+        if problems:
+            raise ConfigError(f"{path}: " + "; ".join(problems))
+
+        self.distributions = {
+            name: DistributionChart(
+                name,
+                dataset["title"],
+                dict(defaults, **dataset.get("style", {})),
+                dataset.get("thresholds", []),
+            )
+            for name, dataset in datasets.items()
+        }
+
+        self.university_table = raw["university_table"]
+        table = self.university_table
+        n_colors = table["heatmap_colors"]
+        # Heatmap colors, darkest for the largest values
+        self.heatmap_colors = pc.sample_colorscale(
+            table["heatmap_colorscale"], [i / (n_colors - 1) for i in range(n_colors)]
+        )[::-1]
+
+        self.ratio_chart = raw["ratio_chart"]
+        self.ratio_colorscale = pc.get_colorscale(self.ratio_chart["colorscale"])
+        self.plotly_fingerprint = fingerprint(
+            {"university_table": table, "ratio_chart": self.ratio_chart}
+        )
+
+    def distribution(self, name):
+        try:
+            return self.distributions[name]
+        except KeyError:
+            raise ConfigError(
+                f"{self.path}: no distribution dataset {name!r} "
+                f"(known: {', '.join(self.distributions)})"
+            ) from None
+
+
+def config_path():
+    return os.path.abspath(os.environ.get(CONFIG_PATH_ENV) or DEFAULT_CONFIG_PATH)
+
+
+def read_config(path):
+    """Parse and validate the config file at ``path`` (uncached)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"Cannot read chart config {path}: {e}") from e
+    return ChartConfig(raw, path)
+
+
+_load = functools.lru_cache(maxsize=None)(read_config)
+
+
+def load_config(path=None):
+    """
+    The chart configuration, parsed and validated once per process (worker
+    processes started by fork inherit it). Raises ``ConfigError``.
+    """
+    return _load(os.path.abspath(path) if path else config_path())
@@ -0,0 +1,167 @@
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data.load_tables import compact_score_table
+from src.data.process_score_data import (
+    build_score_table,
+    is_score_table,
+    read_raw_table,
+)
+from src.data.rank_index import RankIndex, upper_bounds
+from src.data.score_table import (
+    COUNT_COL,
+    CUMULATIVE_COL,
+    SCORE_COL,
+    SCORE_TABLE_COLUMNS,
+)
+from src.data.validate_score_table import validate_stage
+from src.visualization.chart_cache import ChartCache
+from src.visualization.render_charts import charts_for_data, render_all
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_TABLE = "data/processed/四川省204年高考一分一段表公布.csv"
+
+
+def _compact(rows):
+    rows = compact_score_table(rows)
+    for col in (COUNT_COL, CUMULATIVE_COL):
+        rows[col] = rows[col].astype("Int32")
+    return rows
+
+
+class ScoreTableAppender:
+    """
+    A processed 一分一段 table that grows as segments are published.
+
+    New rows continue below the lowest stored score, with 累计人数
+    continuing from the current total. Rows repeating a stored 分数 are
+    skipped when their 人数 is unchanged; a changed 人数 is a correction,
+    which recomputes 累计人数 from that row on. The merged table is
+    validated as a whole before anything is written: a segment that only
+    adds rows is appended to the CSV and to the RankIndex, one with
+    corrections rewrites the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.table = _compact(pd.read_csv(path, dtype={SCORE_COL: "string"}))
+        self.index = RankIndex.from_table(self.table)
+
+    def append(self, raw):
+        """
+        Merge one published segment (raw rows with 分数 and 人数); returns
+        counts of appended, corrected and unchanged rows. Raises
+        ``ValueError`` (leaving the file and index untouched) if the merged
+        table fails validation.
+        """
+        rows = build_score_table(raw)
+        position = pd.Index(self.table[SCORE_COL]).get_indexer(rows[SCORE_COL])
+        known = position >= 0
+
+        stored = self.table[COUNT_COL].to_numpy("float64", na_value=np.nan)
+        stored = stored[position[known]]
+        incoming = rows[COUNT_COL].to_numpy("float64", na_value=np.nan)[known]
+        same = (stored == incoming) | (np.isnan(stored) & np.isnan(incoming))
+        corrected = position[known][~same]
+        new_rows = rows.loc[~known, [SCORE_COL, COUNT_COL]]
+
+        # Rebuild 累计人数 from the first changed (or new) row on
+        first = corrected.min() if len(corrected) else len(self.table)
+        suffix = self.table.iloc[first:][[SCORE_COL, COUNT_COL]].copy()
+        suffix.loc[corrected, COUNT_COL] = pd.array(incoming[~same], dtype="Int32")
+        suffix = pd.concat([suffix, new_rows], ignore_index=True)
+        base = self.table[COUNT_COL].iloc[:first].sum()
+        suffix = _compact(build_score_table(suffix, base=base))
+        table = pd.concat([self.table.iloc[:first], suffix], ignore_index=True)
+
+        try:
+            validate_stage(
+                table[SCORE_TABLE_COLUMNS], name=self.path, repair=False, strict=True
+            )
+        except ValueError as e:
+            raise ValueError(f"{self.path}: segment rejected ({e})") from e
+
+        if len(corrected):
+            tmp_path = f"{self.path}.tmp{os.getpid()}"
+            table[SCORE_TABLE_COLUMNS].to_csv(tmp_path, index=False, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        elif len(new_rows):
+            with open(self.path, "a", encoding="utf-8", newline="") as f:
+                suffix[SCORE_TABLE_COLUMNS].to_csv(f, header=False, index=False)
+        self._update_index(table, corrected, suffix.iloc[len(suffix) - len(new_rows) :])
+        self.table = table
+        return {
+            "appended": len(new_rows),
+            "corrected": len(corrected),
+            "unchanged": int(same.sum()),
+        }
+
+    def _update_index(self, table, corrected, new_rows):
+        changed = table.iloc[corrected]
+        if not (
+            changed[COUNT_COL].notna().all()
+            and np.isin(changed["score"], self.index.scores).all()
+        ):
+            # A count became (or stopped being) missing: rows enter or
+            # leave the index
+            self.index = RankIndex.from_table(table)
+            return
+        if len(changed):
+            self.index.set_counts(changed["score"], changed[COUNT_COL])
+        valid = new_rows["score"].notna() & new_rows[COUNT_COL].notna()
+        rows = new_rows.loc[valid]
+        self.index.extend(rows["score"], rows[COUNT_COL], upper_bounds(rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="增量追加一分一段表分段数据")
+    parser.add_argument(
+        "segments", nargs="+", help="published segments (HTML, CSV or Excel)"
+    )
+    parser.add_argument("--table", default=DEFAULT_TABLE, help="processed table")
+    parser.add_argument(
+        "--render",
+        action="store_true",
+        help="re-render the charts drawn from the table (cached)",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    appender = ScoreTableAppender(args.table)
+    logging.info(
+        f"{args.table}: {len(appender.table)} rows loaded in "
+        f"{(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+
+    changed = False
+    for path in args.segments:
+        raw = read_raw_table(path)
+        if not is_score_table(raw):
+            logging.info(f"Skipping {path}: no {SCORE_COL}/{COUNT_COL} columns")
+            continue
+        start = time.perf_counter()
+        result = appender.append(raw)
+        changed = changed or result["appended"] or result["corrected"]
+        logging.info(
+            f"{path}: {result['appended']} appended, {result['corrected']} "
+            f"corrected, {result['unchanged']} unchanged in "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms "
+            f"(total {appender.index.total})"
+        )
+
+    if args.render and changed:
+        charts = charts_for_data(args.table)
+        if charts:
+            render_all(cache=ChartCache(), university=False, charts=charts)
+
+
+if __name__ == "__main__":
+    main()
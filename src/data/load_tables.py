@@ -0,0 +1,103 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.data.score_table import (
+    COUNT_COL,
+    CUMULATIVE_COL,
+    SCORE_COL,
+    parse_score_labels,
+)
+
+try:
+    import pyarrow  # noqa: F401
+
+    NAME_DTYPE = pd.StringDtype("pyarrow")
+except ImportError:  # pragma: no cover - pyarrow is optional
+    NAME_DTYPE = pd.StringDtype("python")
+
+# 紧凑数据类型
+SCORE_DTYPE = "int16"
+COUNT_DTYPE = "int32"
+CATEGORY_COLUMNS = ["属性", "省份", "科类"]  # 院校属性 / 省份 / 科类(物理类、历史类)
+NAME_COLUMNS = ["院校名称"]
+UNIVERSITY_COUNT_COLUMNS = ["本科生", "硕士生", "博士生", "硕博合计"]
+
+
+def memory_usage(df):
+    """Deep memory usage of a DataFrame in bytes"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _as_int(series, dtype):
+    """Cast to a numpy integer dtype, or its nullable variant when values are missing"""
+    values = pd.to_numeric(series, errors="coerce")
+    if values.isna().any():
+        return values.astype(dtype.capitalize())
+    return values.astype(dtype)
+
+
+def _compact_common(df):
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in NAME_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(NAME_DTYPE)
+    return df
+
+
+def compact_score_table(df):
+    """
+    Apply compact dtypes to a 一分一段 table.
+
+    Adds an int16 ``score`` column parsed from the 分数 labels, stores the
+    labels as Arrow-backed strings and the counts as int32 (nullable Int32
+    if any value is missing).
+    """
+    df = df.copy()
+    score = parse_score_labels(df[SCORE_COL])["score"]
+    df["score"] = _as_int(score.where(np.isfinite(score)), SCORE_DTYPE)
+    df[SCORE_COL] = df[SCORE_COL].astype(NAME_DTYPE)
+    for col in (COUNT_COL, CUMULATIVE_COL):
+        df[col] = _as_int(df[col], COUNT_DTYPE)
+    return _compact_common(df)
+
+
+def compact_university_table(df):
+    """Apply compact dtypes to the university table"""
+    df = df.copy()
+    if "排名" in df.columns:
+        df["排名"] = _as_int(df["排名"], "int16")
+    for col in UNIVERSITY_COUNT_COLUMNS:
+        if col in df.columns:
+            df[col] = _as_int(df[col], COUNT_DTYPE)
+    return _compact_common(df)
+
+
+def _log_memory(name, before, after):
+    saved = 1 - after / before if before else 0
+    logging.info(
+        f"{name}: memory {before / 1024:.1f} KB -> {after / 1024:.1f} KB "
+        f"({saved:.0%} saved)"
+    )
+
+
+def load_score_table(path):
+    """Read a processed score table CSV with compact dtypes"""
+    df = pd.read_csv(path)
+    compact = compact_score_table(df)
+    _log_memory(path, memory_usage(df), memory_usage(compact))
+    return compact
+
+
+def load_university_table(path):
+    """Read the university table (Excel or CSV) with compact dtypes"""
+    if str(path).lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(path)
+    else:
+        df = pd.read_csv(path)
+    compact = compact_university_table(df)
+    _log_memory(path, memory_usage(df), memory_usage(compact))
+    return compact
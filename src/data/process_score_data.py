@@ -1,780 +1,125 @@
-import pandas as pd
+import argparse
+import json
+import logging
 import os
 
-# 创建数据字典
-data = {
-    "分数": [
-        "650分及以上",
-        "649分",
-        "648分",
-        "647分",
-        "646分",
-        "645分",
-        "644分",
-        "643分",
-        "642分",
-        "641分",
-        "640分",
-        "639分",
-        "638分",
-        "637分",
-        "636分",
-        "635分",
-        "634分",
-        "633分",
-        "632分",
-        "631分",
-        "630分",
-        "629分",
-        "628分",
-        "627分",
-        "626分",
-        "625分",
-        "624分",
-        "623分",
-        "622分",
-        "621分",
-        "620分",
-        "619分",
-        "618分",
-        "617分",
-        "616分",
-        "615分",
-        "614分",
-        "613分",
-        "612分",
-        "611分",
-        "610分",
-        "609分",
-        "608分",
-        "607分",
-        "606分",
-        "605分",
-        "604分",
-        "603分",
-        "602分",
-        "601分",
-        "600分",
-        "599分",
-        "598分",
-        "597分",
-        "596分",
-        "595分",
-        "594分",
-        "593分",
-        "592分",
-        "591分",
-        "590分",
-        "589分",
-        "588分",
-        "587分",
-        "586分",
-        "585分",
-        "584分",
-        "583分",
-        "582分",
-        "581分",
-        "580分",
-        "579分",
-        "578分",
-        "577分",
-        "576分",
-        "575分",
-        "574分",
-        "573分",
-        "572分",
-        "571分",
-        "570分",
-        "569分",
-        "568分",
-        "567分",
-        "566分",
-        "565分",
-        "564分",
-        "563分",
-        "562分",
-        "561分",
-        "560分",
-        "559分",
-        "558分",
-        "557分",
-        "556分",
-        "555分",
-        "554分",
-        "553分",
-        "552分",
-        "551分",
-        "550分",
-        "549分",
-        "548分",
-        "547分",
-        "546分",
-        "545分",
-        "544分",
-        "543分",
-        "542分",
-        "541分",
-        "540分",
-        "539分",
-        "538分",
-        "537分",
-        "536分",
-        "535分",
-        "534分",
-        "533分",
-        "532分",
-        "531分",
-        "530分",
-        "529分",
-        "528分",
-        "527分",
-        "526分",
-        "525分",
-        "524分",
-        "523分",
-        "522分",
-        "521分",
-        "520分",
-        "519分",
-        "518分",
-        "517分",
-        "516分",
-        "515分",
-        "514分",
-        "513分",
-        "512分",
-        "511分",
-        "510分",
-        "509分",
-        "508分",
-        "507分",
-        "506分",
-        "505分",
-        "504分",
-        "503分",
-        "502分",
-        "501分",
-        "500分",
-        "499分",
-        "498分",
-        "497分",
-        "496分",
-        "495分",
-        "494分",
-        "493分",
-        "492分",
-        "491分",
-        "490分",
-        "489分",
-        "488分",
-        "487分",
-        "486分",
-        "485分",
-        "484分",
-        "483分",
-        "482分",
-        "481分",
-        "480分",
-        "479分",
-        "478分",
-        "477分",
-        "476分",
-        "475分",
-        "474分",
-        "473分",
-        "472分",
-        "471分",
-        "470分",
-        "469分",
-        "468分",
-        "467分",
-        "466分",
-        "465分",
-        "464分",
-        "463分",
-        "462分",
-        "461分",
-        "460分",
-        "459分",
-        "458分",
-        "457分",
-        "456分",
-        "455分",
-        "454分",
-        "453分",
-        "452分",
-        "451分",
-        "450分",
-        "449分",
-        "448分",
-        "447分",
-        "446分",
-        "445分",
-        "444分",
-        "443分",
-        "442分",
-        "441分",
-        "440分",
-        "439分",
-        "438分",
-        "437分",
-        "436分",
-        "435分",
-        "434分",
-        "433分",
-        "432分",
-        "431分",
-        "430分",
-        "429分",
-        "428分",
-        "427分",
-        "426分",
-        "425分",
-        "424分",
-        "423分",
-        "422分",
-        "421分",
-        "420分",
-        "419分",
-        "418分",
-        "417分",
-        "416分",
-        "415分",
-        "414分",
-        "413分",
-        "412分",
-        "411分",
-        "410分",
-        "409分",
-        "408分",
-        "407分",
-        "406分",
-        "405分",
-        "404分",
-        "403分",
-        "402分",
-        "401分",
-        "400分",
-        "400分以下路",
-    ],
-    "人数": [
-        195,
-        28,
-        41,
-        29,
-        32,
-        40,
-        45,
-        40,
-        53,
-        50,
-        65,
-        54,
-        49,
-        82,
-        69,
-        72,
-        109,
-        99,
-        100,
-        96,
-        108,
-        106,
-        127,
-        130,
-        106,
-        141,
-        131,
-        133,
-        137,
-        136,
-        135,
-        150,
-        150,
-        141,
-        131,
-        137,
-        150,
-        157,
-        153,
-        153,
-        139,
-        147,
-        123,
-        193,
-        174,
-        174,
-        152,
-        177,
-        182,
-        152,
-        163,
-        157,
-        159,
-        146,
-        168,
-        137,
-        151,
-        144,
-        147,
-        145,
-        141,
-        137,
-        124,
-        126,
-        161,
-        161,
-        161,
-        122,
-        137,
-        145,
-        165,
-        138,
-        140,
-        119,
-        139,
-        136,
-        149,
-        125,
-        128,
-        138,
-        124,
-        125,
-        151,
-        130,
-        140,
-        175,
-        139,
-        137,
-        118,
-        142,
-        126,
-        141,
-        116,
-        134,
-        132,
-        142,
-        122,
-        139,
-        154,
-        134,
-        125,
-        138,
-        124,
-        139,
-        125,
-        134,
-        138,
-        109,
-        134,
-        138,
-        119,
-        141,
-        139,
-        126,
-        122,
-        135,
-        121,
-        126,
-        121,
-        110,
-        115,
-        135,
-        122,
-        102,
-        128,
-        109,
-        120,
-        107,
-        109,
-        140,
-        121,
-        125,
-        130,
-        107,
-        103,
-        120,
-        131,
-        108,
-        125,
-        139,
-        93,
-        105,
-        81,
-        109,
-        105,
-        84,
-        100,
-        108,
-        111,
-        91,
-        81,
-        82,
-        86,
-        102,
-        101,
-        104,
-        104,
-        85,
-        97,
-        86,
-        90,
-        72,
-        90,
-        83,
-        95,
-        77,
-        71,
-        74,
-        80,
-        93,
-        75,
-        100,
-        101,
-        79,
-        72,
-        68,
-        87,
-        73,
-        58,
-        83,
-        61,
-        80,
-        76,
-        63,
-        79,
-        71,
-        71,
-        72,
-        54,
-        82,
-        78,
-        73,
-        64,
-        70,
-        53,
-        77,
-        64,
-        65,
-        85,
-        70,
-        69,
-        79,
-        56,
-        72,
-        68,
-        66,
-        61,
-        51,
-        63,
-        78,
-        55,
-        62,
-        69,
-        62,
-        53,
-        50,
-        60,
-        54,
-        54,
-        56,
-        55,
-        51,
-        52,
-        63,
-        56,
-        53,
-        55,
-        53,
-        57,
-        53,
-        52,
-        38,
-        39,
-        47,
-        57,
-        53,
-        51,
-        37,
-        48,
-        33,
-        39,
-        45,
-        46,
-        40,
-        53,
-        41,
-        42,
-        40,
-        36,
-        50,
-        34,
-        None,
-    ],
-    "累计人数": [
-        195,
-        223,
-        264,
-        293,
-        325,
-        365,
-        410,
-        450,
-        503,
-        553,
-        618,
-        672,
-        721,
-        803,
-        872,
-        944,
-        1053,
-        1152,
-        1252,
-        1348,
-        1456,
-        1562,
-        1689,
-        1819,
-        1925,
-        2066,
-        2197,
-        2330,
-        2467,
-        2603,
-        2738,
-        2888,
-        3038,
-        3179,
-        3310,
-        3447,
-        3597,
-        3754,
-        3907,
-        4060,
-        4199,
-        4346,
-        4469,
-        4662,
-        4836,
-        5010,
-        5162,
-        5339,
-        5521,
-        5673,
-        5836,
-        5993,
-        6152,
-        6298,
-        6466,
-        6603,
-        6754,
-        6898,
-        7045,
-        7190,
-        7331,
-        7468,
-        7592,
-        7718,
-        7879,
-        8040,
-        8201,
-        8323,
-        8460,
-        8605,
-        8770,
-        8908,
-        9048,
-        9167,
-        9306,
-        9442,
-        9591,
-        9716,
-        9844,
-        9982,
-        10106,
-        10231,
-        10382,
-        10512,
-        10652,
-        10827,
-        10966,
-        11103,
-        11221,
-        11363,
-        11489,
-        11630,
-        11746,
-        11880,
-        12012,
-        12154,
-        12276,
-        12415,
-        12569,
-        12703,
-        12828,
-        12966,
-        13090,
-        13229,
-        13354,
-        13488,
-        13626,
-        13735,
-        13869,
-        14007,
-        14126,
-        14267,
-        14406,
-        14532,
-        14654,
-        14789,
-        14910,
-        15036,
-        15157,
-        15267,
-        15382,
-        15517,
-        15639,
-        15741,
-        15869,
-        15978,
-        16098,
-        16205,
-        16314,
-        16454,
-        16575,
-        16700,
-        16830,
-        16937,
-        17040,
-        17160,
-        17291,
-        17399,
-        17524,
-        17663,
-        17756,
-        17861,
-        17942,
-        18051,
-        18156,
-        18240,
-        18340,
-        18448,
-        18559,
-        18650,
-        18731,
-        18813,
-        18899,
-        19001,
-        19102,
-        19206,
-        19310,
-        19395,
-        19492,
-        19578,
-        19668,
-        19740,
-        19830,
-        19913,
-        20008,
-        20085,
-        20156,
-        20230,
-        20310,
-        20403,
-        20478,
-        20578,
-        20679,
-        20758,
-        20830,
-        20898,
-        20985,
-        21058,
-        21116,
-        21199,
-        21260,
-        21340,
-        21416,
-        21479,
-        21558,
-        21629,
-        21700,
-        21772,
-        21826,
-        21908,
-        21986,
-        22059,
-        22123,
-        22193,
-        22246,
-        22323,
-        22387,
-        22452,
-        22537,
-        22607,
-        22676,
-        22755,
-        22811,
-        22883,
-        22951,
-        23017,
-        23078,
-        23129,
-        23192,
-        23270,
-        23325,
-        23387,
-        23456,
-        23518,
-        23571,
-        23621,
-        23681,
-        23735,
-        23789,
-        23845,
-        23900,
-        23951,
-        24003,
-        24066,
-        24122,
-        24175,
-        24230,
-        24283,
-        24340,
-        24393,
-        24445,
-        24483,
-        24522,
-        24569,
-        24626,
-        24679,
-        24730,
-        24767,
-        24815,
-        24848,
-        24887,
-        24932,
-        24978,
-        25018,
-        25071,
-        25112,
-        25154,
-        25194,
-        25230,
-        25280,
-        25314,
-        None,
-    ],
-}
+import pandas as pd
+
+from src.data.score_table import COUNT_COL, CUMULATIVE_COL, SCORE_COL
+from src.data.validate_score_table import validate_stage
+from src.data_processing.extract_table import (
+    detect_encoding,
+    extract_tables,
+    select_table,
+)
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+RAW_DIR = "data/raw"
+PROCESSED_DIR = "data/processed"
+
+# 支持的原始数据格式
+RAW_SUFFIXES = (".html", ".htm", ".csv", ".xlsx", ".xls")
+
+
+def read_raw_table(path, encoding=None):
+    """
+    Read a raw score table from an HTML, CSV or Excel file. Text files are
+    decoded once with ``encoding`` (detected when None).
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in (".html", ".htm", ".csv") and encoding is None:
+        encoding, _ = detect_encoding(path)
+    if suffix in (".html", ".htm"):
+        # Pages may hold layout or notes tables; take the first whose
+        # header has 分数 and 人数
+        tables = extract_tables(path, encoding)
+        if not tables:
+            raise ValueError(f"No table found in {path}")
+        rows = tables[select_table(tables, (SCORE_COL, COUNT_COL))]
+        return pd.DataFrame(rows[1:], columns=rows[0])
+    if suffix == ".csv":
+        return pd.read_csv(path, dtype={SCORE_COL: "string"}, encoding=encoding)
+    if suffix in (".xlsx", ".xls"):
+        return pd.read_excel(path, dtype={SCORE_COL: "string"})
+    raise ValueError(f"Unsupported raw file format: {path}")
+
+
+def is_score_table(df):
+    return SCORE_COL in df.columns and COUNT_COL in df.columns
+
+
+def build_score_table(raw, base=0):
+    """
+    Build a processed 一分一段 table from raw rows.
+
+    Only 分数 and 人数 are taken from the source; 累计人数 is always derived
+    with a cumulative sum (starting from ``base``, the number of students
+    above the first row), and rows with a missing 人数 keep it missing.
+    """
+    df = pd.DataFrame({SCORE_COL: raw[SCORE_COL].astype("string").str.strip()})
+    counts = pd.to_numeric(raw[COUNT_COL], errors="coerce")
+    df[COUNT_COL] = counts.astype("Int32")
+    df[CUMULATIVE_COL] = (
+        (base + counts.fillna(0).cumsum()).where(counts.notna()).astype("Int32")
+    )
+    return df
+
+
+def process_raw_file(path, output_dir=PROCESSED_DIR):
+    """
+    Ingest one raw file and write the processed CSV; returns the file's
+    batch report entry (``output`` is None when the file was skipped).
+    """
+    report = {"input": path, "output": None, "encoding": None}
+    if path.lower().endswith((".html", ".htm", ".csv")):
+        report["encoding"], report["encoding_source"] = detect_encoding(path)
+    raw = read_raw_table(path, report["encoding"])
+    if not is_score_table(raw):
+        logging.info(f"Skipping {path}: no {SCORE_COL}/{COUNT_COL} columns")
+        return report
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    df = validate_stage(build_score_table(raw), name=name)
+
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"{name}.csv")
+    df.to_csv(output_path, index=False, encoding="utf-8")
+    logging.info(f"数据已保存到: {output_path} ({len(df)} rows)")
+    return dict(report, output=output_path, rows=len(df))
+
+
+def find_raw_files(raw_dir=RAW_DIR):
+    return sorted(
+        os.path.join(raw_dir, name)
+        for name in os.listdir(raw_dir)
+        if name.lower().endswith(RAW_SUFFIXES)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从原始文件生成一分一段表")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help=f"raw files to ingest (default: all files in {RAW_DIR})",
+    )
+    parser.add_argument("--output-dir", default=PROCESSED_DIR)
+    args = parser.parse_args()
 
-# 创建DataFrame
-df = pd.DataFrame(data)
+    report = [
+        process_raw_file(path, output_dir=args.output_dir)
+        for path in args.paths or find_raw_files()
+    ]
 
-# 确保输出目录存在
-os.makedirs("data/processed", exist_ok=True)
+    # Batch report with the detected encoding of every source file
+    report_path = os.path.join(args.output_dir, "ingest_report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    logging.info(f"Batch report saved to {report_path}")
 
-# 保存为CSV文件
-output_path = "data/processed/中考分数分布数据.csv"
-df.to_csv(output_path, index=False, encoding="utf-8")
 
-print(f"数据已保存到: {output_path}")
+if __name__ == "__main__":
+    main()
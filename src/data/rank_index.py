@@ -0,0 +1,107 @@
+import numpy as np
+
+from src.data.score_table import SCORE_COL, parse_score_labels
+
+
+def upper_bounds(df):
+    """
+    Upper score bound of every row of a table with a ``score`` column (the
+    score itself for single-score rows, or without 分数 labels)
+    """
+    scores = df["score"].to_numpy("float64")
+    if SCORE_COL not in df.columns:
+        return scores
+    return np.fmax(parse_score_labels(df[SCORE_COL])["high"].to_numpy(), scores)
+
+
+class RankIndex:
+    """
+    Score ↔ rank (位次) lookups over a 一分一段 table.
+
+    The rank of a score is the number of students scoring at least that
+    score, i.e. its 累计人数. A score inside a range row (``highs`` is each
+    row's upper bound, e.g. 750 for "640-750") gets that row's 累计人数.
+    Lookups are binary searches and accept scalars or NumPy arrays.
+    """
+
+    def __init__(self, scores, counts, highs=None):
+        scores = np.asarray(scores, dtype="int64")
+        counts = np.asarray(counts, dtype="int64")
+        highs = scores if highs is None else highs
+        highs = np.asarray(highs, dtype="float64")
+        order = np.argsort(-scores, kind="stable")
+        # Descending scores and their cumulative counts (increasing)
+        self.scores = scores[order]
+        self.counts = counts[order]
+        self.highs = highs[order]
+        self.cumulative = np.cumsum(self.counts)
+
+    @classmethod
+    def from_table(cls, df):
+        """
+        Build from a table with ``score`` and ``人数`` columns; the upper
+        bounds of range rows are parsed from 分数 when present.
+        """
+        valid = df["score"].notna() & df["人数"].notna()
+        rows = df.loc[valid]
+        return cls(rows["score"], rows["人数"], upper_bounds(rows))
+
+    @property
+    def total(self):
+        return int(self.cumulative[-1]) if len(self.cumulative) else 0
+
+    def rank_for_score(self, score):
+        """Number of students scoring at least ``score``"""
+        score = np.asarray(score)
+        # Rows are descending, so count the rows whose score is >= score
+        idx = np.searchsorted(-self.scores, -score, side="right") - 1
+        ranks = np.where(idx >= 0, self.cumulative[np.maximum(idx, 0)], 0)
+        # The next row starts below the score; it contains the score when
+        # its upper bound reaches it
+        below = np.minimum(idx + 1, len(self.scores) - 1)
+        inside = (idx + 1 < len(self.scores)) & (score <= self.highs[below])
+        ranks = np.where(inside, self.cumulative[below], ranks)
+        return ranks if ranks.ndim else int(ranks)
+
+    def score_for_rank(self, rank):
+        """
+        Score of the student at position ``rank``; ranks past the end map
+        to the lowest score in the table.
+        """
+        rank = np.asarray(rank)
+        idx = np.searchsorted(self.cumulative, rank, side="left")
+        scores = self.scores[np.minimum(idx, len(self.scores) - 1)]
+        return scores if scores.ndim else int(scores)
+
+    def extend(self, scores, counts, highs=None):
+        """
+        Append rows scoring below every current row. Only the new rows'
+        cumulative counts are computed, continuing from the current total.
+        """
+        scores = np.asarray(scores, dtype="int64")
+        counts = np.asarray(counts, dtype="int64")
+        highs = np.asarray(scores if highs is None else highs, dtype="float64")
+        order = np.argsort(-scores, kind="stable")
+        scores, counts, highs = scores[order], counts[order], highs[order]
+        if len(scores) and len(self.scores) and scores[0] >= self.scores[-1]:
+            raise ValueError("appended scores must be below the lowest score")
+        cumulative = self.total + np.cumsum(counts)
+        self.scores = np.concatenate([self.scores, scores])
+        self.counts = np.concatenate([self.counts, counts])
+        self.highs = np.concatenate([self.highs, highs])
+        self.cumulative = np.concatenate([self.cumulative, cumulative])
+
+    def set_counts(self, scores, counts):
+        """
+        Change the counts of existing rows; cumulative counts are recomputed
+        from the first changed row on.
+        """
+        scores = np.atleast_1d(np.asarray(scores, dtype="int64"))
+        idx = np.searchsorted(-self.scores, -scores)
+        found = idx < len(self.scores)
+        if not found.all() or (self.scores[idx] != scores).any():
+            raise KeyError(f"scores not in the index: {scores.tolist()}")
+        self.counts[idx] = counts
+        first = idx.min()
+        base = self.cumulative[first - 1] if first else 0
+        self.cumulative[first:] = base + np.cumsum(self.counts[first:])
@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+
+# 志愿档位: 冲 (reach), 稳 (match), 保 (safety)
+TIERS = ("冲", "稳", "保")
+DEFAULT_REACH = 0.15
+DEFAULT_SAFETY = 0.15
+
+RESULT_COLUMNS = ["排名", "属性", "院校名称", "最高位次", "最低位次"]
+
+
+def _gather(source, lo, hi):
+    """
+    Concatenate ``source[lo[i]:hi[i]]`` for every i; returns
+    ``(offsets, values)`` with query i's values at ``offsets[i]:offsets[i+1]``.
+    """
+    lengths = np.maximum(hi - lo, 0)
+    offsets = np.r_[0, np.cumsum(lengths)]
+    within = np.arange(offsets[-1]) - np.repeat(offsets[:-1], lengths)
+    return offsets, source[np.repeat(lo, lengths) + within]
+
+
+class RankIntervalIndex:
+    """
+    Interval index over closed rank windows ``[start, end]`` (最高位次 to
+    最低位次 of each university).
+
+    The window boundaries split the rank axis into elementary segments;
+    the intervals covering each segment are stored in CSR form, so a point
+    query is one binary search plus a slice. Overlap queries add a slice of
+    the intervals sorted by start. All queries accept NumPy arrays and
+    return ``(offsets, ids)`` for batches.
+    """
+
+    def __init__(self, starts, ends):
+        self.starts = np.asarray(starts, dtype="int64")
+        self.ends = np.asarray(ends, dtype="int64")
+        if (self.starts > self.ends).any():
+            raise ValueError("every interval needs start <= end")
+
+        # Intervals in start order, so stabbing results come out sorted
+        self.by_start = np.argsort(self.starts, kind="stable")
+        self.sorted_starts = self.starts[self.by_start]
+
+        # Segment j covers [bounds[j], bounds[j + 1])
+        self.bounds = np.unique(np.r_[self.starts, self.ends + 1])
+        first = np.searchsorted(self.bounds, self.starts[self.by_start])
+        last = np.searchsorted(self.bounds, self.ends[self.by_start] + 1)
+        span_offsets, segments = _gather(np.arange(len(self.bounds)), first, last)
+        members = np.repeat(self.by_start, np.diff(span_offsets))
+        order = np.argsort(segments, kind="stable")
+        self.members = members[order]
+        self.segment_offsets = np.r_[
+            0, np.cumsum(np.bincount(segments, minlength=len(self.bounds)))
+        ]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _segment_slices(self, points):
+        segment = np.searchsorted(self.bounds, points, side="right") - 1
+        inside = segment >= 0
+        segment = np.maximum(segment, 0)
+        lo = np.where(inside, self.segment_offsets[segment], 0)
+        hi = np.where(inside, self.segment_offsets[segment + 1], 0)
+        return lo, hi
+
+    def stab(self, points):
+        """Intervals containing each point"""
+        points = np.asarray(points, dtype="int64")
+        lo, hi = self._segment_slices(np.atleast_1d(points))
+        offsets, ids = _gather(self.members, lo, hi)
+        return ids if points.ndim == 0 else (offsets, ids)
+
+    def overlapping(self, low, high):
+        """Intervals intersecting ``[low, high]``"""
+        low, high = np.broadcast_arrays(
+            np.asarray(low, dtype="int64"), np.asarray(high, dtype="int64")
+        )
+        scalar = low.ndim == 0
+        low, high = np.atleast_1d(low), np.atleast_1d(high)
+
+        # Intervals containing ``low``, plus those starting in (low, high];
+        # the two sets are disjoint
+        containing_offsets, containing = _gather(
+            self.members, *self._segment_slices(low)
+        )
+        starting_offsets, starting = _gather(
+            self.by_start,
+            np.searchsorted(self.sorted_starts, low, side="right"),
+            np.searchsorted(self.sorted_starts, high, side="right"),
+        )
+        query = np.r_[
+            np.repeat(np.arange(len(low)), np.diff(containing_offsets)),
+            np.repeat(np.arange(len(low)), np.diff(starting_offsets)),
+        ]
+        order = np.argsort(query, kind="stable")
+        ids = np.r_[containing, starting][order]
+        offsets = np.r_[0, np.cumsum(np.bincount(query, minlength=len(low)))]
+        return ids if scalar else (offsets, ids)
+
+    def tiers(self, ranks, reach=DEFAULT_REACH, safety=DEFAULT_SAFETY):
+        """
+        冲/稳/保 matches for each rank; returns ``(offsets, ids, tier codes)``
+        with codes indexing TIERS.
+
+        稳: the window contains the rank. 冲: the window ends (最低位次) up
+        to ``reach`` × rank above it. 保: the window starts (最高位次) up to
+        ``safety`` × rank below it.
+        """
+        ranks = np.atleast_1d(np.asarray(ranks, dtype="int64"))
+        n = len(ranks)
+
+        near_offsets, near = self.overlapping(
+            ranks - np.ceil(ranks * reach).astype("int64"), ranks - 1
+        )
+        near_query = np.repeat(np.arange(n), np.diff(near_offsets))
+        is_reach = self.ends[near] < ranks[near_query]
+
+        match_offsets, match = self.stab(ranks)
+        safe_offsets, safe = _gather(
+            self.by_start,
+            np.searchsorted(self.sorted_starts, ranks, side="right"),
+            np.searchsorted(
+                self.sorted_starts,
+                ranks + np.ceil(ranks * safety).astype("int64"),
+                side="right",
+            ),
+        )
+
+        query = np.r_[
+            near_query[is_reach],
+            np.repeat(np.arange(n), np.diff(match_offsets)),
+            np.repeat(np.arange(n), np.diff(safe_offsets)),
+        ]
+        ids = np.r_[near[is_reach], match, safe]
+        codes = np.r_[
+            np.zeros(is_reach.sum(), dtype="int8"),
+            np.ones(len(match), dtype="int8"),
+            np.full(len(safe), 2, dtype="int8"),
+        ]
+        order = np.argsort(query, kind="stable")
+        offsets = np.r_[0, np.cumsum(np.bincount(query, minlength=n))]
+        return offsets, ids[order], codes[order]
+
+
+class UniversityRankIndex:
+    """
+    RankIntervalIndex over the university DataFrame's 最高位次/最低位次
+    window columns (see src.analysis.admission.add_cutoff_columns),
+    returning matches as rows with 排名, 属性 and 院校名称.
+    """
+
+    def __init__(self, df):
+        known = df["最高位次"].notna() & df["最低位次"].notna()
+        self.df = df.loc[known].reset_index(drop=True)
+        self.index = RankIntervalIndex(
+            self.df["最高位次"].to_numpy("int64"), self.df["最低位次"].to_numpy("int64")
+        )
+
+    def _rows(self, offsets, ids, ranks):
+        rows = self.df.iloc[ids][
+            [col for col in RESULT_COLUMNS if col in self.df.columns]
+        ].reset_index(drop=True)
+        rows.insert(0, "位次", np.repeat(ranks, np.diff(offsets)))
+        return rows
+
+    def containing(self, ranks):
+        """Universities whose rank window contains each rank"""
+        ranks = np.atleast_1d(np.asarray(ranks, dtype="int64"))
+        offsets, ids = self.index.stab(ranks)
+        return self._rows(offsets, ids, ranks)
+
+    def tiers(self, ranks, reach=DEFAULT_REACH, safety=DEFAULT_SAFETY):
+        """冲/稳/保 recommendations for each rank as one long DataFrame"""
+        ranks = np.atleast_1d(np.asarray(ranks, dtype="int64"))
+        offsets, ids, codes = self.index.tiers(ranks, reach, safety)
+        rows = self._rows(offsets, ids, ranks)
+        rows.insert(1, "档位", pd.Categorical.from_codes(codes, TIERS))
+        return rows
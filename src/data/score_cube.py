@@ -0,0 +1,157 @@
+import argparse
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.data.load_tables import load_score_table
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+MAX_SCORE = 750
+DEFAULT_CUBE_PATH = "data/processed/score_cube"
+
+# (省份, 年份, 科类, 一分一段表) loaded when no --table is given
+DEFAULT_TABLES = [
+    ("四川", 2024, "全部", "data/processed/四川省204年高考一分一段表公布.csv"),
+]
+
+
+class ScoreCube:
+    """
+    Student counts indexed by (province, year, track, score).
+
+    Only the "at least" cumulative counts are stored: ``above[p, y, t, s]``
+    is the number of students scoring ``s`` or more, with one extra zero
+    column so that any score range is the difference of two cells. Range
+    counts and ranks are therefore constant time, and all queries
+    broadcast over NumPy arrays of labels and scores.
+    """
+
+    def __init__(self, provinces, years, tracks, above):
+        self.provinces = pd.Index(provinces)
+        self.years = pd.Index(years)
+        self.tracks = pd.Index(tracks)
+        self.above = above
+        self.max_score = above.shape[-1] - 2
+
+    @classmethod
+    def from_tables(cls, tables, max_score=MAX_SCORE):
+        """
+        Build from ``(province, year, track, df)`` entries, where ``df`` has
+        the ``score`` and ``人数`` columns of load_score_table. Range rows
+        such as "640-750" are counted at their lower bound.
+        """
+        tables = list(tables)
+        provinces = sorted({entry[0] for entry in tables})
+        years = sorted({entry[1] for entry in tables})
+        tracks = sorted({entry[2] for entry in tables})
+        counts = np.zeros(
+            (len(provinces), len(years), len(tracks), max_score + 2), dtype=np.int64
+        )
+        for province, year, track, df in tables:
+            valid = df["score"].notna() & df["人数"].notna()
+            scores = np.clip(df.loc[valid, "score"].to_numpy("int64"), 0, max_score)
+            cell = counts[
+                provinces.index(province), years.index(year), tracks.index(track)
+            ]
+            np.add.at(cell, scores, df.loc[valid, "人数"].to_numpy("int64"))
+        # Reverse cumulative sum along the score axis; the last column stays 0
+        above = np.flip(np.cumsum(np.flip(counts, -1), -1), -1)
+        return cls(provinces, years, tracks, above)
+
+    # Persistence: a raw .npy array plus a JSON sidecar with the axis labels
+
+    def save(self, path=DEFAULT_CUBE_PATH):
+        np.save(f"{path}.npy", self.above)
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "provinces": list(self.provinces),
+                    "years": [int(year) for year in self.years],
+                    "tracks": list(self.tracks),
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+    @classmethod
+    def load(cls, path=DEFAULT_CUBE_PATH, mmap=True):
+        """Open a saved cube; with ``mmap`` processes share the pages read-only"""
+        with open(f"{path}.json", encoding="utf-8") as f:
+            axes = json.load(f)
+        above = np.load(f"{path}.npy", mmap_mode="r" if mmap else None)
+        return cls(axes["provinces"], axes["years"], axes["tracks"], above)
+
+    # Queries
+
+    def _cells(self, province, year, track):
+        """Map labels (scalars or arrays) to axis positions"""
+        positions = []
+        for axis, name, labels in (
+            (self.provinces, "province", province),
+            (self.years, "year", year),
+            (self.tracks, "track", track),
+        ):
+            labels = np.asarray(labels)
+            idx = axis.get_indexer(labels.ravel()).reshape(labels.shape)
+            if (idx < 0).any():
+                missing = labels[idx < 0].ravel()[0]
+                raise KeyError(f"unknown {name}: {missing}")
+            positions.append(idx)
+        return tuple(positions)
+
+    def _above(self, cells, score):
+        score = np.clip(np.asarray(score), 0, self.max_score + 1)
+        return self.above[cells + (score,)]
+
+    def rank(self, province, year, track, score):
+        """Number of students scoring at least ``score`` (位次)"""
+        result = self._above(self._cells(province, year, track), score)
+        return result if np.ndim(result) else int(result)
+
+    def range_count(self, province, year, track, low, high):
+        """Number of students scoring within ``[low, high]``"""
+        cells = self._cells(province, year, track)
+        low, high = np.asarray(low), np.asarray(high)
+        result = np.where(
+            low <= high,
+            self._above(cells, low) - self._above(cells, high + 1),
+            0,
+        )
+        return result if result.ndim else int(result)
+
+    def total(self, province, year, track):
+        return self.rank(province, year, track, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="构建 省份×年份×科类×分数 数据立方体")
+    parser.add_argument(
+        "--table",
+        nargs=4,
+        action="append",
+        metavar=("PROVINCE", "YEAR", "TRACK", "CSV"),
+        help="一分一段表 to include (repeatable)",
+    )
+    parser.add_argument("--output", default=DEFAULT_CUBE_PATH)
+    args = parser.parse_args()
+
+    entries = args.table or DEFAULT_TABLES
+    cube = ScoreCube.from_tables(
+        (province, int(year), track, load_score_table(path))
+        for province, year, track, path in entries
+    )
+    cube.save(args.output)
+    logging.info(
+        f"Saved cube {cube.above.shape} ({cube.above.nbytes / 1024:.0f} KB) "
+        f"to {args.output}.npy"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+# 一分一段表的列名
+SCORE_COL = "分数"
+COUNT_COL = "人数"
+CUMULATIVE_COL = "累计人数"
+SCORE_TABLE_COLUMNS = [SCORE_COL, COUNT_COL, CUMULATIVE_COL]
+
+# 分数标签格式: "639", "649分", "640-750", "650分及以上", "400分以下"
+_LABEL_PATTERN = (
+    r"^\s*(?P<first>\d+)\s*(?:-\s*(?P<second>\d+))?\s*分?\s*(?P<suffix>及?以上|以下)?"
+)
+
+
+def parse_score_labels(labels):
+    """
+    Parse score labels into numeric bounds.
+
+    Returns a DataFrame with float columns ``low``, ``high`` (open ends are
+    -inf/inf, unparseable labels are NaN) and ``score``, the representative
+    score used for plotting: the lower bound, or ``high`` for "以下" rows.
+    """
+    labels = pd.Series(labels)
+    if pd.api.types.is_numeric_dtype(labels):
+        values = labels.astype("float64").to_numpy()
+        return pd.DataFrame(
+            {"low": values, "high": values, "score": values}, index=labels.index
+        )
+
+    parts = labels.astype("string").str.extract(_LABEL_PATTERN)
+    first = pd.to_numeric(parts["first"]).astype("float64").to_numpy()
+    second = pd.to_numeric(parts["second"]).astype("float64").to_numpy()
+    suffix = parts["suffix"].fillna("").to_numpy(dtype=object)
+
+    above = np.isin(suffix, ["以上", "及以上"])
+    below = suffix == "以下"
+    has_second = ~np.isnan(second)
+
+    low = first.copy()
+    high = np.where(has_second, second, first)
+    high[above] = np.inf
+    low[below] = -np.inf
+    high[below] = first[below] - 1
+
+    score = np.where(below, high, low)
+    return pd.DataFrame({"low": low, "high": high, "score": score}, index=labels.index)
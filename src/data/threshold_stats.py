@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+# Offset between datasets in the combined sort key; larger than any score range
+_DATASET_SPAN = 100_000
+
+# 批次 of the median pseudo-line
+MEDIAN_LABEL = "中位数"
+
+SUMMARY_COLUMNS = [
+    "数据集",
+    "批次",
+    "分数线",
+    "分数段",
+    "线上人数",
+    "线上比例",
+    "段内人数",
+    "段内比例",
+    "总人数",
+    "中位数",
+]
+
+
+def compute_threshold_stats(tables):
+    """
+    Students above and between every batch line, for all datasets at once.
+
+    ``tables`` is a list of ``(name, df, thresholds)`` where ``df`` has the
+    ``score`` and ``人数`` columns of load_score_table and ``thresholds`` is a
+    SCORE_THRESHOLDS list. All tables are stacked into one array sorted by
+    (dataset, score descending), so a single cumulative sum and a few binary
+    searches give every line's count; no table is scanned per threshold.
+
+    线上人数 is the number of students scoring at or above the line, i.e. the
+    rank (位次) of the last student on it. 段内人数 counts the students
+    between the line and the next higher line of the same dataset. The
+    median is one of these lines (批次 MEDIAN_LABEL), so the bands on either
+    side of it are split at the median score.
+    """
+    tables = list(tables)
+    frames, lines = [], []
+    for code, (name, df, thresholds) in enumerate(tables):
+        valid = df["score"].notna() & df["人数"].notna()
+        frames.append(
+            pd.DataFrame(
+                {
+                    "code": code,
+                    "score": df.loc[valid, "score"].to_numpy("float64"),
+                    "count": df.loc[valid, "人数"].to_numpy("int64"),
+                }
+            )
+        )
+        lines.extend((code, name, label, score) for score, label, _ in thresholds)
+
+    rows = pd.concat(frames).sort_values(["code", "score"], ascending=[True, False])
+    codes = rows["code"].to_numpy()
+    scores = rows["score"].to_numpy()
+    cumulative = np.cumsum(rows["count"].to_numpy())
+    sort_key = codes * _DATASET_SPAN - scores
+
+    # Students in all earlier datasets, and each dataset's own total
+    datasets = np.arange(len(tables))
+    starts = np.searchsorted(codes, datasets, side="left")
+    ends = np.searchsorted(codes, datasets, side="right")
+    before = np.where(starts > 0, cumulative[starts - 1], 0)
+    totals = np.where(ends > 0, cumulative[ends - 1], 0) - before
+
+    # Median: first row whose cumulative count reaches half the dataset
+    median_rows = np.searchsorted(cumulative, before + totals * 0.5, side="left")
+    medians = scores[np.minimum(median_rows, len(scores) - 1)]
+    # 中位数作为一条伪分数线参与分段（批次线与中位数重合时批次线在前）
+    lines.extend(
+        (code, name, MEDIAN_LABEL, medians[code])
+        for code, (name, _, _) in enumerate(tables)
+        if totals[code] > 0
+    )
+
+    stats = pd.DataFrame(lines, columns=["code", "数据集", "批次", "分数线"])
+    stats["median"] = stats["批次"] == MEDIAN_LABEL
+    stats = stats.sort_values(
+        ["code", "分数线", "median"], ascending=[True, False, True], kind="stable"
+    )
+    line_codes = stats["code"].to_numpy()
+    line_scores = stats["分数线"].to_numpy("float64")
+
+    # Rows with key <= line key: this dataset's rows scoring >= the line
+    positions = np.searchsorted(
+        sort_key, line_codes * _DATASET_SPAN - line_scores, side="right"
+    )
+    above = np.where(positions > 0, cumulative[positions - 1], 0) - before[line_codes]
+
+    # Band between each line and the next higher line of the same dataset
+    first_line = np.r_[True, line_codes[1:] != line_codes[:-1]]
+    higher_above = np.where(first_line, 0, np.r_[0, above[:-1]])
+    higher_score = np.where(first_line, np.nan, np.r_[np.nan, line_scores[:-1]])
+
+    totals = totals[line_codes]
+    stats["分数段"] = [
+        f"≥{low:g}" if np.isnan(high) else f"{low:g}-{high - 1:g}"
+        for low, high in zip(line_scores, higher_score)
+    ]
+    stats["线上人数"] = above
+    stats["线上比例"] = np.round(above / totals * 100, 2)
+    stats["段内人数"] = above - higher_above
+    stats["段内比例"] = np.round((above - higher_above) / totals * 100, 2)
+    stats["总人数"] = totals
+    stats["中位数"] = medians[line_codes]
+    return stats[SUMMARY_COLUMNS].reset_index(drop=True)
+
+
+def threshold_notes(stats, name):
+    """
+    Chart annotations for one dataset: ``{batch label: text}``, plus the
+    median score under MEDIAN_LABEL.
+    """
+    rows = stats[stats["数据集"] == name]
+    notes = {
+        label: f"线上 {percent:.1f}%"
+        for label, percent in zip(rows["批次"], rows["线上比例"])
+        if label != MEDIAN_LABEL
+    }
+    if len(rows):
+        notes[MEDIAN_LABEL] = f"{rows['中位数'].iloc[0]:g}分"
+    return notes
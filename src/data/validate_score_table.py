@@ -0,0 +1,215 @@
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.data.score_table import (
+    COUNT_COL,
+    CUMULATIVE_COL,
+    SCORE_COL,
+    SCORE_TABLE_COLUMNS,
+    parse_score_labels,
+)
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# 校验项及说明
+ISSUE_TYPES = {
+    "bad_label": "分数标签无法解析",
+    "bad_range": "分数区间下限大于上限",
+    "not_decreasing": "分数没有严格递减",
+    "overlap": "分数区间与上一行重叠",
+    "missing_count": "人数缺失",
+    "negative_count": "人数为负数",
+    "non_integer_count": "人数不是整数",
+    "cumulative_mismatch": "累计人数与人数累加和不一致",
+}
+
+ISSUE_COLUMNS = ["row", "issue"] + SCORE_TABLE_COLUMNS + ["expected_cumulative"]
+
+DEFAULT_CHUNKSIZE = 200_000
+
+
+def _initial_state():
+    return {"prev_low": np.nan, "prev_key": np.nan, "running_total": 0.0, "rows": 0}
+
+
+def check_chunk(df, state=None):
+    """
+    Check one chunk of a score table in a single vectorized pass.
+
+    ``state`` carries the previous row and the running count total between
+    chunks, so a large file can be validated piece by piece. Returns the
+    issues found (one row per offending row and issue) and the new state.
+    """
+    missing = [col for col in SCORE_TABLE_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Score table is missing columns: {missing}")
+
+    state = dict(state or _initial_state())
+    n_rows = len(df)
+    if n_rows == 0:
+        return pd.DataFrame(columns=ISSUE_COLUMNS), state
+
+    bounds = parse_score_labels(df[SCORE_COL])
+    low = bounds["low"].to_numpy()
+    high = bounds["high"].to_numpy()
+    key = bounds["score"].to_numpy()
+    prev_low = np.concatenate([[state["prev_low"]], low[:-1]])
+    prev_key = np.concatenate([[state["prev_key"]], key[:-1]])
+
+    counts = pd.to_numeric(df[COUNT_COL], errors="coerce").to_numpy(dtype="float64")
+    cumulative = pd.to_numeric(df[CUMULATIVE_COL], errors="coerce").to_numpy(
+        dtype="float64"
+    )
+    missing_count = np.isnan(counts)
+    running = state["running_total"] + np.cumsum(np.where(missing_count, 0, counts))
+    expected = np.where(missing_count, np.nan, running)
+
+    with np.errstate(invalid="ignore"):
+        not_decreasing = key >= prev_key
+        masks = {
+            "bad_label": np.isnan(key),
+            "bad_range": low > high,
+            "not_decreasing": not_decreasing,
+            "overlap": (high >= prev_low) & ~not_decreasing,
+            # An open "…以下" tail row may have no count (sources often list
+            # it without one); any row after it is flagged as out of order
+            "missing_count": missing_count & ~np.isneginf(low),
+            "negative_count": counts < 0,
+            "non_integer_count": ~missing_count & (counts != np.floor(counts)),
+            "cumulative_mismatch": ~(
+                (np.isnan(cumulative) & np.isnan(expected)) | (cumulative == expected)
+            ),
+        }
+
+    issue_names = list(masks)
+    positions, issue_idx = np.nonzero(np.column_stack(list(masks.values())))
+    issues = pd.DataFrame(
+        {
+            "row": state["rows"] + positions,
+            "issue": np.asarray(issue_names, dtype=object)[issue_idx],
+            SCORE_COL: df[SCORE_COL].to_numpy()[positions],
+            COUNT_COL: counts[positions],
+            CUMULATIVE_COL: cumulative[positions],
+            "expected_cumulative": expected[positions],
+        },
+        columns=ISSUE_COLUMNS,
+    )
+
+    state.update(
+        prev_low=low[-1],
+        prev_key=key[-1],
+        running_total=running[-1],
+        rows=state["rows"] + n_rows,
+    )
+    return issues, state
+
+
+def validate_score_table(df):
+    """Validate an in-memory score table and return the offending rows"""
+    issues, _ = check_chunk(df)
+    return issues
+
+
+def validate_score_csv(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Validate a score table CSV chunk by chunk without loading it whole"""
+    state = None
+    found = []
+    reader = pd.read_csv(path, chunksize=chunksize, dtype={SCORE_COL: "string"})
+    for chunk in reader:
+        issues, state = check_chunk(chunk, state)
+        if len(issues):
+            found.append(issues)
+    if not found:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    return pd.concat(found, ignore_index=True)
+
+
+def repair_score_table(df):
+    """
+    Recompute 累计人数 as the cumulative sum of 人数.
+
+    Rows whose 人数 is missing keep a missing 累计人数; integral count columns
+    are stored as nullable integers instead of floats.
+    """
+    df = df.copy()
+    counts = pd.to_numeric(df[COUNT_COL], errors="coerce")
+    cumulative = counts.fillna(0).cumsum().where(counts.notna())
+
+    if (counts.dropna() % 1 == 0).all():
+        counts = counts.astype("Int64")
+        cumulative = cumulative.astype("Int64")
+    df[COUNT_COL] = counts
+    df[CUMULATIVE_COL] = cumulative
+    return df
+
+
+def log_issues(issues, name, limit=20):
+    """Log a summary of validation issues with the first offending rows"""
+    if issues.empty:
+        logging.info(f"{name}: score table passed validation")
+        return
+    summary = ", ".join(
+        f"{ISSUE_TYPES[issue]}×{count}"
+        for issue, count in issues["issue"].value_counts().items()
+    )
+    logging.warning(f"{name}: {len(issues)} validation issues ({summary})")
+    for record in issues.head(limit).itertuples(index=False):
+        logging.warning(
+            f"  row {record.row}: {ISSUE_TYPES[record.issue]} "
+            f"({SCORE_COL}={record[2]}, {COUNT_COL}={record[3]}, "
+            f"{CUMULATIVE_COL}={record[4]}, expected={record[5]})"
+        )
+
+
+def validate_stage(df, name="score table", repair=True, strict=False):
+    """
+    Pipeline stage run on every ingested score table.
+
+    Logs offending rows, repairs cumulative counts when ``repair`` is set and
+    raises ``ValueError`` if ``strict`` and issues remain afterwards.
+    """
+    issues = validate_score_table(df)
+    log_issues(issues, name)
+
+    if repair and (issues["issue"] == "cumulative_mismatch").any():
+        df = repair_score_table(df)
+        issues = validate_score_table(df)
+        logging.info(
+            f"{name}: recomputed {CUMULATIVE_COL}, {len(issues)} issues remain"
+        )
+
+    if strict and not issues.empty:
+        raise ValueError(f"{name}: {len(issues)} validation issues remain")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="校验一分一段表的一致性")
+    parser.add_argument("paths", nargs="+", help="score table CSV files")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument(
+        "--repair", action="store_true", help="recompute 累计人数 and rewrite the file"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.paths:
+        issues = validate_score_csv(path, chunksize=args.chunksize)
+        log_issues(issues, path)
+        if args.repair and (issues["issue"] == "cumulative_mismatch").any():
+            df = repair_score_table(pd.read_csv(path, dtype={SCORE_COL: "string"}))
+            df.to_csv(path, index=False, encoding="utf-8")
+            issues = validate_score_csv(path, chunksize=args.chunksize)
+            logging.info(f"{path}: repaired, {len(issues)} issues remain")
+        failed = failed or not issues.empty
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
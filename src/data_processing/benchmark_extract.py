@@ -0,0 +1,92 @@
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from src.data_processing import extract_table
+
+SAMPLE_FILE = "data/raw/四川省204年高考一分一段表公布.html"
+
+# 待比较的提取函数名称
+EXTRACTORS = (
+    "extract_table_data_text",
+    "extract_table_data_regex",
+    "extract_table_data",
+)
+
+
+def write_large_html(path, size_mb, sample_file=SAMPLE_FILE):
+    """Write an HTML file of about ``size_mb`` MB by repeating the sample rows"""
+    with open(sample_file, "rb") as f:
+        sample = f.read()
+    body = sample[sample.index(b"<tr") : sample.rindex(b"</tr>") + len(b"</tr>")]
+    target = size_mb * 1024 * 1024
+    with open(path, "wb") as f:
+        f.write(b"<html><body><table><tbody>\n")
+        written = 0
+        while written < target:
+            f.write(body)
+            written += len(body)
+        f.write(b"\n</tbody></table></body></html>\n")
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run(name, path, results):
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    rows = len(getattr(extract_table, name)(path))
+    elapsed = time.perf_counter() - start
+    results.put((name, rows, elapsed, _peak_rss_mb() - baseline))
+
+
+def benchmark(path, extractors=EXTRACTORS):
+    """Run each extractor in a fresh process; returns one dict per extractor"""
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    context = multiprocessing.get_context("spawn")
+    reports = []
+    for name in extractors:
+        results = context.Queue()
+        process = context.Process(target=_run, args=(name, path, results))
+        process.start()
+        name, rows, elapsed, rss = results.get()
+        process.join()
+        reports.append(
+            {
+                "extractor": name,
+                "rows": rows,
+                "seconds": elapsed,
+                "mb_per_second": size_mb / elapsed,
+                "peak_rss_mb": rss,
+            }
+        )
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML 表格提取性能对比")
+    parser.add_argument("--size-mb", type=int, default=300)
+    parser.add_argument("--input", help="existing HTML file instead of a generated one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.input
+        if path is None:
+            path = os.path.join(tmp_dir, "large.html")
+            write_large_html(path, args.size_mb)
+        print(f"{path}: {os.path.getsize(path) / 1024 / 1024:.0f} MB")
+        for report in benchmark(path):
+            print(
+                f"{report['extractor']:<26} {report['rows']} rows  "
+                f"{report['seconds']:.2f}s  {report['mb_per_second']:.0f} MB/s  "
+                f"peak RSS +{report['peak_rss_mb']:.0f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
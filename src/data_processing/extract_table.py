@@ -1,8 +1,387 @@
+import argparse
 import re
 import csv
+import codecs
+import glob
+import html
+import json
+import mmap
+import os
 
+import pandas as pd
 
-def extract_table_data(html_file):
+from src.data.validate_score_table import validate_stage
+
+# Byte-level patterns, matched directly against the memory-mapped file
+TR_PATTERN = re.compile(rb"<tr[^>]*>.*?</tr>", re.DOTALL)
+TD_PATTERN = re.compile(rb"<td[^>]*>(.*?)</td>")
+
+# Tags that drive the table parser's state machine, and comment openings
+STRUCTURE_TAG_PATTERN = re.compile(
+    rb"<(/?)(td|th|tr|table|thead|tbody|tfoot|script|style)\b([^>]*)>|<!--",
+    re.IGNORECASE,
+)
+SPAN_PATTERN = re.compile(rb"""(row|col)span\s*=\s*["']?(\d+)""", re.IGNORECASE)
+BREAK_TAG_PATTERN = re.compile(rb"<(?:br|/p|/div|/li)\b[^>]*>", re.IGNORECASE)
+INLINE_TAG_PATTERN = re.compile(rb"<!--.*?-->|<[^>]*>", re.DOTALL)
+MAX_SPAN = 1000
+
+# Same tokens, but a whole row of text-only cells is matched as one token
+# (group 1): <tr ...> (<td ...>text</td>)+ </tr>
+ROW_OR_TAG_PATTERN = re.compile(
+    rb"(<tr\b[^>]*>\s*(?:<t[dh]\b[^>]*>[^<]*</t[dh]>\s*)+</tr>)|"
+    + STRUCTURE_TAG_PATTERN.pattern,
+    re.IGNORECASE,
+)
+PLAIN_CELL_PATTERN = re.compile(rb"<t[dh]\b[^>]*>\s*([^<]*?)\s*<", re.IGNORECASE)
+# Cell bytes that need more than an ASCII decode
+PLAIN_CLEANUP_PATTERN = re.compile(rb"[&\n\t\x80-\xff]|  ")
+
+# Encoding detection
+META_CHARSET_PATTERN = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?([A-Za-z0-9_.:-]+)""", re.IGNORECASE
+)
+NON_ASCII_PATTERN = re.compile(rb"[\x80-\xff]")
+META_SCAN_BYTES = 64 * 1024
+SAMPLE_BYTES = 64 * 1024
+
+
+def _normalize_encoding(name):
+    """Codec name for a declared charset; GB2312/GBK map to their superset GB18030"""
+    try:
+        name = codecs.lookup(name).name
+    except LookupError:
+        return None
+    if name in ("gb2312", "gbk", "gb18030"):
+        return "gb18030"
+    # Byte-level scanning needs an ASCII-compatible encoding
+    if name.startswith(("utf-16", "utf-32")):
+        return None
+    return name
+
+
+def detect_encoding(path):
+    """
+    Detect a page's encoding without reading the whole file; returns
+    ``(encoding, source)`` where source is "bom", "sample", "meta" or
+    "ascii".
+
+    A bounded sample starting at the first non-ASCII byte decides between
+    UTF-8 and the rest: valid UTF-8 wins even over a stale meta charset
+    (saved pages are often re-encoded but keep their original meta tag);
+    otherwise the meta charset is used, defaulting to GB18030.
+    """
+    with open(path, "rb") as f:
+        head = f.read(META_SCAN_BYTES)
+        if head.startswith(codecs.BOM_UTF8):
+            return "utf-8-sig", "bom"
+        if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            raise ValueError(f"UTF-16 files are not supported: {path}")
+        match = META_CHARSET_PATTERN.search(head)
+        declared = (
+            _normalize_encoding(match.group(1).decode("ascii")) if match else None
+        )
+
+        if not head:
+            return "utf-8", "ascii"
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            first = NON_ASCII_PATTERN.search(mapped)
+            if first is None:
+                return declared or "utf-8", "meta" if declared else "ascii"
+            sample = mapped[first.start() : first.start() + SAMPLE_BYTES]
+
+    try:
+        # final=False tolerates a character cut off at the end of the sample
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8", "sample"
+    except UnicodeDecodeError:
+        if declared and declared != "utf-8":
+            return declared, "meta"
+        return "gb18030", "sample"
+
+
+class _Table:
+    """Parser state of one open table"""
+
+    __slots__ = ("number", "row", "spans", "cell_start", "cell_attrs", "parts", "carry")
+
+    def __init__(self, number):
+        self.number = number
+        self.row = None  # texts of the open row's cells, None when no row is open
+        self.spans = None  # (rowspan, colspan) per cell, None while all are 1
+        self.cell_start = None  # content offset of the open cell
+        self.cell_attrs = b""
+        self.parts = None  # cell content before a nested table
+        self.carry = {}  # column -> [rows remaining, text] of active rowspans
+
+    def close_cell(self, data, end, encoding):
+        if self.cell_start is None and self.parts is None:
+            return
+        raw = data[self.cell_start : end] if self.cell_start is not None else b""
+        if self.parts:
+            raw = b"".join(self.parts) + raw
+        self.row.append(_cell_text(raw, encoding))
+        if b"span" in self.cell_attrs:
+            spans = dict(
+                (name.lower(), min(max(int(value), 1), MAX_SPAN))
+                for name, value in SPAN_PATTERN.findall(self.cell_attrs)
+            )
+            if self.spans is None:
+                self.spans = [(1, 1)] * (len(self.row) - 1)
+            self.spans.append((spans.get(b"row", 1), spans.get(b"col", 1)))
+        elif self.spans is not None:
+            self.spans.append((1, 1))
+        self.cell_start = None
+        self.parts = None
+
+    def close_row(self, data, end, encoding):
+        """Close the open row; returns its cells expanded to grid columns"""
+        self.close_cell(data, end, encoding)
+        cells, spans = self.row, self.spans
+        self.row = self.spans = None
+        if cells is None or (not cells and not self.carry):
+            return None
+        if spans is None and not self.carry:
+            return cells
+
+        # Expand colspans and carry rowspans from earlier rows into the grid
+        carry, self.carry = self.carry, {}
+        out = []
+
+        def place_carried():
+            while len(out) in carry:
+                remaining, text = carry.pop(len(out))
+                if remaining > 1:
+                    self.carry[len(out)] = [remaining - 1, text]
+                out.append(text)
+
+        for text, (rowspan, colspan) in zip(cells, spans or [(1, 1)] * len(cells)):
+            place_carried()
+            for _ in range(colspan):
+                if rowspan > 1:
+                    self.carry[len(out)] = [rowspan - 1, text]
+                out.append(text)
+        # Rowspans right of this row's last cell (gaps stay empty; columns a
+        # colspan already covered are dropped)
+        for column in sorted(carry):
+            if column >= len(out):
+                out.extend([""] * (column - len(out)))
+                remaining, text = carry[column]
+                if remaining > 1:
+                    self.carry[column] = [remaining - 1, text]
+                out.append(text)
+        return out
+
+
+def _cell_text(raw, encoding):
+    """Visible text of a cell's raw content"""
+    if b"<" in raw:
+        raw = INLINE_TAG_PATTERN.sub(b"", BREAK_TAG_PATTERN.sub(b" ", raw))
+    text = raw.decode(encoding)
+    if "&" in text:
+        text = html.unescape(text)
+    if "\n" in text or "\t" in text or "  " in text:
+        text = " ".join(text.split())
+    return text.strip()
+
+
+def _plain_cells(raw_cells, encoding):
+    """Cell texts of a plain row; the general cleanup only when needed"""
+    joined = b"\0".join(raw_cells)
+    if PLAIN_CLEANUP_PATTERN.search(joined):
+        return [_cell_text(raw, encoding) for raw in raw_cells]
+    # ASCII only and already stripped by PLAIN_CELL_PATTERN
+    return joined.decode("ascii").split("\0")
+
+
+def _parse_tables(data, encoding):
+    """
+    Single pass over the table-structure tags of ``data``; yields
+    ``(table number, row)`` as each row closes.
+
+    Only table, row and cell tags (plus comments, scripts and styles, which
+    are skipped) are tokenized, so the scan is linear in the document size.
+    Plain rows (text-only cells, no spans) are matched whole by one bounded
+    pattern instead of tag by tag. Omitted end tags are closed implicitly,
+    rows outside any <table> form an implicit table, and nested tables are
+    numbered separately from the table whose cell contains them.
+    """
+    stack = []
+    count = 0
+    pos = 0
+    # Plain rows that still need spans applied are re-read tag by tag
+    tags_until = 0
+    search_row_or_tag = ROW_OR_TAG_PATTERN.search
+    search_tag = STRUCTURE_TAG_PATTERN.search
+    find_plain_cells = PLAIN_CELL_PATTERN.findall
+    while True:
+        if pos < tags_until:
+            match = search_tag(data, pos)
+            plain = None
+            if match is not None:
+                closing, name, attrs = match.groups()
+        else:
+            match = search_row_or_tag(data, pos)
+            if match is not None:
+                plain, closing, name, attrs = match.groups()
+        if match is None:
+            break
+        start, pos = match.span()
+
+        if plain is not None:
+            if not stack:
+                count += 1
+                stack.append(_Table(count))
+            table = stack[-1]
+            if table.row is not None:
+                row = table.close_row(data, start, encoding)
+                if row:
+                    yield table.number, row
+            if table.carry or data.find(b"span", start, pos) >= 0:
+                tags_until, pos = pos, start
+                continue
+            yield table.number, _plain_cells(
+                find_plain_cells(data, start, pos), encoding
+            )
+            continue
+
+        if name is None:
+            # Comment: skip to its end
+            end = data.find(b"-->", pos)
+            pos = len(data) if end < 0 else end + 3
+            continue
+        name = name.lower()
+        table = stack[-1] if stack else None
+
+        if name == b"td" or name == b"th":
+            if table is None or table.row is None:
+                if closing:
+                    continue
+                if table is None:
+                    count += 1
+                    table = _Table(count)
+                    stack.append(table)
+                table.row = []
+            table.close_cell(data, start, encoding)
+            if not closing:
+                table.cell_start = match.end()
+                table.cell_attrs = attrs
+        elif name == b"tr":
+            if table is None:
+                if closing:
+                    continue
+                count += 1
+                table = _Table(count)
+                stack.append(table)
+            row = table.close_row(data, start, encoding)
+            if row:
+                yield table.number, row
+            if not closing:
+                table.row = []
+        elif name == b"table":
+            if not closing:
+                if table is not None and table.cell_start is not None:
+                    # Keep the outer cell's text before the nested table
+                    table.parts = (table.parts or []) + [data[table.cell_start : start]]
+                    table.cell_start = None
+                count += 1
+                stack.append(_Table(count))
+            elif table is not None:
+                row = table.close_row(data, start, encoding)
+                if row:
+                    yield table.number, row
+                stack.pop()
+                if stack and stack[-1].parts is not None:
+                    stack[-1].cell_start = match.end()
+        elif name in (b"script", b"style"):
+            if not closing:
+                end = re.compile(rb"</" + name + rb"\s*>", re.IGNORECASE).search(
+                    data, pos
+                )
+                pos = len(data) if end is None else end.end()
+        elif table is not None:
+            # thead/tbody/tfoot boundaries close the open row
+            row = table.close_row(data, start, encoding)
+            if row:
+                yield table.number, row
+
+    # Close everything left open at the end of the document
+    while stack:
+        table = stack.pop()
+        row = table.close_row(data, len(data), encoding)
+        if row:
+            yield table.number, row
+
+
+def iter_tables(html_file, encoding=None):
+    """
+    Stream ``(table number, row)`` for every table row of a page, with
+    rowspan/colspan cells repeated across the grid positions they cover.
+
+    The file is memory-mapped and scanned as bytes, so the document is
+    never decoded or copied as a whole; only cell contents are decoded,
+    with ``encoding`` or the detected encoding. Tag bytes never occur
+    inside GBK/GB18030 multi-byte characters, so the byte scan is safe for
+    those pages too.
+    """
+    if encoding is None:
+        encoding, _ = detect_encoding(html_file)
+    with open(html_file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from _parse_tables(mapped, encoding)
+
+
+def extract_tables(html_file, encoding=None):
+    """Every table of a page as a rectangular list of rows, in document order"""
+    tables = {}
+    for number, row in iter_tables(html_file, encoding):
+        tables.setdefault(number, []).append(row)
+    result = []
+    for number in sorted(tables):
+        rows = tables[number]
+        width = max(len(row) for row in rows)
+        result.append([row + [""] * (width - len(row)) for row in rows])
+    return result
+
+
+def select_table(tables, columns=("分数", "人数")):
+    """
+    Index of the first table whose header row has all ``columns`` (the
+    score table among layout or notes tables), else of the first table.
+    """
+    for i, table in enumerate(tables):
+        if set(columns) <= set(table[0]):
+            return i
+    return 0
+
+
+def iter_table_rows(html_file, encoding=None):
+    """Yield the cleaned cells of every table row, across all tables"""
+    for _, row in iter_tables(html_file, encoding):
+        yield row
+
+
+def extract_table_data(html_file, encoding=None):
+    return [row for _, row in iter_tables(html_file, encoding)]
+
+
+def extract_table_data_regex(html_file, encoding="utf-8"):
+    """Byte-regex extraction over the mapped file; kept for benchmarks"""
+    data = []
+    with open(html_file, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for row in TR_PATTERN.finditer(mapped):
+                # Search the row's span in place instead of slicing it out
+                cells = TD_PATTERN.findall(mapped, row.start(), row.end())
+                if cells:
+                    data.append([cell.decode(encoding).strip() for cell in cells])
+    return data
+
+
+def extract_table_data_text(html_file):
+    """Text-mode extraction (decodes the whole file first); kept for benchmarks"""
     with open(html_file, "r", encoding="utf-8") as f:
         content = f.read()
 
@@ -27,16 +406,58 @@ def save_to_csv(data, output_file):
         writer.writerows(data)
 
 
-def main():
-    input_file = "table.html"
-    output_file = "score_distribution.csv"
+def extract_file(input_file, output_dir):
+    """Extract, validate and save one page; returns its batch report entry"""
+    encoding, source = detect_encoding(input_file)
 
-    # Extract data from HTML table
-    data = extract_table_data(input_file)
+    # Extract every HTML table; the score table is validated
+    tables = extract_tables(input_file, encoding)
+    if not tables:
+        raise ValueError(f"No table found in {input_file}")
+    main_table = select_table(tables)
+    data = tables[main_table]
+    df = pd.DataFrame(data[1:], columns=data[0])
+    df = validate_stage(df, name=input_file)
 
-    # Save to CSV
-    save_to_csv(data, output_file)
+    # Save to CSV; other tables of the page go to <name>_<n>.csv
+    name = os.path.splitext(os.path.basename(input_file))[0]
+    output_file = os.path.join(output_dir, f"{name}.csv")
+    df.to_csv(output_file, index=False, encoding="utf-8")
     print(f"Data has been successfully extracted and saved to {output_file}")
+    extra_files = []
+    for i, table in enumerate(tables):
+        if i != main_table:
+            extra_files.append(os.path.join(output_dir, f"{name}_{i + 1}.csv"))
+            save_to_csv(table, extra_files[-1])
+    return {
+        "input": input_file,
+        "output": output_file,
+        "encoding": encoding,
+        "encoding_source": source,
+        "rows": len(df),
+        "tables": len(tables),
+        "extra_tables": extra_files,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从 HTML 页面提取表格")
+    parser.add_argument(
+        "paths", nargs="*", help="HTML pages (default: data/raw/*.html)"
+    )
+    parser.add_argument("--output-dir", default="output/extracted")
+    parser.add_argument("--report", default="extract_report.json")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    report = [
+        extract_file(path, args.output_dir)
+        for path in args.paths or sorted(glob.glob("data/raw/*.htm*"))
+    ]
+    report_path = os.path.join(args.output_dir, args.report)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Batch report saved to {report_path}")
 
 
 if __name__ == "__main__":
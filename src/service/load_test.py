@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import itertools
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# 默认请求组合: 位次查询为主，夹杂图表请求
+DEFAULT_PATHS = [
+    "/rank?dataset=gaokao&score=539",
+    "/rank?dataset=gaokao&score=459,539,600",
+    "/score?dataset=gaokao&rank=15000",
+    "/rank?dataset=zhongkao&score=545",
+    "/score?dataset=zhongkao&rank=5000",
+    "/chart?dataset=gaokao&variant=thumbnail&dpi=72",
+    "/chart?dataset=zhongkao&variant=preview&dpi=100&lod=1",
+]
+
+
+async def _request(reader, writer, host, path):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(host, port, paths, latencies, errors, budget):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            if next(budget) is None:
+                break
+            start = time.perf_counter()
+            try:
+                status = await _request(reader, writer, host, path)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                errors.append(path)
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(path)
+    finally:
+        writer.close()
+
+
+async def run_load_test(url, total_requests, concurrency, paths):
+    """Issue ``total_requests`` over ``concurrency`` keep-alive connections"""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    # Shared countdown: yields None once the request budget is spent
+    budget = itertools.chain(range(total_requests), itertools.repeat(None))
+    latencies, errors = [], []
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _client(
+                host,
+                port,
+                itertools.cycle(paths[i % len(paths) :] + paths[: i % len(paths)]),
+                latencies,
+                errors,
+                budget,
+            )
+            for i in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    # 所有请求都失败时没有延迟可统计
+    p50, p99, slowest = (
+        (*np.percentile(latencies_ms, [50, 99]), latencies_ms.max())
+        if len(latencies_ms)
+        else (np.nan, np.nan, np.nan)
+    )
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": float(p50),
+        "p99_ms": float(p99),
+        "max_ms": float(slowest),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="位次查询与图表服务压测")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--path", action="append", dest="paths")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run_load_test(
+            args.url, args.requests, args.concurrency, args.paths or DEFAULT_PATHS
+        )
+    )
+    print(
+        f"{report['requests']} requests ({report['errors']} errors) in "
+        f"{report['seconds']:.2f}s: {report['requests_per_second']:.0f} req/s, "
+        f"p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, "
+        f"max {report['max_ms']:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
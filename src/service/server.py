@@ -0,0 +1,336 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from src.config.chart_config import load_config
+from src.data.load_tables import load_score_table
+from src.data.rank_index import RankIndex
+from src.visualization import middle_school_score_distribution_plot as middle_school
+from src.visualization.distribution_renderer import create_distribution_figure
+from src.visualization.export import RASTER_VARIANTS, figure_to_bytes
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# 数据集: id -> (数据文件, 加载函数); the id names the chart config dataset
+DATASETS = {
+    "gaokao": (
+        "data/processed/四川省204年高考一分一段表公布.csv",
+        load_score_table,
+    ),
+    "zhongkao": (
+        "data/processed/中考分数分布数据.csv",
+        middle_school.load_middle_school_table,
+    ),
+}
+
+CONTENT_TYPES = {"PNG": "image/png", "WEBP": "image/webp"}
+DPI_RANGE = (30, 300)
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+# Request bodies up to this size are read and dropped; the connection is
+# closed after larger, chunked or unframed bodies instead
+MAX_DISCARD_BYTES = 64 * 1024
+
+# Tables loaded once per render worker process
+_worker_tables = {}
+
+
+def _init_worker():
+    for dataset, (path, loader) in DATASETS.items():
+        _worker_tables[dataset] = loader(path)
+
+
+def _render_chart(dataset, variant, lod, dpi):
+    """Render one chart in a worker process and return the encoded bytes"""
+    chart = load_config().distribution(dataset)
+    fig = create_distribution_figure(_worker_tables[dataset], chart, lod, dpi)
+    return figure_to_bytes(fig, variant, dpi, facecolor=chart.background_color)
+
+
+class LRUBytesCache:
+    """In-memory LRU cache of encoded images bounded by total size"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        self.entries[key] = value
+        self.size += len(value)
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ChartService:
+    """
+    Serves rank lookups and distribution charts over HTTP.
+
+    Score tables and rank indexes stay resident in memory; charts are
+    rendered in a process pool and kept in an LRU cache of encoded images.
+    Concurrent requests for the same chart share one render.
+    """
+
+    def __init__(self, workers=None, cache_bytes=DEFAULT_CACHE_BYTES):
+        # Validated before any worker starts; forked workers inherit it
+        self.config = load_config()
+        self.tables = {}
+        self.indexes = {}
+        for dataset, (path, loader) in DATASETS.items():
+            self.tables[dataset] = loader(path)
+            self.indexes[dataset] = RankIndex.from_table(self.tables[dataset])
+        self.cache = LRUBytesCache(cache_bytes)
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        self.inflight = {}
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    # Routes
+
+    def _index(self, query):
+        dataset = query.get("dataset", [None])[0]
+        if dataset not in self.indexes:
+            raise HTTPError(404, f"unknown dataset: {dataset}")
+        return dataset, self.indexes[dataset]
+
+    @staticmethod
+    def _int_list(query, name):
+        try:
+            return [int(value) for value in query[name][0].split(",")]
+        except (KeyError, ValueError):
+            raise HTTPError(400, f"'{name}' must be a comma-separated list of integers")
+
+    def rank(self, query):
+        dataset, index = self._index(query)
+        scores = self._int_list(query, "score")
+        return {
+            "dataset": dataset,
+            "total": index.total,
+            "scores": scores,
+            "ranks": [int(rank) for rank in index.rank_for_score(scores)],
+        }
+
+    def score(self, query):
+        dataset, index = self._index(query)
+        ranks = self._int_list(query, "rank")
+        return {
+            "dataset": dataset,
+            "total": index.total,
+            "ranks": ranks,
+            "scores": [int(score) for score in index.score_for_rank(ranks)],
+        }
+
+    async def chart(self, query):
+        dataset, _ = self._index(query)
+        variant = query.get("variant", ["full"])[0]
+        if variant not in RASTER_VARIANTS:
+            raise HTTPError(400, f"unknown variant: {variant}")
+        try:
+            dpi = int(query.get("dpi", ["150"])[0])
+        except ValueError:
+            raise HTTPError(400, "'dpi' must be an integer")
+        if not DPI_RANGE[0] <= dpi <= DPI_RANGE[1]:
+            raise HTTPError(400, f"'dpi' must be within {DPI_RANGE}")
+        lod = query.get("lod", ["0"])[0] in ("1", "true")
+
+        key = (dataset, variant, lod, dpi)
+        body = self.cache.get(key)
+        cache_status = "hit"
+        if body is None:
+            cache_status = "miss"
+            future = self.inflight.get(key)
+            if future is None:
+                loop = asyncio.get_running_loop()
+                future = loop.run_in_executor(
+                    self.pool, _render_chart, dataset, variant, lod, dpi
+                )
+                self.inflight[key] = future
+                future.add_done_callback(lambda _: self.inflight.pop(key, None))
+            body = await asyncio.shield(future)
+            self.cache.put(key, body)
+        content_type = CONTENT_TYPES[RASTER_VARIANTS[variant][1]]
+        return body, content_type, {"X-Cache": cache_status}
+
+    async def dispatch(self, method, target):
+        """Return (status, content type, body, extra headers)"""
+        if method != "GET":
+            raise HTTPError(405, "only GET is supported")
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        if url.path == "/chart":
+            body, content_type, headers = await self.chart(query)
+            return 200, content_type, body, headers
+        routes = {
+            "/rank": self.rank,
+            "/score": self.score,
+            "/datasets": lambda _: {
+                dataset: {
+                    "title": self.config.distribution(dataset).title,
+                    "total": self.indexes[dataset].total,
+                }
+                for dataset in DATASETS
+            },
+            "/stats": lambda _: {"chart_cache": self.cache.stats()},
+        }
+        if url.path not in routes:
+            raise HTTPError(404, f"no route for {url.path}")
+        payload = routes[url.path](query)
+        return 200, "application/json", _json_bytes(payload), {}
+
+    # HTTP/1.1 connection handling
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                # Only GET is served, but a body sent with any request must
+                # be consumed so the next request line is read correctly
+                framed = await _discard_body(reader, headers)
+
+                parts = request_line.decode("latin-1").split()
+                version = parts[2] if len(parts) == 3 else "HTTP/1.0"
+                try:
+                    if len(parts) != 3:
+                        raise HTTPError(400, "malformed request line")
+                    status, content_type, body, extra = await self.dispatch(
+                        parts[0], parts[1]
+                    )
+                except HTTPError as e:
+                    status, content_type, extra = e.status, "application/json", {}
+                    body = _json_bytes({"error": str(e)})
+                except Exception:
+                    logging.exception(f"Error handling {request_line!r}")
+                    status, content_type, extra = 500, "application/json", {}
+                    body = _json_bytes({"error": "internal server error"})
+
+                keep_alive = (
+                    framed
+                    and version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                response_headers = {
+                    "Content-Type": content_type,
+                    "Content-Length": str(len(body)),
+                    "Connection": "keep-alive" if keep_alive else "close",
+                    **extra,
+                }
+                head = f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n" + "".join(
+                    f"{name}: {value}\r\n" for name, value in response_headers.items()
+                )
+                writer.write(head.encode("latin-1") + b"\r\n" + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _discard_body(reader, headers):
+    """
+    Read and drop the request body; False if it cannot be skipped (chunked,
+    invalid or over MAX_DISCARD_BYTES) and the connection must be closed.
+    """
+    if "transfer-encoding" in headers:
+        return False
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        return False
+    if not 0 <= length <= MAX_DISCARD_BYTES:
+        return False
+    if length:
+        await reader.readexactly(length)
+    return True
+
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+def _json_bytes(payload):
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+async def serve(host, port, workers=None, cache_bytes=DEFAULT_CACHE_BYTES):
+    service = ChartService(workers=workers, cache_bytes=cache_bytes)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    logging.info(f"Serving on http://{host}:{port} (pid {os.getpid()})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="一分一段位次查询与图表服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--cache-mb", type=float, default=DEFAULT_CACHE_BYTES / 1024 / 1024
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(
+            serve(args.host, args.port, args.workers, int(args.cache_mb * 1024 * 1024))
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,543 @@
+import argparse
+import io
+import logging
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.transforms import Bbox
+from PIL import Image, ImageChops
+
+from src.config.chart_config import load_config
+from src.visualization.distribution_renderer import (
+    calculate_percentile_score,
+    create_distribution_figure,
+)
+from src.visualization.render_charts import DISTRIBUTION_CHARTS, OUTPUT_DIR
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# 动画参数
+DEFAULT_DPI = 60
+DEFAULT_FPS = 12
+DEFAULT_TRANSITION_FRAMES = 12  # 相邻两年之间的插值帧数
+DEFAULT_HOLD = 1.0  # 每个年份停留的秒数
+FORMATS = {"apng": ".png", "gif": ".gif"}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def score_grid(tables):
+    """Every integer score from the lowest to the highest in any table"""
+    low = min(int(df["score"].min()) for _, df in tables)
+    high = max(int(df["score"].max()) for _, df in tables)
+    return np.arange(low, high + 1)
+
+
+def _cdf(df, grid):
+    """
+    Share of students below each knot ``grid[0] .. grid[-1] + 1``, with each
+    score's students spread evenly over [score, score + 1).
+    """
+    valid = df["score"].notna() & df["人数"].notna()
+    counts = np.bincount(
+        df.loc[valid, "score"].to_numpy("int64") - grid[0],
+        weights=df.loc[valid, "人数"].to_numpy("float64"),
+        minlength=len(grid),
+    )
+    cumulative = np.concatenate([[0.0], np.cumsum(counts)])
+    return cumulative / cumulative[-1], cumulative[-1]
+
+
+def _quantiles(cdf, knots, shares):
+    """
+    Left and right limits of the quantile function at each of ``shares``;
+    they differ where scores nobody got make the CDF flat (a jump in the
+    quantile function).
+    """
+    inner = np.interp(shares, cdf, knots)
+    first = np.searchsorted(cdf, shares, side="left")
+    last = np.searchsorted(cdf, shares, side="right") - 1
+    first_hit = cdf[np.minimum(first, len(cdf) - 1)] == shares
+    last_hit = cdf[np.maximum(last, 0)] == shares
+    left = np.where(first_hit, knots[np.minimum(first, len(cdf) - 1)], inner)
+    right = np.where(last_hit, knots[np.maximum(last, 0)], inner)
+    return left, right
+
+
+def interpolate_distribution(before, after, grid, t):
+    """
+    The score table a share ``t`` of the way from ``before`` to ``after``.
+
+    Quantiles are interpolated rather than counts (displacement
+    interpolation), so a distribution that moves up the scale slides
+    instead of fading out in one place and in at another. The total is
+    interpolated linearly and the counts are rounded on the cumulative
+    scale, so they always sum to the total; ``t`` of 0 or 1 gives back the
+    year's own counts. Returns a table in the load_score_table layout
+    (descending ``score``, ``人数``, ``累计人数``).
+    """
+    knots = np.append(grid, grid[-1] + 1).astype("float64")
+    cdf_before, total_before = before
+    cdf_after, total_after = after
+    # Both quantile functions are piecewise linear between their CDF knots,
+    # so on the union of the knots their interpolation is exact
+    shares = np.union1d(cdf_before, cdf_after)
+    left_before, right_before = _quantiles(cdf_before, knots, shares)
+    left_after, right_after = _quantiles(cdf_after, knots, shares)
+    quantiles = np.column_stack(
+        [
+            (1 - t) * left_before + t * left_after,
+            (1 - t) * right_before + t * right_after,
+        ]
+    ).ravel()
+    cdf = np.interp(knots, quantiles, np.repeat(shares, 2))
+    total = (1 - t) * total_before + t * total_after
+    above = np.rint(total * (1 - cdf))  # students at or above each knot
+    counts = (above[:-1] - above[1:]).astype("int32")[::-1]
+    return pd.DataFrame(
+        {
+            "score": grid[::-1],
+            "人数": counts,
+            "累计人数": np.cumsum(counts, dtype="int32"),
+        }
+    )
+
+
+def frame_plan(years, transition_frames, fps, hold):
+    """
+    (year before, year after, t, duration in ms) per frame: each year is
+    held for ``hold`` seconds, then ``transition_frames`` frames move it
+    towards the next year.
+    """
+    step = round(1000 / fps)
+    frames = []
+    for before, after in zip(years[:-1], years[1:]):
+        frames.append((before, after, 0.0, round(hold * 1000)))
+        frames.extend(
+            (before, after, i / (transition_frames + 1), step)
+            for i in range(1, transition_frames + 1)
+        )
+    frames.append((years[-2], years[-1], 1.0, round(hold * 1000)))
+    return frames
+
+
+class FrameTemplate:
+    """
+    One distribution figure reused for every frame a worker renders: the
+    bar widths, median line and title are updated in place and the figure
+    saved again, so frames skip figure construction. Every frame is
+    cropped to one box (the tight box of the figure under each of
+    ``titles``), so all frames have the same size.
+    """
+
+    def __init__(self, df, chart, dpi, max_count, titles):
+        self.chart = chart
+        self.dpi = dpi
+        self.fig = create_distribution_figure(df, chart, dpi=dpi, max_count=max_count)
+        self.ax = self.fig.axes[0]
+        # Right and left halves of the symmetric bars, one bar per table row
+        self.bars = [
+            (direction, container.patches)
+            for direction, container in zip((1, -1), self.ax.containers)
+        ]
+        self.median_line = next(
+            line for line in self.ax.lines if line.get_gid() == "median"
+        )
+        self.median_text = next(
+            text for text in self.ax.texts if text.get_gid() == "median"
+        )
+
+        renderer = FigureCanvasAgg(self.fig).get_renderer()
+        boxes = []
+        for title in titles:
+            self.ax.title.set_text(title)
+            boxes.append(self.fig.get_tightbbox(renderer))
+        # savefig's default padding around a tight box
+        self.bbox = Bbox.union(boxes).padded(0.1)
+
+    def render(self, df, title):
+        """Draw the frame for ``df`` and return it as PNG bytes"""
+        counts = df["人数"].to_numpy("float64")
+        for direction, patches in self.bars:
+            for patch, count in zip(patches, counts):
+                patch.set_width(direction * count)
+        median = calculate_percentile_score(df, 50)
+        self.median_line.set_ydata([median, median])
+        self.median_text.set_y(median + self.chart.style["text_y_offset"])
+        self.ax.title.set_text(title)
+
+        buffer = io.BytesIO()
+        self.fig.savefig(
+            buffer,
+            format="png",
+            dpi=self.dpi,
+            bbox_inches=self.bbox,
+            facecolor=self.chart.background_color,
+            pil_kwargs={"compress_level": 0},
+        )
+        buffer.seek(0)
+        # APNG frames must share one header, so always plain RGB
+        image = Image.open(buffer).convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+
+# Per worker process: interpolation inputs and the figure template
+_worker = {}
+
+
+def _init_worker(dataset, cdfs, grid, dpi, max_count, frames):
+    chart = load_config().distribution(dataset)
+    first = next(iter(cdfs.values()))
+    df = interpolate_distribution(first, first, grid, 0.0)
+    titles = {_frame_title(chart.title, *frame[:3]) for frame in frames}
+    _worker.update(
+        chart=chart,
+        cdfs=cdfs,
+        grid=grid,
+        template=FrameTemplate(df, chart, dpi, max_count, sorted(titles)),
+    )
+
+
+def _frame_title(title, before, after, t):
+    if t == 0:
+        return f"{title} {before}"
+    if t == 1:
+        return f"{title} {after}"
+    return f"{title} {before}→{after}"
+
+
+def _render_frame(frame):
+    before, after, t, _ = frame
+    df = interpolate_distribution(
+        _worker["cdfs"][before], _worker["cdfs"][after], _worker["grid"], t
+    )
+    title = _frame_title(_worker["chart"].title, before, after, t)
+    return _worker["template"].render(df, title)
+
+
+def _ordered(pool, function, items, window):
+    """Like pool.map, but with at most ``window`` results pending at once"""
+    pending = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(function, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _chunks(png):
+    """(type, data) of every chunk of a PNG file"""
+    if not png.startswith(PNG_SIGNATURE):
+        raise ValueError("Not a PNG image")
+    offset = len(PNG_SIGNATURE)
+    while offset < len(png):
+        (length,) = struct.unpack(">I", png[offset : offset + 4])
+        chunk_type = png[offset + 4 : offset + 8]
+        yield chunk_type, png[offset + 8 : offset + 8 + length]
+        offset += 12 + length
+
+
+class APNGWriter:
+    """
+    Streams PNG frames into an animated PNG: each frame is written as soon
+    as it is added, so memory use does not grow with the number of frames.
+
+    Frame 0 keeps its IDAT chunks (it is also the still image shown by
+    viewers without APNG support); later frames become fdAT chunks. Every
+    frame must have the same header (size, color type, bit depth).
+    """
+
+    def __init__(self, path, n_frames, loops=0):
+        self.path = path
+        self.n_frames = n_frames
+        self.loops = loops
+        self.header = None
+        self.sequence = 0
+        self.frames = 0
+        self.tmp_path = f"{path}.tmp"
+        self.file = open(self.tmp_path, "wb")
+
+    def _chunk(self, chunk_type, data):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(chunk_type + data)
+        self.file.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+    def _next_sequence(self):
+        self.sequence += 1
+        return struct.pack(">I", self.sequence - 1)
+
+    def add_frame(self, png, duration_ms):
+        if self.frames >= self.n_frames:
+            raise ValueError(f"APNG declared with {self.n_frames} frames")
+        chunks = list(_chunks(png))
+        header = next(data for chunk_type, data in chunks if chunk_type == b"IHDR")
+        if self.header is None:
+            self.header = header
+            self.file.write(PNG_SIGNATURE)
+            self._chunk(b"IHDR", header)
+            self._chunk(b"acTL", struct.pack(">II", self.n_frames, self.loops))
+        elif header != self.header:
+            raise ValueError("APNG frames must share size, color type and bit depth")
+
+        width, height = struct.unpack(">II", header[:8])
+        self._chunk(
+            b"fcTL",
+            self._next_sequence()
+            # size, offset, delay (numerator/denominator), dispose and blend op
+            + struct.pack(">IIIIHHBB", width, height, 0, 0, duration_ms, 1000, 0, 0),
+        )
+        for chunk_type, data in chunks:
+            if chunk_type != b"IDAT":
+                continue
+            if self.frames == 0:
+                self._chunk(b"IDAT", data)
+            else:
+                self._chunk(b"fdAT", self._next_sequence() + data)
+        self.frames += 1
+
+    def close(self):
+        if self.frames != self.n_frames:
+            self.file.close()
+            os.remove(self.tmp_path)
+            raise ValueError(f"Wrote {self.frames} of {self.n_frames} APNG frames")
+        self._chunk(b"IEND", b"")
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+
+def write_apng(path, frames, durations):
+    """Write PNG frames (an iterable of bytes) to ``path`` as they arrive"""
+    writer = APNGWriter(path, len(durations))
+    for png, duration in zip(frames, durations):
+        writer.add_frame(png, duration)
+    writer.close()
+
+
+def _gif_sub_blocks_end(gif, offset):
+    """Offset just past the data sub-blocks starting at ``offset``"""
+    while gif[offset]:
+        offset += gif[offset] + 1
+    return offset + 1
+
+
+def _gif_frame(gif):
+    """
+    (color table, descriptor flags, LZW data) of a single-frame GIF, with
+    the color table global or local
+    """
+    flags = gif[10]
+    offset = 13
+    color_table = b""
+    if flags & 0x80:
+        color_table = gif[offset : offset + (3 << ((flags & 0x07) + 1))]
+        offset += len(color_table)
+    # Extension blocks are Pillow's own; the writer adds its own control block
+    while gif[offset] == 0x21:
+        offset = _gif_sub_blocks_end(gif, offset + 2)
+    if gif[offset] != 0x2C:
+        raise ValueError("Not a single-frame GIF image")
+    flags = gif[offset + 9]
+    offset += 10
+    if flags & 0x80:
+        color_table = gif[offset : offset + (3 << ((flags & 0x07) + 1))]
+        offset += len(color_table)
+    # LZW minimum code size, then the data sub-blocks
+    end = _gif_sub_blocks_end(gif, offset + 1)
+    return color_table, flags & 0x40, gif[offset:end]
+
+
+class GIFWriter:
+    """
+    Streams PNG frames into an animated GIF, like APNGWriter: each frame is
+    quantized and written as soon as it is added, so only the previous
+    frame is kept in memory.
+
+    After the first frame, only the area that changed since the previous
+    frame is encoded and drawn over it (disposal method 1). Every frame is
+    quantized by Pillow and carries its palette as a local color table.
+    """
+
+    def __init__(self, path, loops=0):
+        self.path = path
+        self.loops = loops
+        self.previous = None
+        self.tmp_path = f"{path}.tmp"
+        self.file = open(self.tmp_path, "wb")
+
+    def add_frame(self, png, duration_ms):
+        image = Image.open(io.BytesIO(png)).convert("RGB")
+        if self.previous is None:
+            box = (0, 0) + image.size
+            # Logical screen without a global color table, then the
+            # NETSCAPE2.0 extension with the loop count
+            self.file.write(b"GIF89a" + struct.pack("<HHBBB", *image.size, 0, 0, 0))
+            self.file.write(
+                b"\x21\xff\x0bNETSCAPE2.0\x03\x01"
+                + struct.pack("<H", self.loops)
+                + b"\x00"
+            )
+        elif image.size != self.previous.size:
+            raise ValueError("GIF frames must share one size")
+        else:
+            box = ImageChops.difference(image, self.previous).getbbox() or (0, 0, 1, 1)
+        self.previous = image
+
+        buffer = io.BytesIO()
+        image.crop(box).save(buffer, format="GIF")
+        color_table, interlace, data = _gif_frame(buffer.getvalue())
+        # Graphic control extension: disposal method 1, delay in 1/100 s
+        self.file.write(
+            b"\x21\xf9\x04"
+            + struct.pack("<BHBB", 1 << 2, round(duration_ms / 10), 0, 0)
+        )
+        flags = interlace
+        if color_table:
+            flags |= 0x80 | ((len(color_table) // 3).bit_length() - 2)
+        left, top, right, bottom = box
+        self.file.write(
+            b"\x2c"
+            + struct.pack("<HHHHB", left, top, right - left, bottom - top, flags)
+        )
+        self.file.write(color_table + data)
+
+    def close(self):
+        if self.previous is None:
+            self.file.close()
+            os.remove(self.tmp_path)
+            raise ValueError("No GIF frames written")
+        self.file.write(b"\x3b")
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+
+def write_gif(path, frames, durations):
+    """Write PNG frames to ``path`` as an animated GIF as they arrive"""
+    writer = GIFWriter(path)
+    for png, duration in zip(frames, durations):
+        writer.add_frame(png, duration)
+    writer.close()
+
+
+def animate_distribution(
+    tables,
+    output_path,
+    dataset="gaokao",
+    output_format="apng",
+    dpi=DEFAULT_DPI,
+    fps=DEFAULT_FPS,
+    transition_frames=DEFAULT_TRANSITION_FRAMES,
+    hold=DEFAULT_HOLD,
+    workers=None,
+):
+    """
+    Render the year-over-year animation of the ``(year, df)`` tables.
+
+    Frames are interpolated and rendered in a process pool (one figure
+    template per worker) and written in order as they complete, with only
+    a small window of frames in flight. Returns a report dict.
+    """
+    tables = sorted(tables, key=lambda entry: entry[0])
+    years = [year for year, _ in tables]
+    if len(years) < 2 or len(set(years)) != len(years):
+        raise ValueError("Need tables for at least two different years")
+
+    grid = score_grid(tables)
+    cdfs = {year: _cdf(df, grid) for year, df in tables}
+    frames = frame_plan(years, transition_frames, fps, hold)
+    # One count axis for all frames; an interpolated distribution can peak
+    # above both years, and interpolation is cheap next to rendering
+    max_count = max(
+        int(interpolate_distribution(cdfs[a], cdfs[b], grid, t)["人数"].max())
+        for a, b, t, _ in frames
+    )
+    durations = [duration for *_, duration in frames]
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    workers = workers or os.cpu_count()
+    writer = write_apng if output_format == "apng" else write_gif
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(dataset, cdfs, grid, dpi, max_count, frames),
+    ) as pool:
+        writer(
+            output_path, _ordered(pool, _render_frame, frames, 2 * workers), durations
+        )
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "output": output_path,
+        "format": output_format,
+        "years": years,
+        "frames": len(frames),
+        "bytes": os.path.getsize(output_path),
+        "seconds": elapsed,
+        "workers": workers,
+    }
+    logging.info(
+        f"Animation saved to {os.path.abspath(output_path)}: {len(frames)} frames, "
+        f"{report['bytes'] / 1024:.0f} KB in {elapsed:.1f}s on {workers} workers"
+    )
+    return report
+
+
+def main():
+    loaders = {
+        module.DATASET: loader for _, _, module, loader, _ in DISTRIBUTION_CHARTS
+    }
+    parser = argparse.ArgumentParser(description="生成逐年分数分布变化动画")
+    parser.add_argument(
+        "--table",
+        nargs=2,
+        action="append",
+        required=True,
+        metavar=("YEAR", "CSV"),
+        help="一分一段表 of one year (repeat for each year)",
+    )
+    parser.add_argument("--dataset", default="gaokao", choices=list(loaders))
+    parser.add_argument("--format", default="apng", choices=list(FORMATS))
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS)
+    parser.add_argument(
+        "--transition-frames", type=int, default=DEFAULT_TRANSITION_FRAMES
+    )
+    parser.add_argument("--hold", type=float, default=DEFAULT_HOLD)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if len({year for year, _ in args.table}) < 2:
+        parser.error("--table is needed for at least two different years")
+    chart = load_config().distribution(args.dataset)
+    output = args.output or os.path.join(
+        OUTPUT_DIR, f"{chart.title}动画{FORMATS[args.format]}"
+    )
+    tables = [(int(year), loaders[args.dataset](path)) for year, path in args.table]
+    animate_distribution(
+        tables,
+        output,
+        dataset=args.dataset,
+        output_format=args.format,
+        dpi=args.dpi,
+        fps=args.fps,
+        transition_frames=args.transition_frames,
+        hold=args.hold,
+        workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
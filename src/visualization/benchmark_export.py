@@ -0,0 +1,118 @@
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.config.chart_config import load_config
+from src.data.load_tables import load_score_table
+from src.visualization.distribution_renderer import create_distribution_figure
+from src.visualization.export import (
+    RASTER_VARIANTS,
+    export_figure,
+    pyramid_level,
+    render_to_buffer,
+    save_image,
+)
+
+DATA_PATH = "data/processed/四川省204年高考一分一段表公布.csv"
+PNG_LEVELS = (1, 3, 6, 9)
+
+
+def _encode(image, image_format, options):
+    buffer = io.BytesIO()
+    start = time.perf_counter()
+    save_image(image, buffer, image_format, options)
+    return buffer.getvalue(), time.perf_counter() - start
+
+
+def _max_error(encoded, reference):
+    """Largest per-channel difference between a decoded variant and its level"""
+    from PIL import Image
+
+    decoded = np.asarray(Image.open(io.BytesIO(encoded)).convert("RGB"), dtype=int)
+    return int(np.abs(decoded - np.asarray(reference, dtype=int)).max())
+
+
+def benchmark(dpi=300, variants=None):
+    """
+    Render the 高考 chart once and encode every raster variant serially
+    (bytes, encode time, max pixel error against the unquantized level),
+    sweep the zlib level of the full PNG and time the parallel export of
+    all variants. Returns (variant rows, level rows, parallel seconds).
+    """
+    variants = variants or list(RASTER_VARIANTS)
+    chart = load_config().distribution("gaokao")
+    fig = create_distribution_figure(load_score_table(DATA_PATH), chart, dpi=dpi)
+    image = render_to_buffer(fig, dpi=dpi, facecolor=chart.background_color)
+
+    levels = {}
+    rows = []
+    for name in variants:
+        _, image_format, max_width, options = RASTER_VARIANTS[name]
+        if max_width not in levels:
+            levels[max_width] = pyramid_level(image, max_width)
+        level = levels[max_width]
+        encoded, seconds = _encode(level, image_format, options)
+        rows.append(
+            {
+                "variant": name,
+                "size": f"{level.width}x{level.height}",
+                "bytes": len(encoded),
+                "seconds": seconds,
+                "max_error": _max_error(encoded, level),
+            }
+        )
+
+    full = levels.get(None) or pyramid_level(image)
+    png_levels = []
+    for compress_level in PNG_LEVELS:
+        encoded, seconds = _encode(full, "PNG", {"compress_level": compress_level})
+        png_levels.append(
+            {"level": compress_level, "bytes": len(encoded), "seconds": seconds}
+        )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start = time.perf_counter()
+        export_figure(
+            fig,
+            os.path.join(tmp_dir, "chart"),
+            variants=variants,
+            dpi=dpi,
+            facecolor=chart.background_color,
+        )
+        parallel_seconds = time.perf_counter() - start
+    return rows, png_levels, parallel_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图片输出变体的体积与编码耗时")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument(
+        "--variants", nargs="+", choices=list(RASTER_VARIANTS), default=None
+    )
+    args = parser.parse_args()
+
+    rows, png_levels, parallel_seconds = benchmark(args.dpi, args.variants)
+    for row in rows:
+        print(
+            f"{row['variant']:<14} {row['size']:>10}  "
+            f"{row['bytes'] / 1024:8.1f} KB  {row['seconds'] * 1000:7.1f} ms  "
+            f"max error {row['max_error']}"
+        )
+    for row in png_levels:
+        print(
+            f"full PNG zlib level {row['level']}: {row['bytes'] / 1024:8.1f} KB  "
+            f"{row['seconds'] * 1000:7.1f} ms"
+        )
+    serial = sum(row["seconds"] for row in rows)
+    print(
+        f"render + parallel export of {len(rows)} variants: "
+        f"{parallel_seconds:.2f}s (serial encoding alone: {serial:.2f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
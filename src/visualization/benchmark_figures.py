@@ -0,0 +1,100 @@
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from src.analysis.ranking import RankingEngine
+from src.data.load_tables import compact_university_table
+from src.visualization.university_data_analysis import (
+    build_university_data,
+    ratio_bar_chart_spec,
+    university_table_spec,
+    validate_spec,
+)
+
+# 表格单元格数量
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+def synthetic_universities(n_rows, seed=0):
+    """The university rows tiled to ``n_rows`` with jittered 本科生 (benchmark only)"""
+    base = build_university_data()
+    repeats = -(-n_rows // len(base))
+    df = pd.concat([base] * repeats, ignore_index=True).iloc[:n_rows].copy()
+    copy_number = (df.index // len(base)).astype(str)
+    df["院校名称"] = df["院校名称"].astype(str) + copy_number
+    df["排名"] = np.arange(1, n_rows + 1)
+    rng = np.random.default_rng(seed)
+    df["本科生"] = np.rint(df["本科生"] * rng.uniform(0.8, 1.2, n_rows)).astype(int)
+    df["研本比"] = np.round(df["硕博合计"] / df["本科生"], 2)
+    return compact_university_table(df)
+
+
+def _best_time(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def benchmark(n_cells, repeat=3):
+    """
+    Build the table and bar chart for about ``n_cells`` table cells with the
+    validated object API and as plain specs; returns one dict per figure.
+    """
+    df = synthetic_universities(max(n_cells // len(build_university_data().columns), 1))
+    engine = RankingEngine(df)
+    builders = {
+        "university_table": lambda: university_table_spec(df, engine),
+        "ratio_chart": lambda: ratio_bar_chart_spec(df, len(df), engine=engine),
+    }
+
+    reports = []
+    for name, build in builders.items():
+        object_seconds, fig = _best_time(lambda: validate_spec(build()), repeat)
+        spec_seconds, spec = _best_time(build, repeat)
+        object_json_seconds, object_json = _best_time(lambda: pio.to_json(fig), repeat)
+        spec_json_seconds, spec_json = _best_time(
+            lambda: pio.to_json(spec, validate=False), repeat
+        )
+        reports.append(
+            {
+                "figure": name,
+                "cells": len(df)
+                * (len(df.columns) if name == "university_table" else 1),
+                "object_seconds": object_seconds,
+                "spec_seconds": spec_seconds,
+                "object_json_seconds": object_json_seconds,
+                "spec_json_seconds": spec_json_seconds,
+                # Key order differs; the figures themselves must not
+                "identical": json.loads(object_json) == json.loads(spec_json),
+            }
+        )
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="plotly 图表构建性能对比")
+    parser.add_argument("--cells", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for n_cells in args.cells:
+        for report in benchmark(n_cells, args.repeat):
+            print(
+                f"{report['figure']:<17} {report['cells']:>7} cells  "
+                f"build: object {report['object_seconds'] * 1000:8.1f} ms, "
+                f"spec {report['spec_seconds'] * 1000:7.1f} ms  "
+                f"to_json: object {report['object_json_seconds'] * 1000:7.1f} ms, "
+                f"spec {report['spec_json_seconds'] * 1000:7.1f} ms  "
+                f"{'identical' if report['identical'] else 'DIFFERENT'} JSON"
+            )
+
+
+if __name__ == "__main__":
+    main()
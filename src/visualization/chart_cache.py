@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from importlib import metadata
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = "output/.chart_cache"
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+
+# Libraries whose versions affect the rendered output
+RENDER_LIBRARIES = ("matplotlib", "plotly", "kaleido", "pillow", "pandas", "numpy")
+
+
+def library_versions():
+    versions = {}
+    for name in RENDER_LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def hash_frame(df):
+    """Content hash of a DataFrame (values, index, column names and dtypes)"""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(
+        repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode()
+    )
+    return digest.hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chart_key(**parts):
+    """
+    Cache key for a chart: a hash of its inputs (data hash, style settings,
+    thresholds, render options) together with the library versions.
+    """
+    payload = dict(parts, libraries=library_versions())
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _link_or_copy(src, dst):
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class ChartCache:
+    """
+    Content-addressed store of rendered chart files.
+
+    Each entry is a directory named after the chart key holding one file
+    per output. Hits hard-link (or copy) the cached files to the requested
+    paths; entries are evicted least recently used first once the cache
+    grows past ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    @staticmethod
+    def _entry_name(name, target):
+        return name + os.path.splitext(target)[1]
+
+    def fetch(self, key, targets):
+        """Restore cached files to ``targets`` (name -> path); False on a miss"""
+        entry = self._entry_dir(key)
+        cached = {
+            name: os.path.join(entry, self._entry_name(name, path))
+            for name, path in targets.items()
+        }
+        if not all(os.path.exists(path) for path in cached.values()):
+            return False
+        for name, path in targets.items():
+            _link_or_copy(cached[name], path)
+        os.utime(entry)  # mark as recently used
+        return True
+
+    def store(self, key, targets):
+        """Add freshly rendered ``targets`` to the cache under ``key``"""
+        entry = self._entry_dir(key)
+        tmp_entry = f"{entry}.tmp{os.getpid()}"
+        os.makedirs(tmp_entry, exist_ok=True)
+        for name, path in targets.items():
+            _link_or_copy(path, os.path.join(tmp_entry, self._entry_name(name, path)))
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp_entry, entry)
+        self.evict()
+
+    def get_or_render(self, key, targets, render):
+        """
+        Restore ``targets`` from the cache or call ``render()`` to produce them.
+
+        Returns True on a cache hit.
+        """
+        if self.fetch(key, targets):
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        # Remove stale outputs first: they may be hard links into other entries
+        for path in targets.values():
+            if os.path.lexists(path):
+                os.remove(path)
+        render()
+        self.store(key, targets)
+        return False
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(path) or ".tmp" in name:
+                continue
+            size = sum(
+                entry.stat().st_size for entry in os.scandir(path) if entry.is_file()
+            )
+            entries.append((os.stat(path).st_mtime, size, path))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits ``max_bytes``"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "cache_bytes": self.size(),
+            "max_bytes": self.max_bytes,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def log_stats(self):
+        stats = self.stats()
+        logging.info(
+            f"Chart cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate), {stats['evictions']} evictions, "
+            f"{stats['cache_bytes'] / 1024 / 1024:.1f} MB used"
+        )
+        return stats
@@ -0,0 +1,370 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+import plotly
+
+from src.analysis.ranking import DERIVED_METRICS, RankingEngine
+from src.config.chart_config import load_config
+from src.data.threshold_stats import compute_threshold_stats
+from src.visualization.render_charts import DISTRIBUTION_CHARTS
+from src.visualization.score_binning import bar_layout
+from src.visualization.university_data_analysis import build_university_data
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DASHBOARD_DIR = "output/dashboard"
+SHARD_DIR = "shards"
+PLOTLY_ASSET = "assets/plotly.min.js"
+
+# 每个分布图的元数据: 考试 / 省份 / 年份
+DATASET_INFO = {
+    "高考分数分布图": {"exam": "高考", "province": "四川", "year": 2024},
+    "中考分数分布图": {"exam": "中考", "province": None, "year": None},
+}
+# Bars per distribution shard; thresholds and the median start their own bin
+DASHBOARD_MAX_BINS = 150
+
+# 院校排名指标
+RANKING_METRICS = list(DERIVED_METRICS) + ["硕博合计", "本科生"]
+RANKING_COLUMNS = ["排名", "属性", "院校名称"]
+
+
+def _columns(df):
+    """Column-oriented JSON-ready dict (missing values become null)"""
+    return {
+        col: df[col].astype(object).where(df[col].notna(), None).tolist()
+        for col in df.columns
+    }
+
+
+def distribution_shards(stats=None):
+    """
+    Yield (view, payload) per distribution dataset: the binned bars, the
+    batch line statistics and the median.
+    """
+    config = load_config()
+    tables = [
+        (name, loader(data_path), config.distribution(module.DATASET))
+        for name, data_path, module, loader, _ in DISTRIBUTION_CHARTS
+    ]
+    if stats is None:
+        stats = compute_threshold_stats(
+            (name, df, chart.thresholds) for name, df, chart in tables
+        )
+    for name, df, chart in tables:
+        info = DATASET_INFO.get(name, {"exam": name, "province": None, "year": None})
+        lines = stats[stats["数据集"] == name]
+        median = float(lines["中位数"].iloc[0]) if len(lines) else None
+        keep = [score for score, _, _ in chart.thresholds]
+        if median is not None:
+            keep.append(median)
+        bars = bar_layout(df, DASHBOARD_MAX_BINS, keep_scores=keep)
+
+        colors = {label: color for _, label, color in chart.thresholds}
+        thresholds = lines.drop(columns=["数据集"]).assign(
+            颜色=lines["批次"].map(colors)
+        )
+        view = dict(
+            info,
+            id="-".join(
+                str(part)
+                for part in ("distribution", *info.values())
+                if part is not None
+            ),
+            kind="distribution",
+            title=name,
+        )
+        yield view, {
+            "title": name,
+            "bars": _columns(bars[["center", "height", "人数", "累计人数"]]),
+            "thresholds": _columns(thresholds),
+            "median": median,
+            "total": int(df["人数"].sum()),
+            "style": {
+                key: chart.style[key] for key in ("background_color", "text_color")
+            },
+        }
+
+
+def ranking_shards(df=None):
+    """Yield (view, payload) per university metric: the full ranking"""
+    df = build_university_data() if df is None else df
+    engine = RankingEngine(df)
+    for metric in RANKING_METRICS:
+        ranked = engine.top_k(metric, len(engine.df))
+        view = {
+            "id": f"ranking-{metric}",
+            "kind": "ranking",
+            "metric": metric,
+            "title": f"院校{metric}排名",
+        }
+        yield view, {
+            "title": view["title"],
+            "metric": metric,
+            "rows": _columns(ranked[RANKING_COLUMNS + [metric]]),
+            "mean": float(np.nanmean(engine.values(metric))),
+        }
+
+
+def write_shard(output_dir, payload):
+    """
+    Write one gzip-compressed JSON shard named by its content hash (so it
+    can be cached forever); returns its path relative to ``output_dir``,
+    its size and its uncompressed size.
+    """
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    data = gzip.compress(encoded.encode("utf-8"), compresslevel=9, mtime=0)
+    name = f"{hashlib.sha256(data).hexdigest()[:16]}.json.gz"
+    path = os.path.join(output_dir, SHARD_DIR, name)
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(data)
+    return f"{SHARD_DIR}/{name}", len(data), len(encoded.encode("utf-8"))
+
+
+def _copy_plotly(output_dir):
+    source = os.path.join(
+        os.path.dirname(plotly.__file__), "package_data", "plotly.min.js"
+    )
+    target = os.path.join(output_dir, PLOTLY_ASSET)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if not os.path.exists(target) or os.path.getsize(target) != os.path.getsize(source):
+        shutil.copyfile(source, target)
+
+
+def build_dashboard(output_dir=DASHBOARD_DIR, plotly_src=None):
+    """
+    Write the static dashboard: one shard per view, ``manifest.json``
+    listing the views and ``index.html``. Shards no longer referenced are
+    removed. Returns the manifest.
+    """
+    os.makedirs(os.path.join(output_dir, SHARD_DIR), exist_ok=True)
+    views = []
+    for view, payload in (*distribution_shards(), *ranking_shards()):
+        view["shard"], view["bytes"], view["raw_bytes"] = write_shard(
+            output_dir, payload
+        )
+        views.append(view)
+
+    referenced = {os.path.basename(view["shard"]) for view in views}
+    for name in os.listdir(os.path.join(output_dir, SHARD_DIR)):
+        if name not in referenced:
+            os.remove(os.path.join(output_dir, SHARD_DIR, name))
+
+    if plotly_src is None:
+        _copy_plotly(output_dir)
+        plotly_src = PLOTLY_ASSET
+    manifest = {
+        "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "plotly": plotly_src,
+        "views": views,
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    with open(os.path.join(output_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(DASHBOARD_HTML)
+    return manifest
+
+
+# 前端页面: 只加载清单，选中视图时才获取对应分片并按需加载 plotly.js
+DASHBOARD_HTML = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>高考数据看板</title>
+<style>
+  body { font-family: "PingFang SC", "Microsoft YaHei", sans-serif; margin: 0; color: #2F4F4F; }
+  header { display: flex; gap: 12px; align-items: center; padding: 12px 20px; background: #002060; color: white; }
+  header h1 { font-size: 18px; margin: 0 16px 0 0; }
+  select { font-size: 14px; padding: 4px; }
+  #status { margin-left: auto; font-size: 12px; opacity: 0.8; }
+  #chart { height: calc(100vh - 60px); }
+</style>
+</head>
+<body>
+<header>
+  <h1>高考数据看板</h1>
+  <select id="kind"><option value="distribution">分数分布</option><option value="ranking">院校排名</option></select>
+  <span id="filters"></span>
+  <span id="status"></span>
+</header>
+<div id="chart"></div>
+<script>
+const FILTERS = { distribution: ["exam", "province", "year"], ranking: ["metric"] };
+const LABELS = { exam: "考试", province: "省份", year: "年份", metric: "指标" };
+const shards = new Map();  // shard path -> Promise of payload
+let manifest, plotlyReady;
+
+function loadPlotly() {
+  plotlyReady = plotlyReady || new Promise((resolve, reject) => {
+    const script = document.createElement("script");
+    script.src = manifest.plotly;
+    script.onload = resolve;
+    script.onerror = reject;
+    document.head.appendChild(script);
+  });
+  return plotlyReady;
+}
+
+async function fetchShard(path) {
+  if (!shards.has(path)) {
+    const payload = fetch(path).then(async (response) => {
+      if (!response.ok) throw new Error(`${path}: HTTP ${response.status}`);
+      const bytes = new Uint8Array(await response.arrayBuffer());
+      // Servers that add Content-Encoding: gzip hand over the JSON already inflated
+      if (bytes[0] !== 0x1f || bytes[1] !== 0x8b) return JSON.parse(new TextDecoder().decode(bytes));
+      const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"));
+      return JSON.parse(await new Response(stream).text());
+    });
+    payload.catch(() => shards.delete(path));  // retry on the next selection
+    shards.set(path, payload);
+  }
+  return shards.get(path);
+}
+
+function label(value) { return value === null ? "未注明" : String(value); }
+
+function renderFilters() {
+  const kind = document.getElementById("kind").value;
+  const container = document.getElementById("filters");
+  const previous = {};
+  container.querySelectorAll("select").forEach((s) => { previous[s.name] = s.value; });
+  container.innerHTML = "";
+  for (const field of FILTERS[kind]) {
+    const select = document.createElement("select");
+    select.name = field;
+    select.title = LABELS[field];
+    const values = [...new Set(manifest.views.filter((v) => v.kind === kind).map((v) => label(v[field])))];
+    for (const value of values) select.add(new Option(value, value));
+    if (values.includes(previous[field])) select.value = previous[field];
+    select.onchange = () => show(field);
+    container.appendChild(select);
+  }
+}
+
+function selectedView(changed) {
+  const kind = document.getElementById("kind").value;
+  const selects = document.querySelectorAll("#filters select");
+  const chosen = {};
+  selects.forEach((s) => { chosen[s.name] = s.value; });
+  const candidates = manifest.views.filter((v) => v.kind === kind);
+  const exact = candidates.find((v) => FILTERS[kind].every((f) => label(v[f]) === chosen[f]));
+  if (exact) return exact;
+  // No view has this combination: keep the field just changed and move the others
+  const view = candidates.find((v) => changed && label(v[changed]) === chosen[changed]) || candidates[0];
+  if (view) selects.forEach((s) => { s.value = label(view[s.name]); });
+  return view;
+}
+
+function distributionFigure(data) {
+  const bars = data.bars, lines = data.thresholds;
+  // The median row only splits the bands; it is drawn separately below
+  const drawn = lines["批次"].map((_, i) => i).filter((i) => lines["批次"][i] !== "中位数");
+  const shapes = drawn.map((i) => ({
+    type: "line", xref: "paper", x0: 0, x1: 1, y0: lines["分数线"][i], y1: lines["分数线"][i],
+    line: { color: lines["颜色"][i], width: 2, dash: "dash" },
+  }));
+  const annotations = drawn.map((i) => ({
+    xref: "paper", x: 1, y: lines["分数线"][i], xanchor: "right", yanchor: "bottom", showarrow: false,
+    text: `${lines["批次"][i]} ${lines["分数线"][i]}分 · 线上 ${lines["线上比例"][i].toFixed(1)}%`,
+    font: { color: lines["颜色"][i] },
+  }));
+  if (data.median !== null) {
+    shapes.push({ type: "line", xref: "paper", x0: 0, x1: 1, y0: data.median, y1: data.median,
+                  line: { color: data.style.text_color, width: 1, dash: "dot" } });
+    annotations.push({ xref: "paper", x: 0, y: data.median, xanchor: "left", yanchor: "bottom",
+                       showarrow: false, text: `中位数 ${data.median}分` });
+  }
+  return {
+    data: [{
+      type: "bar", orientation: "h", y: bars.center,
+      width: bars.height, x: bars["人数"], customdata: bars["累计人数"],
+      marker: { color: bars["人数"], colorscale: "RdPu" },
+      hovertemplate: "%{y:.0f}分: %{x}人<br>累计 %{customdata}人<extra></extra>",
+    }],
+    layout: {
+      title: `${data.title}（共 ${data.total} 人）`, shapes, annotations,
+      paper_bgcolor: data.style.background_color, plot_bgcolor: data.style.background_color,
+      font: { color: data.style.text_color },
+      xaxis: { title: "人数" }, yaxis: { title: "分数" }, margin: { t: 60, l: 70, r: 30, b: 50 },
+    },
+  };
+}
+
+function rankingFigure(data) {
+  const rows = data.rows;
+  return {
+    data: [{
+      type: "bar", x: rows["院校名称"], y: rows[data.metric],
+      marker: { color: rows[data.metric], colorscale: "Reds" },
+      customdata: rows["属性"], hovertemplate: "%{x} (%{customdata}): %{y}<extra></extra>",
+    }],
+    layout: {
+      title: data.title, xaxis: { tickangle: -45 }, yaxis: { title: data.metric },
+      shapes: [{ type: "line", xref: "paper", x0: 0, x1: 1, y0: data.mean, y1: data.mean,
+                 line: { color: "rgba(52, 73, 94, 0.5)", dash: "dash" } }],
+      margin: { t: 60, l: 70, r: 30, b: 140 },
+    },
+  };
+}
+
+async function show(changed) {
+  const view = selectedView(changed);
+  const status = document.getElementById("status");
+  if (!view) { status.textContent = "没有可显示的数据"; return; }
+  status.textContent = "加载中…";
+  try {
+    const [data] = await Promise.all([fetchShard(view.shard), loadPlotly()]);
+    if (selectedView() !== view) return;  // the selection changed meanwhile
+    const figure = view.kind === "distribution" ? distributionFigure(data) : rankingFigure(data);
+    Plotly.react("chart", figure.data, figure.layout, { responsive: true });
+    status.textContent = `${view.title} · ${(view.bytes / 1024).toFixed(1)} KB`;
+  } catch (error) {
+    status.textContent = `加载失败: ${error.message}`;
+  }
+}
+
+fetch("manifest.json").then((r) => r.json()).then((m) => {
+  manifest = m;
+  document.getElementById("kind").onchange = () => { renderFilters(); show(); };
+  renderFilters();
+  show();
+});
+</script>
+</body>
+</html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成静态数据看板")
+    parser.add_argument("--output-dir", default=DASHBOARD_DIR)
+    parser.add_argument(
+        "--plotly-src",
+        help="URL of plotly.js (default: copy the bundled file next to the page)",
+    )
+    args = parser.parse_args()
+
+    manifest = build_dashboard(args.output_dir, args.plotly_src)
+    for view in manifest["views"]:
+        logging.info(
+            f"{view['id']}: {view['shard']} {view['bytes'] / 1024:.1f} KB "
+            f"({view['raw_bytes'] / 1024:.1f} KB uncompressed)"
+        )
+    logging.info(
+        f"Dashboard written to {args.output_dir} ({len(manifest['views'])} views); "
+        f"serve it with: python -m http.server -d {args.output_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import argparse
+import filecmp
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from src.config.chart_config import load_config
+from src.data.load_tables import load_score_table
+from src.visualization.export import (
+    DEFAULT_VARIANTS,
+    VECTOR_FORMATS,
+    export_figure,
+    split_output_path,
+)
+from src.visualization.score_binning import bar_layout, max_bins_for_height
+
+# The renderer never touches pyplot or rcParams: every figure is an explicit
+# Figure/Axes pair and all style values are passed to the artists directly,
+# so charts can be rendered concurrently from several threads.
+
+
+def calculate_percentile_score(df, percentile):
+    """Calculate score at given percentile based on cumulative counts"""
+    total_students = df["累计人数"].max()
+    target_count = total_students * (percentile / 100)
+    return df[df["累计人数"] >= target_count].iloc[0]["score"]
+
+
+def _annotation_box(style, edgecolor):
+    return dict(
+        facecolor=style["background_color"],
+        edgecolor=edgecolor,
+        alpha=0.95,
+        pad=style["annotation_pad"],
+        linewidth=1.5,
+        boxstyle="round,pad=0.5",
+    )
+
+
+def create_distribution_figure(
+    df, chart, lod=False, dpi=300, threshold_notes=None, max_count=None
+):
+    """
+    Build the symmetric score distribution chart as a standalone Figure.
+
+    ``df`` needs ``score``, ``人数`` and ``累计人数`` columns; ``chart`` is a
+    DistributionChart from the chart config (title, style, thresholds).
+    ``threshold_notes`` maps a threshold label (or "中位数") to a second
+    annotation line, e.g. precomputed threshold statistics. ``max_count``
+    fixes the count axis (e.g. shared by animation frames) instead of
+    fitting it to ``df``; the median line and label have gid "median".
+    """
+    style, thresholds = chart.style, chart.thresholds
+    threshold_notes = threshold_notes or {}
+
+    def annotation(label):
+        note = threshold_notes.get(label)
+        return f"{label}\n{note}" if note else label
+
+    # Calculate median
+    median_score = calculate_percentile_score(df, 50)
+
+    # Lay out the bars; in LOD mode scores are merged into bins sized to the
+    # output height, keeping thresholds and the median on bin edges
+    max_bins = None
+    if lod:
+        max_bins = max_bins_for_height(
+            style["figure_size"][1], dpi, style["lod_min_bar_pixels"]
+        )
+    bars = bar_layout(
+        df,
+        max_bins,
+        keep_scores=[score for score, _, _ in thresholds] + [median_score],
+    )
+
+    # Create the figure with light yellow background
+    fig = Figure(figsize=style["figure_size"], facecolor=style["background_color"])
+    ax = fig.add_subplot()
+    ax.set_facecolor(style["background_color"])
+
+    # Create the symmetric distribution plot
+    if max_count is None:
+        max_count = int(np.ceil(bars["value"].max()))
+
+    # Reversed gradient for top-to-bottom dark-to-light effect
+    colors = chart.bar_colors(len(bars))
+
+    for direction in (1, -1):
+        ax.barh(
+            bars["center"],
+            direction * bars["value"],
+            height=bars["height"] * style["bar_height"],
+            color=colors,
+            alpha=style["bar_alpha"],
+            edgecolor="none",
+        )
+
+    # Add title
+    ax.set_title(
+        chart.title,
+        pad=style["title_pad"],
+        bbox=dict(
+            facecolor=style["background_color"],
+            edgecolor="none",
+            alpha=0.8,
+            pad=10,
+        ),
+        **chart.text_style("title_size", "title_weight"),
+    )
+
+    # Add axis labels
+    label_style = chart.text_style("axis_label_size", "label_weight")
+    ax.set_xlabel("人数", labelpad=20, **label_style)
+    ax.set_ylabel("分数", labelpad=20, **label_style)
+
+    # Add score lines
+    for score, label, color in thresholds:
+        ax.axhline(
+            y=score,
+            color=color,
+            linestyle="--",
+            alpha=style["line_alpha"],
+            linewidth=style["line_width"],
+            zorder=2,  # Ensure lines are above the grid
+        )
+        ax.text(
+            max_count * 0.85,
+            score + style["text_y_offset"],
+            annotation(label),
+            bbox=_annotation_box(style, color),
+            verticalalignment="bottom",
+            zorder=3,  # Ensure text is above everything
+            **chart.text_style("annotation_size", "annotation_weight", color),
+        )
+
+    # Add median line and score
+    ax.axhline(
+        y=median_score,
+        color=style["text_color"],
+        linestyle="--",
+        alpha=style["line_alpha"],
+        linewidth=style["line_width"],
+        zorder=2,
+        gid="median",
+    )
+    ax.text(
+        -max_count * 1.2,
+        median_score + style["text_y_offset"],
+        annotation("中位数"),
+        bbox=_annotation_box(style, style["text_color"]),
+        verticalalignment="bottom",
+        zorder=3,
+        gid="median",
+        **chart.text_style("annotation_size", "annotation_weight"),
+    )
+
+    # Adjust the axis
+    ax.set_xlim(-max_count * 1.3, max_count * 1.3)
+
+    # Remove all spines
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+    # Add subtle grid
+    ax.grid(
+        True,
+        axis="y",
+        alpha=style["grid_alpha"],
+        color=style["grid_color"],
+        linestyle=":",
+        zorder=1,  # Ensure grid is at the bottom
+    )
+
+    # Customize tick labels
+    ax.set_xticks([-max_count, -max_count // 2, 0, max_count // 2, max_count])
+    ax.set_xticklabels([max_count, max_count // 2, 0, max_count // 2, max_count])
+    ax.tick_params(
+        colors=style["text_color"],
+        labelsize=style["tick_label_size"],
+        labelfontfamily=chart.font_family,
+        width=0,  # Remove tick marks
+        length=0,  # Remove tick marks
+        pad=10,
+    )
+
+    fig.tight_layout()
+    return fig
+
+
+def render_distribution_plot(
+    df,
+    output_path,
+    chart,
+    lod=False,
+    dpi=300,
+    variants=DEFAULT_VARIANTS,
+    vector_formats=(),
+    threshold_notes=None,
+):
+    """
+    Build the distribution chart and export it; returns the written paths.
+
+    The extension of ``output_path`` selects the variant (or vector format)
+    written there in addition to ``variants`` and ``vector_formats``; a path
+    without extension is used as the base for those only.
+    """
+    base_path, output_format = split_output_path(output_path)
+    if output_format in VECTOR_FORMATS:
+        vector_formats = tuple(dict.fromkeys((output_format, *vector_formats)))
+    elif output_format:
+        variants = tuple(dict.fromkeys((output_format, *variants)))
+    fig = create_distribution_figure(
+        df, chart, lod=lod, dpi=dpi, threshold_notes=threshold_notes
+    )
+    return export_figure(
+        fig,
+        base_path,
+        variants=variants,
+        vector_formats=vector_formats,
+        dpi=dpi,
+        facecolor=chart.background_color,
+    )
+
+
+def check_thread_safety(jobs, n_charts=100, workers=8, dpi=72):
+    """
+    Render ``n_charts`` charts serially and from a thread pool and compare.
+
+    ``jobs`` is a list of (df, DistributionChart) cycled through to
+    produce the charts (alternating LOD on and off). Returns the names of
+    charts whose threaded output differs from the serial output.
+    """
+
+    def render(index, output_dir):
+        df, chart = jobs[index % len(jobs)]
+        path = os.path.join(output_dir, f"chart_{index:03d}.png")
+        render_distribution_plot(
+            df, path, chart, lod=bool(index // len(jobs) % 2), dpi=dpi
+        )
+        return path
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        serial_dir = os.path.join(tmp_dir, "serial")
+        threaded_dir = os.path.join(tmp_dir, "threaded")
+        serial = [render(i, serial_dir) for i in range(n_charts)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            threaded = list(
+                pool.map(render, range(n_charts), [threaded_dir] * n_charts)
+            )
+        return [
+            os.path.basename(a)
+            for a, b in zip(serial, threaded)
+            if not filecmp.cmp(a, b, shallow=False)
+        ]
+
+
+def main():
+    from src.visualization import middle_school_score_distribution_plot
+
+    parser = argparse.ArgumentParser(description="检查分布图渲染的线程安全性")
+    parser.add_argument("--charts", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dpi", type=int, default=72)
+    args = parser.parse_args()
+
+    config = load_config()
+    jobs = [
+        (
+            load_score_table("data/processed/四川省204年高考一分一段表公布.csv"),
+            config.distribution("gaokao"),
+        ),
+        (
+            middle_school_score_distribution_plot.load_middle_school_table(
+                "data/processed/中考分数分布数据.csv"
+            ),
+            config.distribution("zhongkao"),
+        ),
+    ]
+    mismatches = check_thread_safety(jobs, args.charts, args.workers, args.dpi)
+    if mismatches:
+        logging.error(f"{len(mismatches)} charts differ from serial rendering")
+        raise SystemExit(1)
+    logging.info(
+        f"{args.charts} charts rendered on {args.workers} threads are "
+        "byte-identical to serial rendering"
+    )
+
+
+if __name__ == "__main__":
+    main()
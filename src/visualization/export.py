@@ -0,0 +1,219 @@
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+from PIL import Image
+
+from src.visualization.fonts import vector_font_settings
+
+# Raster variants encoded from the single full-resolution render:
+# name -> (file suffix, PIL format, max width in pixels or None, save options)
+# "palette" in the options quantizes to that many colors before saving.
+# The charts use about 2000 colors (mostly anti-aliased edges): 256 colors
+# stay within 14 levels per channel and shrink the PNG about 3x, and for
+# palette images zlib level 9 pays off. For RGB PNGs level 9 is ~2x slower
+# than the default level 6 for ~3% smaller files, so "full" keeps level 6.
+# Downscaled levels gain many blended colors, which lossless WebP handles
+# poorly (4x larger than at full size), so the 1080 WebP is quantized first.
+PALETTE_PNG = {"palette": 256, "compress_level": 9}
+LOSSLESS_WEBP = {"lossless": True, "method": 4}
+PALETTE_WEBP = dict(LOSSLESS_WEBP, palette=256)
+RASTER_VARIANTS = {
+    "full": (".png", "PNG", None, {}),
+    "full_palette": ("_palette.png", "PNG", None, PALETTE_PNG),
+    "mobile": ("_1080.png", "PNG", 1080, PALETTE_PNG),
+    "thumbnail": ("_thumb.png", "PNG", 360, PALETTE_PNG),
+    "webp": (".webp", "WEBP", None, {"quality": 80, "method": 4}),
+    "lossless_webp": ("_lossless.webp", "WEBP", None, LOSSLESS_WEBP),
+    "mobile_webp": ("_1080.webp", "WEBP", 1080, PALETTE_WEBP),
+    "preview": ("_preview.webp", "WEBP", 720, {"quality": 60}),
+}
+
+DEFAULT_VARIANTS = ("full",)
+# 分辨率金字塔: full resolution, 1080 px wide for phones and a thumbnail
+PYRAMID_VARIANTS = ("full", "mobile", "thumbnail")
+VECTOR_FORMATS = ("pdf", "svg")
+# Output path extension -> the variant or vector format written at that path
+OUTPUT_EXTENSIONS = {".png": "full", ".webp": "webp", ".pdf": "pdf", ".svg": "svg"}
+
+# Artists below this zorder (bars, grid) are rasterized in vector output
+RASTERIZATION_ZORDER = 1.5
+VECTOR_RASTER_DPI = 150
+
+_vector_lock = threading.Lock()
+
+
+def render_to_buffer(fig, dpi=300, facecolor=None):
+    """
+    Render a figure once and return it as an RGBA PIL image.
+
+    The figure goes through the regular ``savefig(bbox_inches="tight")``
+    path into an uncompressed in-memory PNG, so the pixels match a direct
+    save while the expensive compression is left to the encoders.
+    """
+    buffer = io.BytesIO()
+    fig.savefig(
+        buffer,
+        format="png",
+        dpi=dpi,
+        bbox_inches="tight",
+        facecolor=facecolor,
+        pil_kwargs={"compress_level": 0},
+    )
+    buffer.seek(0)
+    image = Image.open(buffer)
+    image.load()
+    return image
+
+
+def pyramid_level(image, max_width=None):
+    """The RGB image scaled down to at most ``max_width`` pixels wide"""
+    if max_width is not None and image.width > max_width:
+        height = round(image.height * max_width / image.width)
+        image = image.resize((max_width, height), Image.LANCZOS)
+    return image.convert("RGB")
+
+
+def save_image(image, fp, image_format, options=None):
+    """
+    Encode ``image`` to a path or file object with PIL save ``options``;
+    a "palette" option quantizes to that many colors first.
+    """
+    options = dict(options or {})
+    colors = options.pop("palette", None)
+    if colors:
+        # Fast octree without dithering keeps flat areas flat (and small)
+        image = image.quantize(
+            colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE
+        )
+    image.save(fp, format=image_format, **options)
+
+
+def encode_variant(image, path, image_format, max_width=None, options=None):
+    """Resize (if needed) and encode one raster variant; returns the path"""
+    image = pyramid_level(image, max_width)
+    # Write to a temporary file and rename, so hard links to a previous
+    # version of the output (e.g. in the chart cache) are never modified
+    tmp_path = f"{path}.tmp"
+    save_image(image, tmp_path, image_format, options)
+    os.replace(tmp_path, path)
+    return path
+
+
+def figure_to_bytes(fig, variant="full", dpi=300, facecolor=None):
+    """Render ``fig`` and encode one raster variant in memory"""
+    _, image_format, max_width, options = RASTER_VARIANTS[variant]
+    image = render_to_buffer(fig, dpi=dpi, facecolor=facecolor)
+    buffer = io.BytesIO()
+    save_image(pyramid_level(image, max_width), buffer, image_format, options)
+    return buffer.getvalue()
+
+
+def _timed_encode(image, path, image_format, options):
+    start = time.perf_counter()
+    encode_variant(image, path, image_format, options=options)
+    return path, time.perf_counter() - start
+
+
+def save_vector(fig, path, facecolor=None, raster_dpi=VECTOR_RASTER_DPI):
+    """
+    Save a vector format with the bar layer rasterized and the embedded
+    fonts subset to the glyphs used, to keep files small.
+    """
+    for ax in fig.axes:
+        ax.set_rasterization_zorder(RASTERIZATION_ZORDER)
+    tmp_path = f"{path}.tmp"
+    # Font embedding is only configurable through rcParams, so vector saves
+    # are serialized while the settings are applied
+    with _vector_lock, matplotlib.rc_context(vector_font_settings()):
+        fig.savefig(
+            tmp_path,
+            format=os.path.splitext(path)[1][1:],
+            dpi=raster_dpi,
+            bbox_inches="tight",
+            facecolor=facecolor,
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+def split_output_path(path):
+    """
+    (base path, variant or vector format) for a chart output path; the
+    format is None for a path without extension. Raises ``ValueError`` for
+    extensions no variant is written with (e.g. ``.jpg``).
+    """
+    base_path, extension = os.path.splitext(path)
+    if not extension:
+        return base_path, None
+    try:
+        return base_path, OUTPUT_EXTENSIONS[extension.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported output extension {extension!r} for {path} "
+            f"(supported: {', '.join(OUTPUT_EXTENSIONS)})"
+        ) from None
+
+
+def export_figure(
+    fig,
+    base_path,
+    variants=DEFAULT_VARIANTS,
+    vector_formats=(),
+    dpi=300,
+    facecolor=None,
+    max_workers=None,
+):
+    """
+    Render ``fig`` once and write every requested variant.
+
+    Raster variants are encoded in parallel from one RGBA buffer, each
+    pyramid width being scaled once and shared by its variants; vector
+    formats are written with ``save_vector``. Returns a dict mapping variant
+    name (or vector format) to the written path.
+    """
+    os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+    outputs = {}
+    encode_seconds = {}
+
+    if variants:
+        image = render_to_buffer(fig, dpi=dpi, facecolor=facecolor)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            widths = {RASTER_VARIANTS[name][2] for name in variants}
+            levels = dict(
+                zip(widths, pool.map(lambda w: pyramid_level(image, w), widths))
+            )
+            futures = {}
+            for name in variants:
+                suffix, image_format, max_width, options = RASTER_VARIANTS[name]
+                futures[name] = pool.submit(
+                    _timed_encode,
+                    levels[max_width],
+                    f"{base_path}{suffix}",
+                    image_format,
+                    options,
+                )
+            for name, future in futures.items():
+                outputs[name], encode_seconds[name] = future.result()
+
+    for vector_format in vector_formats:
+        if vector_format not in VECTOR_FORMATS:
+            raise ValueError(f"Unsupported vector format: {vector_format}")
+        outputs[vector_format] = save_vector(
+            fig, f"{base_path}.{vector_format}", facecolor=facecolor
+        )
+
+    for name, path in outputs.items():
+        if name in encode_seconds:
+            logging.info(
+                f"Exported {os.path.abspath(path)} "
+                f"({os.path.getsize(path) / 1024:.1f} KB, "
+                f"encoded in {encode_seconds[name] * 1000:.0f} ms)"
+            )
+        else:
+            logging.info(f"Exported {os.path.abspath(path)}")
+    return outputs
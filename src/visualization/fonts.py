@@ -0,0 +1,156 @@
+import functools
+import json
+import logging
+import os
+import threading
+
+import matplotlib
+from matplotlib import font_manager
+from matplotlib.ft2font import FT2Font
+
+# 按优先级排列的中文字体候选（macOS / Windows / Linux）
+CJK_FONT_CANDIDATES = (
+    "Arial Unicode MS",
+    "PingFang SC",
+    "Hiragino Sans GB",
+    "Microsoft YaHei",
+    "SimHei",
+    "Source Han Sans SC",
+    "Noto Sans CJK SC",
+    "Noto Sans SC",
+    "WenQuanYi Zen Hei",
+    "WenQuanYi Micro Hei",
+    "Droid Sans Fallback",
+)
+
+# Glyphs every chart font must contain
+SAMPLE_TEXT = "高考中考分数分布图人数中位数本科第一批研究生"
+
+# Explicit font file for hosts without any of the candidates installed
+FONT_PATH_ENV = "GAOKAODATA_CJK_FONT"
+FONT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "gaokaodata", "cjk_font.json"
+)
+
+# fontTools logs every table it prunes while matplotlib subsets fonts
+logging.getLogger("fontTools").setLevel(logging.WARNING)
+
+_lock = threading.Lock()
+_resolved = {}
+
+
+def _covers_sample(path):
+    try:
+        charmap = FT2Font(path).get_charmap()
+    except (OSError, RuntimeError):
+        return False
+    return all(ord(char) in charmap for char in SAMPLE_TEXT)
+
+
+def _read_cache():
+    try:
+        with open(FONT_CACHE_PATH, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("matplotlib") != matplotlib.__version__:
+        return None
+    if cached.get("path") and not os.path.exists(cached["path"]):
+        return None
+    return cached
+
+
+def _write_cache(font):
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE_PATH), exist_ok=True)
+        with open(FONT_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump(dict(font, matplotlib=matplotlib.__version__), f)
+    except OSError as e:
+        logging.warning(f"Could not write font cache {FONT_CACHE_PATH}: {e}")
+
+
+def _search_fonts():
+    """Find a CJK font: the env override, then candidates, then any font file"""
+    explicit = os.environ.get(FONT_PATH_ENV)
+    if explicit and os.path.exists(explicit):
+        font_manager.fontManager.addfont(explicit)
+        return {
+            "family": font_manager.FontProperties(fname=explicit).get_name(),
+            "path": explicit,
+        }
+
+    by_name = {}
+    for entry in font_manager.fontManager.ttflist:
+        by_name.setdefault(entry.name, entry.fname)
+    for family in CJK_FONT_CANDIDATES:
+        if family in by_name and _covers_sample(by_name[family]):
+            return {"family": family, "path": by_name[family]}
+
+    for entry in font_manager.fontManager.ttflist:
+        if _covers_sample(entry.fname):
+            return {"family": entry.name, "path": entry.fname}
+    return {"family": None, "path": None}
+
+
+def resolve_cjk_font():
+    """
+    Return ``{"family", "path"}`` of an installed font covering Chinese text.
+
+    The lookup runs once per process (and is persisted across processes in
+    FONT_CACHE_PATH); ``family`` is None when no CJK font is available.
+    """
+    with _lock:
+        if not _resolved:
+            font = _read_cache()
+            if font is None or os.environ.get(FONT_PATH_ENV):
+                font = _search_fonts()
+                if font["path"]:
+                    _write_cache(font)
+            if font["path"]:
+                font_manager.fontManager.addfont(font["path"])
+                logging.info(f"Using CJK font {font['family']} ({font['path']})")
+            else:
+                logging.warning(
+                    "No CJK font found; Chinese text will not render correctly. "
+                    f"Install one of {', '.join(CJK_FONT_CANDIDATES[:5])} "
+                    f"or set {FONT_PATH_ENV}"
+                )
+            _resolved.update(font)
+        return dict(_resolved)
+
+
+@functools.lru_cache(maxsize=None)
+def matplotlib_font_family(preferred=None):
+    """
+    Font family list for matplotlib text: the preferred family when it is
+    installed, otherwise the resolved CJK font.
+    """
+    installed = {entry.name for entry in font_manager.fontManager.ttflist}
+    if preferred and preferred in installed:
+        return (preferred,)
+    family = resolve_cjk_font()["family"]
+    if family:
+        return (family,)
+    return (preferred,) if preferred else ("sans-serif",)
+
+
+def plotly_font_family():
+    """CSS font-family string for plotly figures, with fallbacks"""
+    family = resolve_cjk_font()["family"]
+    families = [family] if family else []
+    families += [name for name in ("SimHei", "Microsoft YaHei") if name != family]
+    return ", ".join(families + ["sans-serif"])
+
+
+def vector_font_settings():
+    """
+    rcParams for vector export: TrueType (Type 42) fonts, which matplotlib
+    subsets to the glyphs actually used, and glyph outlines in SVG.
+    TrueType collections cannot be embedded as Type 42, so they use Type 3
+    (also subset).
+    """
+    path = resolve_cjk_font()["path"] or ""
+    return {
+        "pdf.fonttype": 3 if path.lower().endswith(".ttc") else 42,
+        "svg.fonttype": "path",
+    }
@@ -0,0 +1,298 @@
+import argparse
+import json
+import logging
+import os
+import time
+from functools import lru_cache, partial
+
+from src.analysis import ranking
+from src.config import chart_config
+from src.config.chart_config import load_config
+from src.data import load_tables, score_table, threshold_stats
+from src.data.load_tables import compact_university_table, load_score_table
+from src.data.threshold_stats import compute_threshold_stats, threshold_notes
+from src.visualization import (
+    distribution_renderer,
+    export,
+    fonts,
+    gakao_score_distribution_plot,
+    middle_school_score_distribution_plot,
+    score_binning,
+    university_data_analysis,
+)
+from src.visualization.chart_cache import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_MAX_BYTES,
+    ChartCache,
+    chart_key,
+    hash_file,
+    hash_frame,
+)
+from src.visualization.export import RASTER_VARIANTS
+
+OUTPUT_DIR = "output/visualizations"
+
+# 分布图任务: (图表名称, 数据文件, 绘图模块, 加载函数, 绘图函数)
+DISTRIBUTION_CHARTS = [
+    (
+        "高考分数分布图",
+        "data/processed/四川省204年高考一分一段表公布.csv",
+        gakao_score_distribution_plot,
+        load_score_table,
+        gakao_score_distribution_plot.create_score_distribution_plot,
+    ),
+    (
+        "中考分数分布图",
+        "data/processed/中考分数分布数据.csv",
+        middle_school_score_distribution_plot,
+        middle_school_score_distribution_plot.load_middle_school_table,
+        middle_school_score_distribution_plot.create_middle_school_score_distribution_plot,
+    ),
+]
+
+# Modules every distribution chart is drawn with (style, binning, fonts,
+# export, loading and score label parsing), in addition to its own plot module
+SHARED_MODULES = (
+    distribution_renderer,
+    score_binning,
+    fonts,
+    export,
+    chart_config,
+    load_tables,
+    score_table,
+)
+# Modules the university figures are drawn with
+UNIVERSITY_MODULES = (university_data_analysis, ranking, fonts, load_tables)
+
+# plotly 图表导出格式
+UNIVERSITY_FORMATS = ("html", "png", "pdf")
+
+
+def renderer_hash(modules):
+    """
+    Hash of the source files of ``modules`` and of the resolved CJK font,
+    so editing any code a chart is drawn with (or changing the font)
+    invalidates its cached outputs.
+    """
+    parts = {module.__name__: hash_file(module.__file__) for module in modules}
+    font = fonts.resolve_cjk_font()
+    parts["font"] = font["family"]
+    parts["font_file"] = hash_file(font["path"]) if font["path"] else None
+    return chart_key(**parts)
+
+
+def threshold_summary():
+    """Batch line statistics for every distribution dataset, in one pass"""
+    return compute_threshold_stats(
+        (
+            name,
+            loader(data_path),
+            load_config().distribution(module.DATASET).thresholds,
+        )
+        for name, data_path, module, loader, _ in DISTRIBUTION_CHARTS
+    )
+
+
+def threshold_job(output_dir, summary):
+    """
+    (name, key, targets, render) writing ``threshold_stats.csv`` from
+    ``summary()``. The statistics follow from the data files and the
+    thresholds alone, so the key is built from those.
+    """
+    path = os.path.join(output_dir, "threshold_stats.csv")
+    key = chart_key(
+        chart="threshold_stats",
+        data=[hash_file(data_path) for _, data_path, *_ in DISTRIBUTION_CHARTS],
+        config=[
+            load_config().distribution(module.DATASET).fingerprint
+            for _, _, module, *_ in DISTRIBUTION_CHARTS
+        ],
+        code=hash_file(threshold_stats.__file__),
+    )
+
+    def render():
+        summary().to_csv(path, index=False, encoding="utf-8-sig")
+
+    return "threshold_stats", key, {"csv": path}, render
+
+
+def charts_for_data(path):
+    """Names of the distribution charts drawn from the data file ``path``"""
+    return [
+        name
+        for name, data_path, *_ in DISTRIBUTION_CHARTS
+        if os.path.abspath(data_path) == os.path.abspath(path)
+    ]
+
+
+def _render_distribution(plot, data_path, base_path, name, summary, options):
+    notes = threshold_notes(summary(), name) if summary is not None else None
+    plot(data_path, base_path, threshold_notes=notes, **options)
+
+
+def distribution_jobs(output_dir, options, summary=None, charts=None):
+    """
+    Yield (name, key, targets, render) for each distribution chart, or only
+    those named in ``charts``. With ``summary`` (a callable returning the
+    threshold statistics, called only when a chart is rendered) the
+    threshold labels are annotated with their percentages.
+    """
+    # The notes follow from the data and thresholds already in the key
+    notes = hash_file(threshold_stats.__file__) if summary is not None else None
+    for name, data_path, module, _, plot in DISTRIBUTION_CHARTS:
+        if charts is not None and name not in charts:
+            continue
+        base_path = os.path.join(output_dir, name)
+        targets = {
+            variant: base_path + RASTER_VARIANTS[variant][0]
+            for variant in options["variants"]
+        }
+        targets.update({fmt: f"{base_path}.{fmt}" for fmt in options["vector_formats"]})
+        key = chart_key(
+            chart=name,
+            data=hash_file(data_path),
+            config=load_config().distribution(module.DATASET).fingerprint,
+            renderer=renderer_hash((module, *SHARED_MODULES)),
+            options=options,
+            notes=notes,
+        )
+
+        yield name, key, targets, partial(
+            _render_distribution, plot, data_path, base_path, name, summary, options
+        )
+
+
+def university_jobs(output_dir):
+    """Yield (name, key, targets, render) for the university figures"""
+    df = university_data_analysis.build_university_data()
+    data_hash = hash_frame(df)
+    university_hash = renderer_hash(UNIVERSITY_MODULES)
+
+    def render_table(base_path):
+        # Built from the frame itself; only the figures go to output_dir
+        fig = university_data_analysis.university_table_spec(
+            compact_university_table(df)
+        )
+        university_data_analysis.save_figure(fig, base_path)
+
+    def render_ratio(base_path):
+        fig = university_data_analysis.create_ratio_bar_chart(df, validate=False)
+        university_data_analysis.save_figure(fig, base_path)
+
+    for name, render in (
+        ("university_table", render_table),
+        ("ratio_chart", render_ratio),
+    ):
+        base_path = os.path.join(output_dir, name)
+        targets = {fmt: f"{base_path}.{fmt}" for fmt in UNIVERSITY_FORMATS}
+        key = chart_key(
+            chart=name,
+            data=data_hash,
+            renderer=university_hash,
+            config=load_config().plotly_fingerprint,
+        )
+        yield name, key, targets, partial(render, base_path)
+
+
+def render_all(
+    output_dir=OUTPUT_DIR,
+    cache=None,
+    options=None,
+    university=True,
+    annotate=False,
+    charts=None,
+):
+    """
+    Render every chart, reusing cached outputs when nothing changed.
+    ``annotate`` adds the threshold statistics to the distribution charts;
+    ``charts`` limits the distribution charts to the given names.
+
+    Returns the run report as a dict.
+    """
+    options = options or {
+        "lod": False,
+        "dpi": 300,
+        "variants": ["full"],
+        "vector_formats": [],
+    }
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Computed on first use, so runs served from the cache skip it
+    summary = lru_cache(maxsize=None)(threshold_summary) if annotate else None
+    jobs = [threshold_job(output_dir, summary)] if annotate else []
+    jobs.extend(distribution_jobs(output_dir, options, summary, charts))
+    if university:
+        jobs.extend(university_jobs(output_dir))
+
+    charts = []
+    for name, key, targets, render in jobs:
+        start = time.perf_counter()
+        if cache is None:
+            render()
+            hit = False
+        else:
+            hit = cache.get_or_render(key, targets, render)
+        elapsed = time.perf_counter() - start
+        logging.info(f"{name}: {'cache hit' if hit else 'rendered'} in {elapsed:.2f}s")
+        charts.append({"chart": name, "key": key, "cache_hit": hit, "seconds": elapsed})
+
+    report = {"charts": charts}
+    if cache is not None:
+        report["cache"] = cache.log_stats()
+    with open(
+        os.path.join(output_dir, "render_report.json"), "w", encoding="utf-8"
+    ) as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量生成所有图表")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument(
+        "--max-cache-mb", type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024
+    )
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--no-university", action="store_true")
+    parser.add_argument("--lod", action="store_true")
+    parser.add_argument(
+        "--annotate",
+        action="store_true",
+        help="add the share of students above each line to the threshold labels",
+    )
+    parser.add_argument(
+        "--charts",
+        nargs="*",
+        help="only these distribution charts (default: all)",
+    )
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument(
+        "--variants", nargs="+", default=["full"], choices=list(RASTER_VARIANTS)
+    )
+    parser.add_argument(
+        "--vector-formats", nargs="*", default=[], choices=["pdf", "svg"]
+    )
+    args = parser.parse_args()
+
+    cache = None
+    if not args.no_cache:
+        cache = ChartCache(args.cache_dir, int(args.max_cache_mb * 1024 * 1024))
+    options = {
+        "lod": args.lod,
+        "dpi": args.dpi,
+        "variants": args.variants,
+        "vector_formats": args.vector_formats,
+    }
+    render_all(
+        args.output_dir,
+        cache=cache,
+        options=options,
+        university=not args.no_university,
+        annotate=args.annotate,
+        charts=args.charts,
+    )
+
+
+if __name__ == "__main__":
+    main()
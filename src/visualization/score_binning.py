@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+# Minimum on-screen height of one bar in LOD mode
+DEFAULT_MIN_BAR_PIXELS = 3
+# Share of the figure height taken by the plot area
+DEFAULT_AXES_FRACTION = 0.8
+
+
+def max_bins_for_height(
+    figure_height,
+    dpi,
+    min_bar_pixels=DEFAULT_MIN_BAR_PIXELS,
+    axes_fraction=DEFAULT_AXES_FRACTION,
+):
+    """Number of bars that fit the output height (inches at ``dpi``)"""
+    pixels = figure_height * dpi * axes_fraction
+    return max(1, int(pixels // min_bar_pixels))
+
+
+def _bin_edges(low, high, width, keep, min_width):
+    """
+    Lower edges of the bins: every ``width`` scores from ``low`` plus the
+    kept scores. A regular edge closer than ``min_width`` to its neighbours
+    is dropped (its bin merges into the one above), so kept scores do not
+    leave slivers thinner than a bar may be drawn.
+    """
+    keep = set(keep.tolist())
+    edges = [low]
+    for edge in np.union1d(np.arange(low, high + 1, width), list(keep)).tolist():
+        if edge == low:
+            continue
+        if edge - edges[-1] >= min_width:
+            edges.append(edge)
+        elif edge in keep:
+            if edges[-1] != low and edges[-1] not in keep:
+                edges[-1] = edge
+            else:
+                edges.append(edge)
+    if len(edges) > 1 and high + 1 - edges[-1] < min_width and edges[-1] not in keep:
+        edges.pop()
+    return np.asarray(edges, dtype="int64")
+
+
+def bar_layout(df, max_bins=None, keep_scores=()):
+    """
+    Compute horizontal bar positions for a score distribution.
+
+    Without ``max_bins`` (or when the table already fits) every row becomes
+    one bar of height 1 centered on its score. Otherwise consecutive scores
+    are merged into bins of equal width, with each of ``keep_scores``
+    (thresholds, median) forced to start a bin so lines never cut through a
+    merged bar. Apart from bins bounded by two kept scores (or by a kept
+    score and the lowest score) no bin is narrower than the range divided
+    by ``max_bins``. ``value`` is the count per score point, so bar area
+    and the total number of students are preserved.
+
+    Returns a DataFrame ordered like the input (descending scores) with
+    columns ``center``, ``height``, ``value``, ``score``, ``人数`` and
+    ``累计人数``.
+    """
+    scores = df["score"].to_numpy(dtype="int64")
+    counts = df["人数"].to_numpy(dtype="float64")
+    cumulative = df["累计人数"].to_numpy(dtype="float64")
+
+    if max_bins is None or len(df) <= max_bins:
+        return pd.DataFrame(
+            {
+                "center": scores,
+                "height": np.ones(len(df)),
+                "value": counts,
+                "score": scores,
+                "人数": counts,
+                "累计人数": cumulative,
+            }
+        )
+
+    low, high = scores.min(), scores.max()
+    keep = np.unique([s for s in keep_scores if low < s <= high]).astype("int64")
+    n_regular = max(1, max_bins - len(keep))
+    width = int(np.ceil((high - low + 1) / n_regular))
+
+    edges = _bin_edges(low, high, width, keep, -(-(high - low + 1) // max_bins))
+    bin_ids = np.searchsorted(edges, scores, side="right") - 1
+    bin_counts = np.bincount(bin_ids, weights=counts, minlength=len(edges))
+    # Cumulative counts run from the top score down, so a bin's value is the
+    # one at its lowest score
+    bin_cumulative = np.full(len(edges), -np.inf)
+    np.maximum.at(bin_cumulative, bin_ids, cumulative)
+
+    bin_low = edges
+    bin_high = np.append(edges[1:] - 1, high)
+    used = np.bincount(bin_ids, minlength=len(edges)) > 0
+    heights = (bin_high - bin_low + 1).astype("float64")
+
+    layout = pd.DataFrame(
+        {
+            "center": (bin_low + bin_high) / 2,
+            "height": heights,
+            "value": bin_counts / heights,
+            "score": bin_low,
+            "人数": bin_counts,
+            "累计人数": bin_cumulative,
+        }
+    )[used]
+    return layout.iloc[::-1].reset_index(drop=True)
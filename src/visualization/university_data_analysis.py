@@ -1,9 +1,15 @@
+import functools
+
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-import plotly.colors as pc
+import plotly.io as pio
 import numpy as np
 
+from src.analysis.ranking import RankingEngine
+from src.config.chart_config import load_config
+from src.data.load_tables import compact_university_table, load_university_table
+from src.visualization.fonts import plotly_font_family
+
 
 def estimate_missing_values(data):
     """
@@ -27,168 +33,251 @@ def estimate_missing_values(data):
     return df
 
 
-def create_university_table(data_file):
+@functools.lru_cache(maxsize=None)
+def _default_template():
+    """The default template go.Figure puts in every layout, as a plain dict"""
+    return pio.templates[pio.templates.default].to_plotly_json()
+
+
+def _with_template(layout):
+    return dict(layout, template=_default_template())
+
+
+def validate_spec(spec):
+    """
+    Validate a figure spec against the plotly schema once (raises
+    ``ValueError`` on unknown or invalid properties); returns the Figure.
+    """
+    return go.Figure(spec)
+
+
+def university_table_spec(df, engine=None):
+    """
+    The university table figure as a plain dict built column-wise from
+    NumPy arrays, skipping plotly's per-property validation.
+    """
+    font_family = plotly_font_family()
+    config = load_config()
+    style = config.university_table
+
+    # 研本比的取值范围由排名引擎缓存，不再每次扫描整列
+    engine = engine or RankingEngine(df)
+    min_ratio, max_ratio = engine.extent("研本比")
+    ratios = df["研本比"].to_numpy("float64", na_value=np.nan)
+
+    # 渐变色在加载配置时生成一次，较大值颜色更深
+    ratio_colors = config.heatmap_colors
+
+    # 只对研本比列应用热力图（向量化计算颜色索引）
+    normalized = (ratios - min_ratio) / (max_ratio - min_ratio)
+    color_idx = np.nan_to_num(normalized * (len(ratio_colors) - 1)).astype(int)
+    ratio_fill = np.asarray(ratio_colors, dtype=object)[color_idx]
+    ratio_fill[np.isnan(ratios)] = None
+
+    # 将 NaN 值替换为 "null" 字符串，并以灰色显示
+    values, fill_colors, font_colors = [], [], []
+    for col in df.columns:
+        missing = df[col].isna().to_numpy()
+        column = df[col].to_numpy(dtype=object, na_value=None)
+        column[missing] = "null"
+        values.append(column)
+        fill_colors.append(
+            ratio_fill if col == "研本比" else [style["cell_fill"]] * len(df)
+        )
+        font_colors.append(
+            np.where(missing, style["missing_font_color"], style["cell_font_color"])
+        )
+
+    table = {
+        "type": "table",
+        "header": {
+            "values": list(df.columns),
+            "fill": {"color": style["header_fill"]},
+            "font": {
+                "color": style["header_font_color"],
+                "size": style["header_font_size"],
+                "family": font_family,
+            },
+            "align": "center",
+            "height": style["header_height"],
+        },
+        "cells": {
+            "values": values,
+            "fill": {"color": fill_colors},
+            "font": {
+                "size": style["cell_font_size"],
+                "family": font_family,
+                "color": font_colors,
+            },
+            "align": "center",
+            "height": style["cell_height"],
+            "line": {"color": style["line_color"], "width": style["line_width"]},
+        },
+    }
+    layout = {
+        "title": {
+            "text": style["title"],
+            "font": {"size": style["title_size"], "family": font_family},
+            "y": 0.95,
+        },
+        "width": style["width"],
+        "height": style["height"],
+        "paper_bgcolor": style["background_color"],
+        "plot_bgcolor": style["background_color"],
+        "margin": dict(style["margin"]),
+    }
+    return {"data": [table], "layout": _with_template(layout)}
+
+
+def create_university_table(data_file, engine=None, validate=True):
     """
     Create an interactive table visualization from university data with heatmap effect
+
+    With ``validate=False`` the plain dict spec is returned instead of a
+    validated Figure; both export the same.
     """
     # Read data from Excel/CSV file
-    df = pd.read_excel(data_file)
-
-    # 将 NaN 值替换为 "null" 字符串
-    df = df.fillna("null")
-
-    # 使用 plotly 的内置配色方案生成渐变色
-    n_colors = 10  # 渐变色数量
-    ratio_colors = pc.sample_colorscale(
-        "Reds", [i / (n_colors - 1) for i in range(n_colors)]
-    )
-    ratio_colors = ratio_colors[::-1]  # 反转颜色列表，使较大值颜色更深
-
-    min_ratio = df["研本比"].min()
-    max_ratio = df["研本比"].max()
-
-    # 创建颜色列表，只对研本比列应用热力图
-    cell_colors = [[None] * len(df.columns) for _ in range(len(df))]
-    ratio_col_idx = df.columns.get_loc("研本比")
-
-    for i in range(len(df)):
-        ratio = df["研本比"].iloc[i]
-        normalized_ratio = (ratio - min_ratio) / (max_ratio - min_ratio)
-        color_idx = int(normalized_ratio * (len(ratio_colors) - 1))
-        cell_colors[i][ratio_col_idx] = ratio_colors[color_idx]
-
-    # Create table figure
-    fig = go.Figure(
-        data=[
-            go.Table(
-                header=dict(
-                    values=list(df.columns),
-                    fill_color="rgb(0, 32, 96)",  # 深蓝色表头，匹配原图
-                    font=dict(color="white", size=14, family="SimHei"),
-                    align="center",
-                    height=40,
-                ),
-                cells=dict(
-                    values=[df[col] for col in df.columns],
-                    fill_color=[
-                        [
-                            "rgb(245, 247, 250)" if col != "研本比" else color
-                            for color in [
-                                cell_colors[i][ratio_col_idx] for i in range(len(df))
-                            ]
-                        ]
-                        for col in df.columns
-                    ],
-                    font=dict(
-                        size=13,
-                        family="SimHei",
-                        color=[
-                            [
-                                "rgb(128, 128, 128)" if str(val) == "null" else "black"
-                                for val in df[col]
-                            ]
-                            for col in df.columns
-                        ],
-                    ),
-                    align="center",
-                    height=35,
-                    line=dict(color="rgb(220, 220, 220)", width=1),  # 添加单元格边框
-                ),
-            )
-        ]
-    )
-
-    # 更新布局
-    fig.update_layout(
-        title=dict(
-            text="2024年研究生/本科生比排名",
-            font=dict(size=24, family="SimHei"),
-            y=0.95,
-        ),
-        width=1200,
-        height=800,
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        margin=dict(t=80, l=40, r=40, b=40),
-    )
-
-    return fig
-
-
-def create_ratio_bar_chart(df):
+    spec = university_table_spec(load_university_table(data_file), engine)
+    return validate_spec(spec) if validate else spec
+
+
+def ratio_bar_chart_spec(df, k=20, filters=None, engine=None):
+    """
+    The 研本比 bar chart as a plain dict (the same figure px.bar builds),
+    skipping plotly's per-property validation.
+    """
+    font_family = plotly_font_family()
+    config = load_config()
+    style = config.ratio_chart
+    engine = engine or RankingEngine(df)
+    title = style["title"].format(k=k)
+    top = engine.top_k("研本比", k, filters)
+    ratios = top["研本比"].to_numpy("float64", na_value=np.nan)
+    mean = df["研本比"].mean()
+
+    bar = {
+        "alignmentgroup": "True",
+        "hovertemplate": "院校名称=%{x}<br>研本比=%{marker.color}<extra></extra>",
+        "legendgroup": "",
+        "marker": {
+            "color": ratios,
+            "coloraxis": "coloraxis",
+            "pattern": {"shape": ""},
+        },
+        "name": "",
+        "offsetgroup": "",
+        "orientation": "v",
+        "showlegend": False,
+        # 文本标签位置和格式
+        "text": ratios,
+        "textposition": "outside",
+        "x": top["院校名称"].to_numpy(dtype=object),
+        "xaxis": "x",
+        "y": ratios,
+        "yaxis": "y",
+        "type": "bar",
+        "texttemplate": "%{text:.2f}",
+    }
+    layout = {
+        "xaxis": {
+            "anchor": "y",
+            "domain": [0.0, 1.0],
+            "title": {
+                "text": style["x_title"],
+                "font": {"size": style["axis_title_size"], "family": font_family},
+            },
+            "tickfont": {"size": style["tick_size"], "family": font_family},
+            "tickangle": style["tick_angle"],
+        },
+        "yaxis": {
+            "anchor": "x",
+            "domain": [0.0, 1.0],
+            "title": {
+                "text": style["y_title"],
+                "font": {"size": style["axis_title_size"], "family": font_family},
+            },
+            "tickfont": {"size": style["tick_size"], "family": font_family},
+            "gridcolor": style["grid_color"],
+        },
+        # 渐变色，不显示颜色条
+        "coloraxis": {
+            "colorbar": {"title": {"text": "研本比"}},
+            "colorscale": config.ratio_colorscale,
+            "showscale": False,
+        },
+        "legend": {"tracegroupgap": 0},
+        "title": {
+            "text": title,
+            "font": {"size": style["title_size"], "family": font_family},
+            "y": 0.95,
+        },
+        "barmode": "relative",
+        "margin": dict(style["margin"]),
+        "height": style["height"],
+        "plot_bgcolor": style["background_color"],
+        "paper_bgcolor": style["background_color"],
+        "showlegend": False,
+        # 平均值参考线
+        "shapes": [
+            {
+                "line": {"color": style["mean_line_color"], "dash": "dash"},
+                "type": "line",
+                "x0": 0,
+                "x1": 1,
+                "xref": "x domain",
+                "y0": mean,
+                "y1": mean,
+                "yref": "y",
+            }
+        ],
+        "annotations": [
+            {
+                "font": {"family": font_family},
+                "showarrow": False,
+                "text": style["mean_label"],
+                "x": 1,
+                "xanchor": "right",
+                "xref": "x domain",
+                "y": mean,
+                "yanchor": "bottom",
+                "yref": "y",
+            }
+        ],
+    }
+    return {"data": [bar], "layout": _with_template(layout)}
+
+
+def create_ratio_bar_chart(df, k=20, filters=None, engine=None, validate=True):
     """
     Create a bar chart showing 研本比 for top universities with gradient effect
+
+    The top ``k`` rows come from the ranking engine (a partial sort), so the
+    frame does not need to be pre-sorted; ``filters`` such as
+    ``{"属性": "985"}`` restrict the ranking. With ``validate=False`` the
+    plain dict spec is returned instead of a validated Figure.
     """
-    # 使用 plotly express 的内置配色方案
-    fig = px.bar(
-        df.head(20),
-        x="院校名称",
-        y="研本比",
-        text="研本比",
-        color="研本比",
-        color_continuous_scale="Reds",  # 使用红色渐变
-        title="2024年高校研究生与本科生比例排名（前20名）",
-    )
-
-    # 更新布局
-    fig.update_layout(
-        title=dict(
-            text="2024年高校研究生与本科生比例排名（前20名）",
-            font=dict(size=20, family="SimHei"),
-            y=0.95,
-        ),
-        xaxis=dict(
-            title="院校名称",
-            tickangle=-45,
-            tickfont=dict(size=12, family="SimHei"),
-            title_font=dict(size=14, family="SimHei"),
-        ),
-        yaxis=dict(
-            title="研究生与本科生比例",
-            tickfont=dict(size=12, family="SimHei"),
-            title_font=dict(size=14, family="SimHei"),
-            gridcolor="rgba(189, 195, 199, 0.2)",
-        ),
-        height=700,
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        showlegend=False,
-        margin=dict(t=100, l=80, r=80, b=100),
-    )
-
-    # 更新文本标签位置和格式
-    fig.update_traces(texttemplate="%{text:.2f}", textposition="outside")
-
-    # 添加参考线
-    fig.add_hline(
-        y=df["研本比"].mean(),
-        line_dash="dash",
-        line_color="rgba(52, 73, 94, 0.5)",
-        annotation_text="平均值",
-        annotation_font=dict(family="SimHei"),
-    )
-
-    # 移除颜色条
-    fig.update_coloraxes(showscale=False)
-
-    return fig
+    spec = ratio_bar_chart_spec(df, k, filters, engine)
+    return validate_spec(spec) if validate else spec
 
 
 def save_figure(fig, base_name):
     """
-    Save figure in both HTML and static image formats
+    Save figure (a Figure or a dict spec) in both HTML and static image formats
     """
     # 保存为HTML（交互式）
-    fig.write_html(f"{base_name}.html")
+    pio.write_html(fig, f"{base_name}.html", validate=False)
 
-    # 保存为PNG（静态图片）
-    fig.write_image(f"{base_name}.png", scale=2)  # scale=2 提供更高的分辨率
+    # 保存为PNG（静态图片），scale=2 提供更高的分辨率
+    pio.write_image(fig, f"{base_name}.png", scale=2, validate=False)
 
     # 保存为PDF（适合打印）
-    fig.write_image(f"{base_name}.pdf")
+    pio.write_image(fig, f"{base_name}.pdf", validate=False)
 
 
-def main():
+def build_university_data():
+    """
+    Build the university DataFrame with estimated missing values
+    """
     # 完整数据，包含所有列
     data = {
         "排名": list(range(1, 36)),  # 扩展到35所高校
@@ -418,7 +507,11 @@ def main():
     }
 
     # 估算缺失值
-    df = estimate_missing_values(data)
+    return compact_university_table(estimate_missing_values(data))
+
+
+def main():
+    df = build_university_data()
 
     # 保存完整数据到Excel
     df.to_excel("university_data.xlsx", index=False)
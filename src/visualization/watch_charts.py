@@ -0,0 +1,274 @@
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from src.config import chart_config
+from src.data.process_score_data import (
+    PROCESSED_DIR,
+    RAW_DIR,
+    RAW_SUFFIXES,
+    process_raw_file,
+)
+from src.visualization import render_charts
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+PREVIEW_DIR = "output/visualizations/preview"
+DEFAULT_POLL_INTERVAL = 0.5  # 秒
+DEFAULT_DEBOUNCE = 1.0  # 最后一次改动后等待的秒数
+PREVIEW_DPI = 72
+
+
+def _source(module):
+    return os.path.abspath(module.__file__)
+
+
+def snapshot(paths):
+    """(mtime_ns, size) of every file in the watched directories and files"""
+    state = {}
+    for path in paths:
+        if os.path.isdir(path):
+            entries = [e for e in os.scandir(path) if e.is_file()]
+        elif os.path.exists(path):
+            entries = [path]
+        else:
+            continue
+        for entry in entries:
+            name = os.path.basename(entry)
+            if name.startswith((".", "~")) or ".tmp" in name:
+                continue  # editor swap files and half-written outputs
+            stat = os.stat(entry)
+            state[os.path.abspath(entry)] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def changed_paths(before, after):
+    return {
+        path
+        for path in before.keys() | after.keys()
+        if before.get(path) != after.get(path)
+    }
+
+
+class ChartWatcher:
+    """
+    Polls the raw and processed data directories, the chart config file and
+    the chart modules (including the shared rendering code), and
+    after a burst of changes has settled re-runs only the affected jobs:
+    raw files are re-ingested, then the charts drawn from changed data or
+    modules get a low-dpi preview followed by a full render in the
+    background. Renders run in a fresh process so edited modules are
+    picked up; a newer change cancels a full render still in progress.
+    """
+
+    def __init__(
+        self,
+        output_dir=render_charts.OUTPUT_DIR,
+        preview_dir=PREVIEW_DIR,
+        preview_dpi=PREVIEW_DPI,
+        dpi=300,
+        annotate=False,
+        poll_interval=DEFAULT_POLL_INTERVAL,
+        debounce=DEFAULT_DEBOUNCE,
+    ):
+        self.output_dir = output_dir
+        self.preview_dir = preview_dir
+        self.preview_dpi = preview_dpi
+        self.dpi = dpi
+        self.annotate = annotate
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+
+        self.chart_sources = {}  # module file -> chart names
+        all_charts = [name for name, *_ in render_charts.DISTRIBUTION_CHARTS]
+        for module in render_charts.SHARED_MODULES:
+            self.chart_sources[_source(module)] = all_charts
+        for name, _, module, *_ in render_charts.DISTRIBUTION_CHARTS:
+            self.chart_sources.setdefault(_source(module), []).append(name)
+        self.university_sources = {
+            _source(module) for module in render_charts.UNIVERSITY_MODULES
+        }
+        self.config_source = chart_config.config_path()
+
+        self.watched = [RAW_DIR, PROCESSED_DIR, self.config_source]
+        self.watched.extend(self.chart_sources.keys() | self.university_sources)
+        self.state = snapshot(self.watched)
+        self.full_render = None
+        # Charts (and whether the university figures) not yet at full quality
+        self.pending_full = (set(), False)
+
+    def plan(self, paths):
+        """
+        Raw files to ingest, charts to render and whether the university
+        figures changed
+        """
+        raw_files, charts, university = [], set(), False
+        for path in sorted(paths):
+            if os.path.dirname(path) == os.path.abspath(RAW_DIR):
+                if path.lower().endswith(RAW_SUFFIXES) and os.path.exists(path):
+                    raw_files.append(path)
+            elif path in self.chart_sources or path in self.university_sources:
+                # Shared modules (fonts, loading) affect both kinds of chart
+                charts.update(self.chart_sources.get(path, ()))
+                university = university or path in self.university_sources
+            elif path == self.config_source:
+                # Styles and thresholds of every chart; an invalid edit is
+                # reported here and nothing is rendered until it is fixed
+                try:
+                    chart_config.read_config(path)
+                except chart_config.ConfigError as e:
+                    logging.error(str(e))
+                    continue
+                charts.update(name for name, *_ in render_charts.DISTRIBUTION_CHARTS)
+                university = True
+            else:
+                charts.update(render_charts.charts_for_data(path))
+        return raw_files, charts, university
+
+    def ingest(self, raw_files):
+        """Re-run extraction for changed raw files; returns the charts affected"""
+        charts = set()
+        for path in raw_files:
+            try:
+                report = process_raw_file(path)
+            except Exception:
+                logging.exception(f"Ingesting {path} failed")
+                continue
+            if report["output"]:
+                output = os.path.abspath(report["output"])
+                # Our own output should not trigger another round
+                self.state.update(snapshot([output]))
+                charts.update(render_charts.charts_for_data(output))
+        return charts
+
+    def _command(self, charts, university, output_dir, dpi, preview):
+        command = [
+            sys.executable,
+            "-m",
+            "src.visualization.render_charts",
+            "--output-dir",
+            output_dir,
+            "--dpi",
+            str(dpi),
+            "--charts",
+            *sorted(charts),
+        ]
+        if not university:
+            command.append("--no-university")
+        if preview:
+            command.append("--lod")
+        if self.annotate:
+            command.append("--annotate")
+        return command
+
+    def _cancel_full_render(self):
+        if self.full_render is not None and self.full_render.poll() is None:
+            logging.info("Cancelling the full render in progress")
+            self.full_render.terminate()
+            self.full_render.wait()
+        self.full_render = None
+
+    def check_full_render(self):
+        """Log a finished background render; failed charts stay pending"""
+        if self.full_render is None or self.full_render.poll() is None:
+            return
+        if self.full_render.returncode == 0:
+            logging.info(f"Full-quality charts updated in {self.output_dir}")
+            self.pending_full = (set(), False)
+        else:
+            logging.warning(
+                f"Full render failed with exit code {self.full_render.returncode}"
+            )
+        self.full_render = None
+
+    def run_batch(self, paths):
+        raw_files, charts, university = self.plan(paths)
+        charts |= self.ingest(raw_files)
+        if not charts and not university:
+            return
+
+        logging.info(
+            f"Changed: {', '.join(os.path.relpath(p) for p in sorted(paths))}; "
+            f"rendering {', '.join(sorted(charts)) or 'university figures'}"
+        )
+        self._cancel_full_render()
+        start = time.perf_counter()
+        preview = subprocess.run(
+            self._command(
+                charts, university, self.preview_dir, self.preview_dpi, preview=True
+            )
+        )
+        if preview.returncode == 0:
+            logging.info(
+                f"Preview ready in {self.preview_dir} "
+                f"({time.perf_counter() - start:.1f}s)"
+            )
+        else:
+            logging.warning(
+                f"Preview render failed with exit code {preview.returncode}"
+            )
+
+        # Charts cancelled earlier are rendered together with the new ones
+        charts |= self.pending_full[0]
+        university = university or self.pending_full[1]
+        self.pending_full = (charts, university)
+        self.full_render = subprocess.Popen(
+            self._command(charts, university, self.output_dir, self.dpi, preview=False)
+        )
+
+    def watch(self):
+        """Poll until interrupted"""
+        logging.info(
+            f"Watching {len(self.watched)} paths every {self.poll_interval}s "
+            f"(debounce {self.debounce}s)"
+        )
+        pending, last_change = set(), 0.0
+        try:
+            while True:
+                time.sleep(self.poll_interval)
+                current = snapshot(self.watched)
+                changes = changed_paths(self.state, current)
+                self.state = current
+                if changes:
+                    # Wait for the burst to settle before rendering
+                    pending |= changes
+                    last_change = time.monotonic()
+                elif pending and time.monotonic() - last_change >= self.debounce:
+                    self.run_batch(pending)
+                    pending = set()
+                self.check_full_render()
+        except KeyboardInterrupt:
+            logging.info("Stopped watching")
+        finally:
+            self._cancel_full_render()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="监视数据与样式改动并自动重绘图表")
+    parser.add_argument("--output-dir", default=render_charts.OUTPUT_DIR)
+    parser.add_argument("--preview-dir", default=PREVIEW_DIR)
+    parser.add_argument("--preview-dpi", type=int, default=PREVIEW_DPI)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--annotate", action="store_true")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE)
+    args = parser.parse_args()
+
+    ChartWatcher(
+        output_dir=args.output_dir,
+        preview_dir=args.preview_dir,
+        preview_dpi=args.preview_dpi,
+        dpi=args.dpi,
+        annotate=args.annotate,
+        poll_interval=args.poll_interval,
+        debounce=args.debounce,
+    ).watch()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Modules are imported as src.<package>.<module>, as with python -m from the
+# repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from src.analysis.admission import add_cutoff_columns, simulate_admission
+from src.data.load_tables import load_score_table
+from src.data.rank_index import RankIndex
+
+TABLE = "data/processed/四川省204年高考一分一段表公布.csv"
+
+
+def test_scores_inside_the_top_bucket_share_its_rank():
+    # The top row is "640-750" with 累计人数 30
+    index = RankIndex.from_table(load_score_table(TABLE))
+    assert index.rank_for_score([750, 700, 640, 639]).tolist() == [30, 30, 30, 34]
+    assert index.rank_for_score(751) == 0
+
+    universities = pd.DataFrame({"院校名称": ["北京大学", "某大学"]})
+    cutoffs = pd.DataFrame({"院校名称": ["北京大学", "某大学"], "最低分": [690, 600]})
+    ranks = add_cutoff_columns(universities, cutoffs, index)["最低位次"]
+    assert ranks.tolist() == [30, index.rank_for_score(600)]
+
+
+def test_probability_rises_with_score_for_top_bucket_cutoffs():
+    index = RankIndex.from_table(load_score_table(TABLE))
+    cutoffs = [index.rank_for_score(score) for score in (690, 660)]
+    probabilities = np.array(
+        [
+            simulate_admission(
+                index, cutoffs, score, n_samples=20_000, workers=1, batch_size=5_000
+            )
+            for score in (600, 630, 650, 680, 720)
+        ]
+    )
+    assert (np.diff(probabilities, axis=0) >= 0).all()
+    # A student scoring well inside the bucket is admitted about half the
+    # time under the default cutoff shift, not ~1%
+    assert (probabilities[-1] > 0.4).all()
+    assert (probabilities[0] < 0.05).all()
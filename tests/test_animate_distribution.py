@@ -0,0 +1,45 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.visualization.animate_distribution import GIFWriter, write_gif
+
+
+def _png(array):
+    buffer = io.BytesIO()
+    Image.fromarray(array).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_gif_frames_are_streamed_and_decode_exactly(tmp_path):
+    arrays = []
+    for i in range(5):
+        array = np.full((60, 80, 3), (200, 30, 30), dtype=np.uint8)
+        array[10 + i * 5 : 20 + i * 5, 5:40] = (0, 0, 255)
+        array[:3, :3] = i * 40
+        arrays.append(array)
+    # An unchanged frame still gets its own duration
+    arrays.insert(3, arrays[2])
+    durations = [100, 200, 300, 400, 500, 600]
+    path = tmp_path / "animation.gif"
+
+    write_gif(str(path), (_png(array) for array in arrays), durations)
+    assert not (tmp_path / "animation.gif.tmp").exists()
+
+    with Image.open(path) as image:
+        assert image.n_frames == len(arrays)
+        assert image.info["loop"] == 0
+        for i, array in enumerate(arrays):
+            image.seek(i)
+            assert image.info["duration"] == durations[i]
+            assert (np.asarray(image.convert("RGB")) == array).all()
+
+
+def test_gif_frames_must_share_one_size(tmp_path):
+    writer = GIFWriter(str(tmp_path / "animation.gif"))
+    writer.add_frame(_png(np.zeros((20, 20, 3), dtype=np.uint8)), 100)
+    with pytest.raises(ValueError, match="size"):
+        writer.add_frame(_png(np.zeros((20, 30, 3), dtype=np.uint8)), 100)
+    writer.file.close()
@@ -0,0 +1,66 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+from src.data.append_scores import ScoreTableAppender
+from src.data.rank_index import RankIndex
+
+TABLE = "data/processed/四川省204年高考一分一段表公布.csv"
+
+
+def _raw(rows):
+    return pd.DataFrame(rows, columns=["分数", "人数"]).astype(str)
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = tmp_path / "table.csv"
+    shutil.copy(TABLE, path)
+    return str(path)
+
+
+def test_segments_reproduce_processed_table(tmp_path):
+    full = pd.read_csv(TABLE, dtype=str)
+    path = tmp_path / "table.csv"
+    full.iloc[:100].to_csv(path, index=False)
+
+    appender = ScoreTableAppender(str(path))
+    # The second segment overlaps the first by ten unchanged rows
+    assert appender.append(full.iloc[90:300]) == {
+        "appended": 200,
+        "corrected": 0,
+        "unchanged": 10,
+    }
+    appender.append(full.iloc[300:])
+
+    with open(path, "rb") as f, open(TABLE, "rb") as expected:
+        assert f.read() == expected.read()
+    assert appender.index.total == RankIndex.from_table(appender.table).total
+
+
+def test_correction_recomputes_cumulative_counts(table):
+    appender = ScoreTableAppender(table)
+    result = appender.append(_raw([("639", "5"), ("149", "7")]))
+    assert result == {"appended": 1, "corrected": 1, "unchanged": 0}
+
+    stored = pd.read_csv(table, dtype={"分数": str}).set_index("分数")
+    assert stored.loc["639", "人数"] == 5
+    assert stored.loc["639", "累计人数"] == 35
+    assert stored.loc["149", "累计人数"] == 201953 + 1 + 7
+    assert appender.index.rank_for_score(149) == 201961
+
+
+def test_rejected_segment_writes_nothing(table):
+    with open(table, "rb") as f:
+        before = f.read()
+    appender = ScoreTableAppender(table)
+
+    # A valid correction together with new rows out of order
+    with pytest.raises(ValueError, match="segment rejected"):
+        appender.append(_raw([("639", "5"), ("120", "3"), ("130", "4")]))
+
+    with open(table, "rb") as f:
+        assert f.read() == before
+    assert appender.index.rank_for_score(639) == 34
+    assert len(appender.table) == 491
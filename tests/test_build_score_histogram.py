@@ -0,0 +1,33 @@
+from src.data.build_score_histogram import build_histograms, write_tables
+
+RAW = """省份,科类,分数
+四川,物理类,539
+四川,物理类,539.0
+四川,物理类,539.5
+,物理类,500
+四川,,480
+四川,物理类,abc
+四川,物理类,800
+河南,历史类,600
+"""
+
+
+def test_rejected_rows_are_counted_by_reason(tmp_path):
+    path = tmp_path / "scores.csv"
+    path.write_text(RAW, encoding="utf-8")
+
+    histograms, rows, rejected = build_histograms([str(path)], workers=1)
+
+    assert rows == 8
+    assert rejected == {
+        "missing_key": 2,
+        "missing_score": 1,
+        "out_of_range": 1,
+        "non_integer": 1,
+    }
+    assert set(histograms) == {("四川", "物理类"), ("河南", "历史类")}
+    assert histograms[("四川", "物理类")][539] == 2
+    assert histograms[("四川", "物理类")].sum() == 2
+
+    outputs = write_tables(histograms, tmp_path / "tables")
+    assert len(outputs) == 2
@@ -0,0 +1,145 @@
+import os
+
+import pytest
+
+from src.data import score_table
+from src.visualization import render_charts
+from src.visualization.chart_cache import ChartCache
+
+
+def _renderer(targets, content, calls):
+    def render():
+        calls.append(content)
+        for path in targets.values():
+            with open(path, "wb") as f:
+                f.write(content)
+
+    return render
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ChartCache(str(tmp_path / "cache"), max_bytes=10_000)
+
+
+def _targets(tmp_path, name="chart"):
+    return {"full": str(tmp_path / f"{name}.png"), "pdf": str(tmp_path / f"{name}.pdf")}
+
+
+def test_hit_restores_outputs_without_rendering(cache, tmp_path):
+    targets = _targets(tmp_path)
+    calls = []
+    assert not cache.get_or_render("k1", targets, _renderer(targets, b"v1", calls))
+    for path in targets.values():
+        os.remove(path)
+
+    assert cache.get_or_render("k1", targets, _renderer(targets, b"v2", calls))
+    assert calls == [b"v1"]
+    for path in targets.values():
+        with open(path, "rb") as f:
+            assert f.read() == b"v1"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_new_key_or_missing_entry_file_renders_again(cache, tmp_path):
+    targets = _targets(tmp_path)
+    calls = []
+    cache.get_or_render("k1", targets, _renderer(targets, b"v1", calls))
+    # A changed input gives a new key: the old entry is not used
+    assert not cache.get_or_render("k2", targets, _renderer(targets, b"v2", calls))
+    # An entry missing one of the requested outputs is a miss
+    os.remove(os.path.join(cache.cache_dir, "k1", "pdf.pdf"))
+    assert not cache.get_or_render("k1", targets, _renderer(targets, b"v3", calls))
+    assert calls == [b"v1", b"v2", b"v3"]
+    with open(targets["full"], "rb") as f:
+        assert f.read() == b"v3"
+
+
+def test_rerender_does_not_modify_other_entries(cache, tmp_path):
+    targets = _targets(tmp_path)
+    calls = []
+    cache.get_or_render("k1", targets, _renderer(targets, b"v1", calls))
+    cache.get_or_render("k2", targets, _renderer(targets, b"v2", calls))
+    # Outputs are hard links into the entries; rendering replaces them
+    with open(os.path.join(cache.cache_dir, "k1", "full.png"), "rb") as f:
+        assert f.read() == b"v1"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ChartCache(str(tmp_path / "cache"), max_bytes=12_000)
+    calls = []
+    for i, key in enumerate(("a", "b", "c")):
+        targets = _targets(tmp_path, key)
+        cache.get_or_render(key, targets, _renderer(targets, b"x" * 2_000, calls))
+        os.utime(os.path.join(cache.cache_dir, key), (1_000 + i, 1_000 + i))
+    # Each entry holds 4 KB: three fit in 12 KB. Using "a" makes "b" the
+    # least recently used entry
+    assert cache.fetch("a", _targets(tmp_path, "a"))
+    os.utime(os.path.join(cache.cache_dir, "a"), (2_000, 2_000))
+
+    targets = _targets(tmp_path, "d")
+    cache.get_or_render("d", targets, _renderer(targets, b"x" * 2_000, calls))
+    assert sorted(os.listdir(cache.cache_dir)) == ["a", "c", "d"]
+    assert cache.evictions == 1
+    assert cache.size() <= cache.max_bytes
+
+
+def test_editing_score_label_parsing_invalidates_distribution_charts(monkeypatch):
+    options = {"lod": False, "dpi": 30, "variants": ["full"], "vector_formats": []}
+
+    def keys():
+        return [key for _, key, _, _ in render_charts.distribution_jobs("out", options)]
+
+    before = keys()
+    hash_file = render_charts.hash_file
+    monkeypatch.setattr(
+        render_charts,
+        "hash_file",
+        lambda path: hash_file(path)
+        + ("edited" if path == score_table.__file__ else ""),
+    )
+    after = keys()
+    assert len(before) == 2
+    assert all(a != b for a, b in zip(before, after))
+
+
+def test_university_figures_write_only_figures(tmp_path):
+    output_dir = tmp_path / "charts"
+    output_dir.mkdir()
+    for _, _, targets, render in render_charts.university_jobs(str(output_dir)):
+        render()
+    written = {path.name for path in output_dir.iterdir()}
+    assert written == {
+        f"{name}.{fmt}"
+        for name in ("university_table", "ratio_chart")
+        for fmt in render_charts.UNIVERSITY_FORMATS
+    }
+
+
+def test_threshold_summary_is_computed_only_for_rendered_charts(tmp_path, monkeypatch):
+    calls = []
+    summary = render_charts.threshold_summary
+    monkeypatch.setattr(
+        render_charts, "threshold_summary", lambda: calls.append(1) or summary()
+    )
+    cache = ChartCache(str(tmp_path / "cache"))
+    options = {"lod": False, "dpi": 30, "variants": ["full"], "vector_formats": []}
+    output_dir = str(tmp_path / "charts")
+
+    render_charts.render_all(output_dir, cache, options, university=False)
+    assert calls == []
+    assert not os.path.exists(os.path.join(output_dir, "threshold_stats.csv"))
+
+    render_charts.render_all(
+        output_dir, cache, options, university=False, annotate=True
+    )
+    assert calls == [1]
+    os.remove(os.path.join(output_dir, "threshold_stats.csv"))
+
+    # Every output is restored from the cache, the CSV included
+    report = render_charts.render_all(
+        output_dir, cache, options, university=False, annotate=True
+    )
+    assert calls == [1]
+    assert all(chart["cache_hit"] for chart in report["charts"])
+    assert os.path.exists(os.path.join(output_dir, "threshold_stats.csv"))
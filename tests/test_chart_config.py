@@ -0,0 +1,95 @@
+import copy
+import json
+
+import pytest
+
+from src.config.chart_config import DEFAULT_CONFIG_PATH, ChartConfig, ConfigError
+
+with open(DEFAULT_CONFIG_PATH, encoding="utf-8") as f:
+    RAW = json.load(f)
+
+
+def _edited(edit):
+    raw = copy.deepcopy(RAW)
+    edit(raw)
+    return raw
+
+
+def _first_dataset(raw):
+    return next(iter(raw["distribution"]["datasets"].values()))
+
+
+def test_default_config_is_valid():
+    config = ChartConfig(RAW)
+    assert len(config.heatmap_colors) == RAW["university_table"]["heatmap_colors"]
+
+
+@pytest.mark.parametrize(
+    "edit, problem",
+    [
+        (
+            lambda raw: raw["university_table"].update(heatmap_colors=1),
+            "university_table.heatmap_colors: invalid count 1",
+        ),
+        (
+            lambda raw: raw["university_table"].update(heatmap_colors=2.5),
+            "university_table.heatmap_colors: invalid count 2.5",
+        ),
+        (
+            lambda raw: raw.update(distribution=[]),
+            "distribution: expected an object",
+        ),
+        (
+            lambda raw: raw["distribution"].update(datasets=[]),
+            "distribution.datasets: expected an object",
+        ),
+        (
+            lambda raw: raw["distribution"]["datasets"].update(extra="title"),
+            "distribution.datasets.extra: expected an object",
+        ),
+        (
+            lambda raw: raw["distribution"]["style"].update(bar_alpha=5),
+            "distribution.style.bar_alpha: invalid alpha 5",
+        ),
+        (
+            lambda raw: raw["distribution"]["style"].update(grid_alpha=-0.1),
+            "distribution.style.grid_alpha: invalid alpha -0.1",
+        ),
+        (
+            lambda raw: _first_dataset(raw)
+            .setdefault("style", {})
+            .update(line_alpha=1.5),
+            ".style.line_alpha: invalid alpha 1.5",
+        ),
+        (
+            lambda raw: raw["distribution"]["style"].update(title_weight="bogus"),
+            "distribution.style.title_weight: invalid font_weight 'bogus'",
+        ),
+        (
+            lambda raw: raw["university_table"].update(line_color="notacolor"),
+            "university_table.line_color: invalid plotly_color 'notacolor'",
+        ),
+        (
+            lambda raw: raw["university_table"].update(line_color=3),
+            "university_table.line_color: invalid plotly_color 3",
+        ),
+    ],
+)
+def test_invalid_values_raise_config_error(edit, problem):
+    with pytest.raises(ConfigError) as error:
+        ChartConfig(_edited(edit))
+    assert problem in str(error.value)
+
+
+def test_all_problems_reported_together():
+    def edit(raw):
+        raw["university_table"]["heatmap_colors"] = 1
+        raw["distribution"]["style"]["line_alpha"] = 2
+        raw["distribution"]["style"]["label_weight"] = "heavyish"
+
+    with pytest.raises(ConfigError) as error:
+        ChartConfig(_edited(edit))
+    message = str(error.value)
+    assert "heatmap_colors" in message
+    assert "line_alpha" in message
+    assert "label_weight" in message
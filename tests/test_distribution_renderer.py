@@ -0,0 +1,49 @@
+import pytest
+
+from src.config.chart_config import load_config
+from src.data.load_tables import load_score_table
+from src.visualization.distribution_renderer import (
+    check_thread_safety,
+    render_distribution_plot,
+)
+from src.visualization.middle_school_score_distribution_plot import (
+    load_middle_school_table,
+)
+
+
+@pytest.fixture(scope="module")
+def jobs():
+    config = load_config()
+    return [
+        (
+            load_score_table("data/processed/四川省204年高考一分一段表公布.csv"),
+            config.distribution("gaokao"),
+        ),
+        (
+            load_middle_school_table("data/processed/中考分数分布数据.csv"),
+            config.distribution("zhongkao"),
+        ),
+    ]
+
+
+# The full check (python -m src.visualization.distribution_renderer) renders
+# 100 charts on 8 threads; a smaller run keeps the suite fast
+@pytest.mark.parametrize("n_charts, workers", [(4, 2), (8, 8)])
+def test_threaded_rendering_matches_serial(jobs, n_charts, workers):
+    assert check_thread_safety(jobs, n_charts, workers, dpi=30) == []
+
+
+def test_output_extension_selects_variant(jobs, tmp_path):
+    df, chart = jobs[1]
+    outputs = render_distribution_plot(df, str(tmp_path / "chart.webp"), chart, dpi=30)
+    assert outputs == {
+        "webp": str(tmp_path / "chart.webp"),
+        "full": str(tmp_path / "chart.png"),
+    }
+
+
+def test_unsupported_extension_is_rejected(jobs, tmp_path):
+    df, chart = jobs[1]
+    with pytest.raises(ValueError, match="Unsupported output extension '.jpg'"):
+        render_distribution_plot(df, str(tmp_path / "chart.jpg"), chart, dpi=30)
+    assert not list(tmp_path.iterdir())
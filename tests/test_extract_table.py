@@ -0,0 +1,120 @@
+import pytest
+
+from src.data_processing.extract_table import (
+    _parse_tables,
+    detect_encoding,
+    extract_tables,
+)
+
+ROWS = (
+    "<table><tr><td>分数</td><td>人数</td></tr><tr><td>700</td><td>12</td></tr></table>"
+)
+
+
+def _write(tmp_path, data, name="page.html"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "head", ["", '<meta charset="gbk">', '<meta content="text/html; charset=gb2312">']
+)
+def test_gbk_pages_are_detected_with_or_without_meta_charset(tmp_path, head):
+    path = _write(tmp_path, f"<html><head>{head}</head>{ROWS}</html>".encode("gbk"))
+    encoding, source = detect_encoding(path)
+    assert encoding == "gb18030"
+    assert source == ("meta" if head else "sample")
+    assert extract_tables(path, encoding) == [[["分数", "人数"], ["700", "12"]]]
+    # The detected encoding is used when none is given
+    assert extract_tables(path) == extract_tables(path, encoding)
+
+
+def test_utf8_wins_over_a_stale_meta_charset(tmp_path):
+    path = _write(tmp_path, f'<meta charset="gbk">{ROWS}'.encode("utf-8"))
+    assert detect_encoding(path) == ("utf-8", "sample")
+
+
+def test_bom_ascii_and_utf16(tmp_path):
+    assert detect_encoding(
+        _write(tmp_path, b"\xef\xbb\xbf" + ROWS.encode("utf-8"))
+    ) == ("utf-8-sig", "bom")
+    assert detect_encoding(_write(tmp_path, b"<table></table>")) == ("utf-8", "ascii")
+    with pytest.raises(ValueError, match="UTF-16"):
+        detect_encoding(_write(tmp_path, ROWS.encode("utf-16")))
+
+
+def test_non_ascii_past_the_meta_scan_window_is_sampled(tmp_path):
+    padding = b"<!--" + b"x" * (70 * 1024) + b"-->"
+    path = _write(tmp_path, padding + ROWS.encode("gbk"))
+    assert detect_encoding(path) == ("gb18030", "sample")
+
+
+def _tables(html):
+    """Rows of every table, by table number"""
+    tables = {}
+    for number, row in _parse_tables(html.encode("utf-8"), "utf-8"):
+        tables.setdefault(number, []).append(row)
+    return tables
+
+
+def test_rowspan_and_colspan_repeat_cells_across_the_grid():
+    html = """<table>
+    <tr><th rowspan="3">一本</th><th colspan=2>人数</th><td>x</td></tr>
+    <tr><td>1</td><td rowspan='2'>2</td><td>y</td></tr>
+    <tr><td>3</td><td>z</td></tr>
+    <tr><td>a</td><td>b</td><td>c</td><td>d</td></tr>
+    </table>"""
+    assert _tables(html) == {
+        1: [
+            ["一本", "人数", "人数", "x"],
+            ["一本", "1", "2", "y"],
+            ["一本", "3", "2", "z"],
+            ["a", "b", "c", "d"],
+        ]
+    }
+
+
+def test_rowspan_right_of_a_shorter_row_keeps_its_column():
+    html = (
+        "<table><tr><td>a</td><td>b</td><td rowspan=2>c</td></tr>"
+        "<tr><td>d</td></tr></table>"
+    )
+    assert _tables(html) == {1: [["a", "b", "c"], ["d", "", "c"]]}
+
+
+def test_nested_tables_are_numbered_separately():
+    html = (
+        "<table><tr><td>before <table><tr><td>inner</td></tr></table> after</td>"
+        "<td>2</td></tr><tr><td>3</td><td>4</td></tr></table>"
+        "<table><tr><td>last</td></tr></table>"
+    )
+    assert _tables(html) == {
+        1: [["before after", "2"], ["3", "4"]],
+        2: [["inner"]],
+        3: [["last"]],
+    }
+
+
+def test_omitted_end_tags_are_closed_implicitly():
+    html = (
+        "<table><tr><td>1<td>2<tr><td>3<td>4</table>"
+        "<tr><td>outside</td></tr>"
+        "<table><tbody><tr><td>5</td><tbody><tr><td>6"
+    )
+    assert _tables(html) == {
+        1: [["1", "2"], ["3", "4"]],
+        2: [["outside"]],
+        3: [["5"], ["6"]],
+    }
+
+
+def test_scripts_styles_and_comments_are_skipped():
+    html = """<table>
+    <!-- <tr><td>commented</td></tr> -->
+    <script>var s = "<tr><td>script</td></tr>";</script>
+    <style>td { color: red }</style>
+    <tr><td>1<!-- hidden --></td><td><b>2</b>&amp;<br>3</td></tr>
+    <SCRIPT type="text/javascript">document.write("<table>")</SCRIPT >
+    </table>"""
+    assert _tables(html) == {1: [["1", "2& 3"]]}
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.rank_intervals import TIERS, RankIntervalIndex, UniversityRankIndex
+
+
+def _random_intervals(rng, n, max_rank):
+    starts = rng.integers(1, max_rank, n)
+    ends = starts + rng.integers(0, max_rank // 4, n)
+    return starts, ends
+
+
+def _split(offsets, ids):
+    return [sorted(ids[a:b].tolist()) for a, b in zip(offsets[:-1], offsets[1:])]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_stab_and_overlapping_match_a_linear_scan(seed):
+    rng = np.random.default_rng(seed)
+    starts, ends = _random_intervals(rng, 200, 1_000)
+    index = RankIntervalIndex(starts, ends)
+
+    # Points and windows reaching past both ends of the rank axis
+    points = rng.integers(-10, 1_300, 500)
+    assert _split(*index.stab(points)) == [
+        np.flatnonzero((starts <= p) & (p <= ends)).tolist() for p in points
+    ]
+    low = rng.integers(-10, 1_300, 500)
+    high = low + rng.integers(0, 100, 500)
+    assert _split(*index.overlapping(low, high)) == [
+        np.flatnonzero((starts <= h) & (ends >= lo)).tolist()
+        for lo, h in zip(low, high)
+    ]
+    # Scalars return the ids alone
+    assert sorted(index.stab(points[0])) == _split(*index.stab(points[:1]))[0]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_tiers_match_a_linear_scan(seed):
+    rng = np.random.default_rng(seed)
+    starts, ends = _random_intervals(rng, 200, 1_000)
+    index = RankIntervalIndex(starts, ends)
+    ranks = rng.integers(1, 1_200, 300)
+
+    offsets, ids, codes = index.tiers(ranks, reach=0.2, safety=0.1)
+    for i, rank in enumerate(ranks):
+        reach = (ends >= rank - np.ceil(rank * 0.2)) & (ends < rank)
+        match = (starts <= rank) & (rank <= ends)
+        safe = (starts > rank) & (starts <= rank + np.ceil(rank * 0.1))
+        found = list(
+            zip(ids[offsets[i] : offsets[i + 1]], codes[offsets[i] : offsets[i + 1]])
+        )
+        expected = [
+            (j, code)
+            for code, mask in enumerate((reach, match, safe))
+            for j in np.flatnonzero(mask)
+        ]
+        assert sorted(found) == sorted(expected)
+
+
+def test_point_intervals_and_invalid_windows():
+    index = RankIntervalIndex([5, 5, 7], [5, 9, 7])
+    assert index.stab(5).tolist() == [0, 1]
+    assert index.stab(7).tolist() == [1, 2]
+    assert index.stab(10).tolist() == []
+    with pytest.raises(ValueError):
+        RankIntervalIndex([3], [2])
+
+
+def test_university_index_skips_rows_without_a_window():
+    df = pd.DataFrame(
+        {
+            "院校名称": ["甲", "乙", "丙"],
+            "最高位次": pd.array([1, None, 50], dtype="Int32"),
+            "最低位次": pd.array([100, 80, 120], dtype="Int32"),
+        }
+    )
+    rows = UniversityRankIndex(df).tiers([60])
+    assert list(zip(rows["院校名称"], rows["档位"])) == [("甲", "稳"), ("丙", "稳")]
+    assert list(rows["档位"].cat.categories) == list(TIERS)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.ranking import RankingEngine
+
+
+def _universities(rng, n, start=0):
+    undergrad = rng.integers(0, 30_000, n)
+    doctoral = rng.integers(0, 5_000, n)
+    graduate = doctoral + rng.integers(0, 20_000, n)
+    return pd.DataFrame(
+        {
+            "院校名称": [f"院校{i:04d}" for i in range(start, start + n)],
+            "属性": pd.Categorical(rng.choice(["985", "211", "双一流"], n)),
+            "本科生": undergrad,
+            "硕士生": graduate - doctoral,
+            "博士生": doctoral,
+            "硕博合计": graduate,
+        }
+    )
+
+
+def _brute_force(engine, metric, k, filters, ascending):
+    """Stable sort of every matching row, the way top_k is defined"""
+    df = engine.df
+    keep = df[metric].notna()
+    for column, allowed in (filters or {}).items():
+        keep &= df[column].isin(np.atleast_1d(allowed))
+    ranked = df[keep].sort_values(metric, ascending=ascending, kind="stable")
+    return ranked["院校名称"].head(k).tolist()
+
+
+QUERIES = [
+    ("研本比", 10, None, False),
+    ("研本比", 10, None, True),
+    ("博士占比", 5, {"属性": "985"}, False),
+    ("本科生", 20, {"属性": ["211", "双一流"]}, True),
+    ("研本比", 1_000, None, False),
+]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_top_k_after_updates_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    df = _universities(rng, 300)
+    # Ties and undefined ratios
+    df.loc[::7, "本科生"] = 0
+    df.loc[::11, ["本科生", "硕博合计"]] = [1_000, 500]
+    engine = RankingEngine(df)
+    for query in QUERIES:
+        engine.top_k(*query)
+    engine.extent("研本比")
+
+    for step in range(10):
+        # Change existing rows (some of them ranked) and insert new ones
+        rows = _universities(rng, 15, start=step * 40)
+        if step % 3 == 0:
+            rows["属性"] = "新属性"
+        engine.update(rows)
+        for query in QUERIES:
+            assert engine.top_k(*query)["院校名称"].tolist() == _brute_force(
+                engine, *query
+            )
+        ratios = engine.df["研本比"]
+        assert engine.extent("研本比") == (ratios.min(), ratios.max())
+
+
+def test_missing_metric_columns_raise_a_clear_error():
+    df = _universities(np.random.default_rng(0), 5).drop(columns=["博士生"])
+    with pytest.raises(ValueError, match="博士生"):
+        RankingEngine(df)
+    with pytest.raises(ValueError, match="院校名称"):
+        RankingEngine(df.drop(columns=["院校名称"]), metrics={})
+    # Without derived metrics the count columns are not needed
+    engine = RankingEngine(df, metrics={})
+    assert len(engine.top_k("本科生", 3)) == 3
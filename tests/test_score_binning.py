@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.chart_config import load_config
+from src.data.load_tables import load_score_table
+from src.visualization.middle_school_score_distribution_plot import (
+    load_middle_school_table,
+)
+from src.visualization.score_binning import (
+    DEFAULT_AXES_FRACTION,
+    bar_layout,
+    max_bins_for_height,
+)
+
+DATASETS = {
+    "gaokao": lambda: load_score_table(
+        "data/processed/四川省204年高考一分一段表公布.csv"
+    ),
+    "zhongkao": lambda: load_middle_school_table("data/processed/中考分数分布数据.csv"),
+}
+
+
+def _synthetic(low=100, high=699):
+    scores = np.arange(high, low - 1, -1)
+    counts = np.arange(len(scores)) % 7 + 1
+    return pd.DataFrame(
+        {"score": scores, "人数": counts, "累计人数": np.cumsum(counts)}
+    )
+
+
+def test_table_that_fits_is_not_merged():
+    df = _synthetic()
+    bars = bar_layout(df, max_bins=len(df))
+    assert bars["score"].tolist() == df["score"].tolist()
+    assert (bars["height"] == 1).all()
+
+
+@pytest.mark.parametrize("dataset", list(DATASETS))
+@pytest.mark.parametrize("dpi", [20, 30, 72])
+def test_merged_bins_preserve_counts_and_min_bar_pixels(dataset, dpi):
+    df = DATASETS[dataset]().dropna(subset=["score", "人数"])
+    chart = load_config().distribution(dataset)
+    style = chart.style
+    keep = [score for score, _, _ in chart.thresholds]
+    max_bins = max_bins_for_height(
+        style["figure_size"][1], dpi, style["lod_min_bar_pixels"]
+    )
+    bars = bar_layout(df, max_bins, keep_scores=keep)
+
+    assert len(bars) <= max_bins
+    assert bars["人数"].sum() == df["人数"].sum()
+    assert np.isclose((bars["value"] * bars["height"]).sum(), df["人数"].sum())
+    # Descending, contiguous bins covering every score
+    assert (np.diff(bars["score"]) < 0).all()
+    assert (bars["score"] + bars["height"]).tolist()[1:] == bars["score"].tolist()[:-1]
+
+    low, high = df["score"].min(), df["score"].max()
+    inside = [score for score in keep if low < score <= high]
+    assert set(inside) <= set(bars["score"])
+    if len(df) > max_bins:
+        axes_pixels = style["figure_size"][1] * dpi * DEFAULT_AXES_FRACTION
+        pixels = bars["height"] * axes_pixels / (high - low + 1)
+        # Only a bin between two kept scores (or the lowest score and a
+        # kept score) may be thinner
+        bounded = bars["score"].isin([low, *inside]) & (
+            bars["score"] + bars["height"]
+        ).isin([*inside, high + 1])
+        assert (pixels[~bounded] >= style["lod_min_bar_pixels"]).all()
+
+
+def test_kept_score_next_to_regular_edge_leaves_no_sliver():
+    # 600 scores in 10 bins of 60: edges at 100, 160, ...; 161 would leave
+    # a one-point bin [160, 160]
+    df = _synthetic()
+    bars = bar_layout(df, max_bins=12, keep_scores=[161, 402])
+    assert {161, 402} <= set(bars["score"])
+    assert bars["height"].min() >= 50
+    assert bars["人数"].sum() == df["人数"].sum()
+    # The bin ending at a kept score holds every count below it
+    above_161 = bars.loc[bars["score"] >= 161, "人数"].sum()
+    assert above_161 == df.loc[df["score"] >= 161, "人数"].sum()
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.score_cube import ScoreCube
+
+MAX_SCORE = 100
+
+
+def _table(rng):
+    scores = np.sort(rng.choice(np.arange(0, MAX_SCORE + 1), 40, replace=False))[::-1]
+    return pd.DataFrame({"score": scores, "人数": rng.integers(0, 50, len(scores))})
+
+
+@pytest.fixture(scope="module")
+def tables():
+    rng = np.random.default_rng(0)
+    return {
+        (province, year, track): _table(rng)
+        for province in ("四川", "河南")
+        for year in (2023, 2024)
+        for track in ("物理类", "历史类")
+        if (province, year) != ("河南", 2023)
+    }
+
+
+@pytest.fixture(scope="module")
+def cube(tables):
+    return ScoreCube.from_tables(
+        ((*key, df) for key, df in tables.items()), max_score=MAX_SCORE
+    )
+
+
+def _brute_rank(df, score):
+    return int(df.loc[df["score"] >= score, "人数"].sum())
+
+
+def test_axes_and_totals(cube, tables):
+    assert list(cube.provinces) == ["四川", "河南"]
+    assert list(cube.years) == [2023, 2024]
+    assert list(cube.tracks) == ["历史类", "物理类"]
+    assert cube.above.shape == (2, 2, 2, MAX_SCORE + 2)
+    assert cube.max_score == MAX_SCORE
+    for key, df in tables.items():
+        assert cube.total(*key) == df["人数"].sum()
+    # A combination without a table is empty
+    assert cube.total("河南", 2023, "物理类") == 0
+
+
+def test_rank_and_range_match_linear_scan(cube, tables):
+    rng = np.random.default_rng(1)
+    for key, df in tables.items():
+        for score in rng.integers(-5, MAX_SCORE + 5, 30):
+            assert cube.rank(*key, score) == _brute_rank(df, score)
+        for low, high in rng.integers(-5, MAX_SCORE + 5, (30, 2)):
+            expected = int(
+                df.loc[df["score"].between(low, high), "人数"].sum()
+                if low <= high
+                else 0
+            )
+            assert cube.range_count(*key, low, high) == expected
+
+
+def test_queries_broadcast_over_labels_and_scores(cube, tables):
+    provinces = np.array(["四川", "河南", "四川"])
+    years = np.array([2024, 2024, 2023])
+    scores = np.array([[10], [50], [90]])
+    ranks = cube.rank(provinces, years, "物理类", scores)
+    assert ranks.shape == (3, 3)
+    for i, score in enumerate(scores[:, 0]):
+        for j, (province, year) in enumerate(zip(provinces, years)):
+            df = tables[(province, year, "物理类")]
+            assert ranks[i, j] == _brute_rank(df, score)
+
+    counts = cube.range_count("四川", 2024, ["物理类", "历史类"], 20, [60, 80])
+    expected = []
+    for track, high in (("物理类", 60), ("历史类", 80)):
+        df = tables[("四川", 2024, track)]
+        expected.append(df.loc[df["score"].between(20, high), "人数"].sum())
+    assert counts.tolist() == expected
+
+
+def test_rows_without_counts_and_out_of_range_scores():
+    df = pd.DataFrame(
+        {
+            "score": pd.array([120, 80, None, 10, -3], dtype="Int16"),
+            "人数": pd.array([5, 3, 4, None, 2], dtype="Int32"),
+        }
+    )
+    cube = ScoreCube.from_tables([("四川", 2024, "全部", df)], max_score=MAX_SCORE)
+    # Missing scores or counts are skipped; scores are clipped to [0, max]
+    assert cube.total("四川", 2024, "全部") == 10
+    assert cube.rank("四川", 2024, "全部", MAX_SCORE) == 5
+    assert cube.range_count("四川", 2024, "全部", 0, 0) == 2
+
+
+def test_unknown_label_raises(cube):
+    with pytest.raises(KeyError, match="unknown province: 广东"):
+        cube.rank("广东", 2024, "物理类", 50)
+    with pytest.raises(KeyError, match="unknown year: 2022"):
+        cube.rank("四川", [2024, 2022], "物理类", 50)
+
+
+def test_save_and_load_round_trip(cube, tmp_path):
+    path = str(tmp_path / "cube")
+    cube.save(path)
+    loaded = ScoreCube.load(path)
+    assert isinstance(loaded.above, np.memmap)
+    assert list(loaded.provinces) == list(cube.provinces)
+    assert list(loaded.years) == list(cube.years)
+    assert (np.asarray(loaded.above) == cube.above).all()
+    assert loaded.rank("河南", 2024, "历史类", 37) == cube.rank(
+        "河南", 2024, "历史类", 37
+    )
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import math
+
+import pytest
+
+from src.service.load_test import run_load_test
+from src.service.server import MAX_DISCARD_BYTES, ChartService
+
+
+async def _read_response(reader):
+    """(status, headers, body), or None once the server closed the connection"""
+    status_line = await reader.readline()
+    if not status_line:
+        return None
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers["content-length"]))
+    return status, headers, body
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = ChartService(workers=1)
+    yield service
+    service.close()
+
+
+async def _exchange(service, requests):
+    server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"".join(requests))
+        await writer.drain()
+        responses = []
+        for _ in requests:
+            response = await _read_response(reader)
+            if response is None:
+                break
+            responses.append(response)
+        writer.close()
+        return responses
+
+
+def _post(body):
+    return (
+        f"POST /rank HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode("latin-1") + body
+
+
+GET = b"GET /rank?dataset=gaokao&score=539 HTTP/1.1\r\nHost: test\r\n\r\n"
+
+
+def test_request_body_is_consumed(service):
+    # The body is a request of its own; it must not be answered as one
+    smuggled = GET.replace(b"score=539", b"score=600")
+    responses = asyncio.run(_exchange(service, [_post(smuggled), GET]))
+    assert [status for status, _, _ in responses] == [405, 200]
+    assert responses[0][1]["connection"] == "keep-alive"
+    assert json.loads(responses[1][2])["ranks"] == [15334]
+
+
+def test_oversized_body_closes_connection(service):
+    body = b"x" * (MAX_DISCARD_BYTES + 1)
+    responses = asyncio.run(_exchange(service, [_post(body), GET]))
+    assert [status for status, _, _ in responses] == [405]
+    assert responses[0][1]["connection"] == "close"
+
+
+def test_load_test_without_requests(service):
+    async def run():
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await run_load_test(f"http://127.0.0.1:{port}", 0, 2, ["/stats"])
+
+    report = asyncio.run(run())
+    assert report["requests"] == 0
+    assert math.isnan(report["p50_ms"]) and math.isnan(report["max_ms"])
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from src.data.threshold_stats import (
+    MEDIAN_LABEL,
+    compute_threshold_stats,
+    threshold_notes,
+)
+
+# 10 students at each score from 100 down to 91
+TABLE = pd.DataFrame({"score": range(100, 90, -1), "人数": [10] * 10})
+THRESHOLDS = [[98, "一批", "red"], [93, "二批", "blue"]]
+
+
+def test_median_splits_the_bands():
+    stats = compute_threshold_stats([("考试", TABLE, THRESHOLDS)])
+
+    assert stats["批次"].tolist() == ["一批", MEDIAN_LABEL, "二批"]
+    assert stats["分数段"].tolist() == ["≥98", "96-97", "93-95"]
+    assert stats["线上人数"].tolist() == [30, 50, 80]
+    assert stats["段内人数"].tolist() == [30, 20, 30]
+    assert stats["段内比例"].tolist() == [30.0, 20.0, 30.0]
+    assert (stats["中位数"] == 96).all()
+
+
+def test_notes_keep_median_score():
+    stats = compute_threshold_stats([("考试", TABLE, THRESHOLDS)])
+    assert threshold_notes(stats, "考试") == {
+        "一批": "线上 30.0%",
+        "二批": "线上 80.0%",
+        MEDIAN_LABEL: "96分",
+    }
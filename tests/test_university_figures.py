@@ -0,0 +1,160 @@
+import json
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+
+from src.analysis.ranking import RankingEngine
+from src.config.chart_config import load_config
+from src.visualization.fonts import plotly_font_family
+from src.visualization.university_data_analysis import (
+    build_university_data,
+    ratio_bar_chart_spec,
+    university_table_spec,
+    validate_spec,
+)
+
+
+@pytest.fixture(scope="module")
+def df():
+    return build_university_data()
+
+
+def _as_json(fig):
+    # Key order differs between the two paths; the figures must not
+    return json.loads(pio.to_json(fig))
+
+
+def object_table(df):
+    """The university table built with go.Table, as before the dict specs"""
+    font_family = plotly_font_family()
+    config = load_config()
+    style = config.university_table
+    min_ratio, max_ratio = RankingEngine(df).extent("研本比")
+    ratios = df["研本比"].to_numpy("float64", na_value=np.nan)
+    cells = df.astype(object).where(df.notna(), "null")
+
+    colors = config.heatmap_colors
+    normalized = (ratios - min_ratio) / (max_ratio - min_ratio)
+    color_idx = np.nan_to_num(normalized * (len(colors) - 1)).astype(int)
+    ratio_fill = [
+        colors[i] if not np.isnan(ratio) else None
+        for i, ratio in zip(color_idx, ratios)
+    ]
+
+    fig = go.Figure(
+        go.Table(
+            header=dict(
+                values=list(df.columns),
+                fill_color=style["header_fill"],
+                font=dict(
+                    color=style["header_font_color"],
+                    size=style["header_font_size"],
+                    family=font_family,
+                ),
+                align="center",
+                height=style["header_height"],
+            ),
+            cells=dict(
+                values=[cells[col] for col in df.columns],
+                fill_color=[
+                    ratio_fill if col == "研本比" else [style["cell_fill"]] * len(df)
+                    for col in df.columns
+                ],
+                font=dict(
+                    size=style["cell_font_size"],
+                    family=font_family,
+                    color=[
+                        [
+                            (
+                                style["missing_font_color"]
+                                if str(value) == "null"
+                                else style["cell_font_color"]
+                            )
+                            for value in cells[col]
+                        ]
+                        for col in df.columns
+                    ],
+                ),
+                align="center",
+                height=style["cell_height"],
+                line=dict(color=style["line_color"], width=style["line_width"]),
+            ),
+        )
+    )
+    fig.update_layout(
+        title=dict(
+            text=style["title"],
+            font=dict(size=style["title_size"], family=font_family),
+            y=0.95,
+        ),
+        width=style["width"],
+        height=style["height"],
+        paper_bgcolor=style["background_color"],
+        plot_bgcolor=style["background_color"],
+        margin=style["margin"],
+    )
+    return fig
+
+
+def object_bar_chart(df, k=20, filters=None):
+    """The 研本比 bar chart built with px.bar, as before the dict specs"""
+    font_family = plotly_font_family()
+    style = load_config().ratio_chart
+    title = style["title"].format(k=k)
+    fig = px.bar(
+        RankingEngine(df).top_k("研本比", k, filters),
+        x="院校名称",
+        y="研本比",
+        text="研本比",
+        color="研本比",
+        color_continuous_scale=style["colorscale"],
+        title=title,
+    )
+    fig.update_layout(
+        title=dict(
+            text=title,
+            font=dict(size=style["title_size"], family=font_family),
+            y=0.95,
+        ),
+        xaxis=dict(
+            title=style["x_title"],
+            tickangle=style["tick_angle"],
+            tickfont=dict(size=style["tick_size"], family=font_family),
+            title_font=dict(size=style["axis_title_size"], family=font_family),
+        ),
+        yaxis=dict(
+            title=style["y_title"],
+            tickfont=dict(size=style["tick_size"], family=font_family),
+            title_font=dict(size=style["axis_title_size"], family=font_family),
+            gridcolor=style["grid_color"],
+        ),
+        height=style["height"],
+        plot_bgcolor=style["background_color"],
+        paper_bgcolor=style["background_color"],
+        showlegend=False,
+        margin=style["margin"],
+    )
+    fig.update_traces(texttemplate="%{text:.2f}", textposition="outside")
+    fig.add_hline(
+        y=df["研本比"].mean(),
+        line_dash="dash",
+        line_color=style["mean_line_color"],
+        annotation_text=style["mean_label"],
+        annotation_font=dict(family=font_family),
+    )
+    fig.update_coloraxes(showscale=False)
+    return fig
+
+
+def test_table_spec_matches_object_api(df):
+    fig = validate_spec(university_table_spec(df))
+    assert _as_json(fig) == _as_json(object_table(df))
+
+
+@pytest.mark.parametrize("k, filters", [(20, None), (5, {"属性": "985"})])
+def test_ratio_spec_matches_object_api(df, k, filters):
+    fig = validate_spec(ratio_bar_chart_spec(df, k, filters))
+    assert _as_json(fig) == _as_json(object_bar_chart(df, k, filters))
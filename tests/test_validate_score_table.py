@@ -0,0 +1,120 @@
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from src.data.validate_score_table import (
+    check_chunk,
+    repair_score_table,
+    validate_score_csv,
+    validate_score_table,
+)
+
+
+def _table(rows):
+    return pd.DataFrame(rows, columns=["分数", "人数", "累计人数"]).astype(
+        {"分数": "string"}
+    )
+
+
+VALID = [
+    ("640-750", 30, 30),
+    ("639", 4, 34),
+    ("638", 4, 38),
+    ("637", 6, 44),
+    ("636", 5, 49),
+    ("635分以下", None, None),
+]
+
+
+def _issues(table):
+    issues = validate_score_table(table)
+    return list(zip(issues["row"], issues["issue"]))
+
+
+def test_valid_table_with_open_tail_row():
+    assert _issues(_table(VALID)) == []
+
+
+def test_scores_out_of_order():
+    rows = list(VALID)
+    rows[2], rows[3] = ("637", 4, 38), ("638", 6, 44)
+    assert _issues(_table(rows)) == [(3, "not_decreasing")]
+
+
+def test_wrong_cumulative_counts():
+    rows = list(VALID)
+    rows[1] = ("639", 5, 34)
+    issues = validate_score_table(_table(rows))
+    assert issues["issue"].unique().tolist() == ["cumulative_mismatch"]
+    assert issues["row"].tolist() == [1, 2, 3, 4]
+    assert issues["expected_cumulative"].tolist() == [35, 39, 45, 50]
+
+
+def test_overlapping_ranges():
+    rows = [("640-750", 30, 30), ("630-645", 10, 40), ("620-629", 5, 45)]
+    assert _issues(_table(rows)) == [(1, "overlap")]
+
+
+def test_bad_counts_and_labels():
+    rows = [
+        ("640-750", 30, 30),
+        ("639", -1, 29),
+        ("abc", 2.5, 31.5),
+        ("637", None, None),
+    ]
+    assert sorted(_issues(_table(rows))) == [
+        (1, "negative_count"),
+        (2, "bad_label"),
+        (2, "non_integer_count"),
+        (3, "missing_count"),
+    ]
+
+
+def test_rows_after_open_tail_row_are_out_of_order():
+    rows = VALID + [("634", 3, 52)]
+    assert _issues(_table(rows)) == [(6, "not_decreasing")]
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 4])
+def test_chunks_continue_across_boundaries(tmp_path, chunksize):
+    rows = list(VALID)
+    rows[1] = ("639", 5, 34)
+    rows[3], rows[4] = ("636", 5, 44), ("637", 6, 50)
+    table = _table(rows)
+    path = tmp_path / "table.csv"
+    table.to_csv(path, index=False)
+
+    whole = validate_score_table(table)
+    chunked = validate_score_csv(path, chunksize=chunksize)
+    assert list(zip(chunked["row"], chunked["issue"])) == list(
+        zip(whole["row"], whole["issue"])
+    )
+    assert (4, "not_decreasing") in list(zip(whole["row"], whole["issue"]))
+
+    # The state after a chunk carries the previous row and running total
+    _, state = check_chunk(table.iloc[:3])
+    assert state["rows"] == 3 and state["running_total"] == 39
+
+
+def test_repair_recomputes_cumulative_counts():
+    rows = list(VALID)
+    rows[1] = ("639", 5, 34)
+    repaired = repair_score_table(_table(rows))
+    assert repaired["累计人数"].tolist()[:5] == [30, 35, 39, 45, 50]
+    assert repaired["累计人数"].isna().tolist()[5]
+    assert str(repaired["人数"].dtype) == "Int64"
+    assert validate_score_table(repaired).empty
+
+
+def test_processed_tables_pass_the_documented_command():
+    paths = [
+        "data/processed/中考分数分布数据.csv",
+        "data/processed/四川省204年高考一分一段表公布.csv",
+        "data/processed/高考分数分布数据.csv",
+    ]
+    result = subprocess.run(
+        [sys.executable, "-m", "src.data.validate_score_table", *paths]
+    )
+    assert result.returncode == 0